@@ -1,30 +1,63 @@
 from django.urls import path
 
+from core.views import CacheStatsView
 from rbac.views import AssignUserPermissionView
+from users.async_views import (
+    AsyncFollowersView,
+    AsyncFollowingView,
+    AsyncLoginView,
+    AsyncProfileView,
+    AsyncRegisterView,
+    AsyncUserSettingsView,
+)
 from users.views import (
     BlockUserView,
+    BulkFollowView,
     CloseFriendView,
     DeleteAccountView,
     FollowActionView,
     FollowersView,
     FollowingView,
+    FollowRequestInboxView,
     FollowRequestRespondView,
     LoginView,
     LogoutView,
     MuteUserView,
     ProfileView,
     RegisterView,
+    SuggestedFollowsView,
     UserSettingsView,
 )
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
     path("login/", LoginView.as_view(), name="login"),
+    # Async auth endpoints (run under ASGI, hash passwords off the event loop)
+    path("async/register/", AsyncRegisterView.as_view(), name="async-register"),
+    path("async/login/", AsyncLoginView.as_view(), name="async-login"),
+    # Async read endpoints (same RBAC pages as their sync counterparts)
+    path(
+        "async/profiles/<str:username>/",
+        AsyncProfileView.as_view(),
+        name="async-profile-detail",
+    ),
+    path(
+        "async/profiles/<str:username>/followers/",
+        AsyncFollowersView.as_view(),
+        name="async-followers",
+    ),
+    path(
+        "async/profiles/<str:username>/following/",
+        AsyncFollowingView.as_view(),
+        name="async-following",
+    ),
+    path("async/settings/", AsyncUserSettingsView.as_view(), name="async-settings"),
     path(
         "admin/assign-permission/",
         AssignUserPermissionView.as_view(),
         name="assign-permission",
     ),
+    path("admin/cache-stats/", CacheStatsView.as_view(), name="cache-stats"),
     path("profiles/<str:username>/", ProfileView.as_view(), name="profile-detail"),
     path(
         "profiles/<str:username>/followers/", FollowersView.as_view(), name="followers"
@@ -37,6 +70,9 @@ urlpatterns = [
         FollowActionView.as_view(),
         name="follow-action",
     ),
+    path("follows/bulk/", BulkFollowView.as_view(), name="bulk-follow"),
+    path("suggestions/", SuggestedFollowsView.as_view(), name="suggested-follows"),
+    path("follow-requests/", FollowRequestInboxView.as_view(), name="follow-requests"),
     path(
         "follow-requests/<int:request_id>/",
         FollowRequestRespondView.as_view(),
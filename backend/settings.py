@@ -14,7 +14,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.QueryInstrumentationMiddleware",  # No-op unless enabled
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # Must be before CommonMiddleware
     "easyaudit.middleware.easyaudit.EasyAuditMiddleware",
@@ -144,6 +145,129 @@ DATABASES = {
 }
 
 
+# Per-request SQL instrumentation (Server-Timing / X-DB-* response headers)
+QUERY_INSTRUMENTATION = config("QUERY_INSTRUMENTATION", default=False, cast=bool)
+
+
+# Follower/following search (see users.services.search)
+FOLLOW_SEARCH_BACKEND = config(
+    "FOLLOW_SEARCH_BACKEND", default="users.services.search.TrigramSearchBackend"
+)
+FOLLOW_SEARCH_TIMEOUT_MS = config("FOLLOW_SEARCH_TIMEOUT_MS", default=200, cast=int)
+# Mutual connections on profile pages (see users.services.mutuals). The local
+# cache holds whole id arrays, so keep it small.
+MUTUALS_CACHE_TIMEOUT = config("MUTUALS_CACHE_TIMEOUT", default=600, cast=int)
+MUTUALS_LOCAL_CACHE_TTL = config("MUTUALS_LOCAL_CACHE_TTL", default=5, cast=float)
+MUTUALS_LOCAL_CACHE_SIZE = config("MUTUALS_LOCAL_CACHE_SIZE", default=256, cast=int)
+MUTUALS_TOP_K = config("MUTUALS_TOP_K", default=3, cast=int)
+MUTUALS_NAME_CANDIDATES = config("MUTUALS_NAME_CANDIDATES", default=500, cast=int)
+# In-process adjacency cache of the follow graph (see users.services.graph)
+FOLLOW_GRAPH_CACHE = config("FOLLOW_GRAPH_CACHE", default=False, cast=bool)
+FOLLOW_GRAPH_MEMORY_BYTES = config(
+    "FOLLOW_GRAPH_MEMORY_BYTES", default=64 * 1024 * 1024, cast=int
+)
+FOLLOW_GRAPH_TTL = config("FOLLOW_GRAPH_TTL", default=30, cast=float)
+# Friend-of-friend suggestions (see users.services.suggestions)
+SUGGESTIONS_TOP_K = config("SUGGESTIONS_TOP_K", default=30, cast=int)
+SUGGESTIONS_RECENCY_HALF_LIFE_DAYS = config(
+    "SUGGESTIONS_RECENCY_HALF_LIFE_DAYS", default=30, cast=float
+)
+# Cached public profile responses (see users.services.profile_cache): fresh for
+# PROFILE_CACHE_TIMEOUT seconds, then served stale while one background refresh
+# runs, for at most PROFILE_CACHE_STALE_TTL more seconds.
+PROFILE_CACHE_TIMEOUT = config("PROFILE_CACHE_TIMEOUT", default=60, cast=int)
+PROFILE_CACHE_STALE_TTL = config("PROFILE_CACHE_STALE_TTL", default=300, cast=int)
+# Avatar derivatives (see users.services.avatars): square crops, one per size
+# and format, rendered by a pool of AVATAR_WORKERS background threads.
+AVATAR_SIZES = config("AVATAR_SIZES", default="48,150,320", cast=Csv(int))
+AVATAR_FORMATS = config("AVATAR_FORMATS", default="webp,jpeg", cast=Csv())
+AVATAR_DEFAULT_SIZE = config("AVATAR_DEFAULT_SIZE", default=150, cast=int)
+AVATAR_WORKERS = config("AVATAR_WORKERS", default=2, cast=int)
+AVATAR_QUALITY = config("AVATAR_QUALITY", default=82, cast=int)
+# Uploads are streamed to disk and rejected as soon as they break a limit
+# (see core.uploads).
+AVATAR_UPLOAD_MAX_BYTES = config(
+    "AVATAR_UPLOAD_MAX_BYTES", default=5 * 1024 * 1024, cast=int
+)
+AVATAR_UPLOAD_MAX_PIXELS = config(
+    "AVATAR_UPLOAD_MAX_PIXELS", default=40_000_000, cast=int
+)
+AVATAR_UPLOAD_MAX_DIMENSION = config(
+    "AVATAR_UPLOAD_MAX_DIMENSION", default=8192, cast=int
+)
+# Per-viewer block/mute exclusion sets (see users.services.visibility)
+VISIBILITY_CACHE_TIMEOUT = config("VISIBILITY_CACHE_TIMEOUT", default=600, cast=int)
+VISIBILITY_LOCAL_CACHE_TTL = config("VISIBILITY_LOCAL_CACHE_TTL", default=5, cast=float)
+VISIBILITY_LOCAL_CACHE_SIZE = config(
+    "VISIBILITY_LOCAL_CACHE_SIZE", default=10000, cast=int
+)
+# Upper bound on targets accepted by the bulk follow/unfollow endpoint
+FOLLOW_BULK_MAX_TARGETS = config("FOLLOW_BULK_MAX_TARGETS", default=200, cast=int)
+
+
+# Transactional outbox (see core.outbox): failed jobs are retried after
+# OUTBOX_BACKOFF_BASE * 2**(attempt - 1) seconds (jittered, capped at
+# OUTBOX_BACKOFF_MAX); a worker that holds a job for OUTBOX_LEASE_SECONDS is
+# presumed dead and the job is handed to another.
+OUTBOX_MAX_ATTEMPTS = config("OUTBOX_MAX_ATTEMPTS", default=8, cast=int)
+OUTBOX_BACKOFF_BASE = config("OUTBOX_BACKOFF_BASE", default=5, cast=float)
+OUTBOX_BACKOFF_MAX = config("OUTBOX_BACKOFF_MAX", default=3600, cast=float)
+OUTBOX_LEASE_SECONDS = config("OUTBOX_LEASE_SECONDS", default=300, cast=int)
+# Password hashing pool for the async (ASGI) auth endpoints (see core.hashing)
+PASSWORD_HASH_POOL_KIND = config("PASSWORD_HASH_POOL_KIND", default="thread")
+PASSWORD_HASH_POOL_WORKERS = config(
+    "PASSWORD_HASH_POOL_WORKERS", default=os.cpu_count() or 1, cast=int
+)
+PASSWORD_HASH_POOL_MAX_PENDING = config(
+    "PASSWORD_HASH_POOL_MAX_PENDING", default=4 * (os.cpu_count() or 1), cast=int
+)
+
+
+# RBAC grants cache (see rbac.grants)
+RBAC_CACHE_TIMEOUT = config("RBAC_CACHE_TIMEOUT", default=300, cast=int)
+RBAC_LOCAL_CACHE_TTL = config("RBAC_LOCAL_CACHE_TTL", default=5, cast=float)
+RBAC_LOCAL_CACHE_SIZE = config("RBAC_LOCAL_CACHE_SIZE", default=10000, cast=int)
+# Embed compiled grants in JWT access tokens (see rbac.tokens)
+RBAC_JWT_GRANTS = config("RBAC_JWT_GRANTS", default=False, cast=bool)
+RBAC_JWT_VERSION_CHECK = config("RBAC_JWT_VERSION_CHECK", default=True, cast=bool)
+
+
+# Shared cache. Without REDIS_URL every worker process gets its own LocMem
+# cache, so cached grants and users are only shared within a process.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Token-bucket storage for core.throttling (see core.ratelimit). Without
+# REDIS_URL buckets are per process; set THROTTLE_BACKEND to
+# core.ratelimit.PostgresTokenBucketBackend to share them through the database
+# (one write per throttled request).
+THROTTLE_BACKEND = config(
+    "THROTTLE_BACKEND",
+    default=(
+        "core.ratelimit.RedisTokenBucketBackend"
+        if REDIS_URL
+        else "core.ratelimit.LocalTokenBucketBackend"
+    ),
+)
+THROTTLE_DATABASE = config("THROTTLE_DATABASE", default="default")
+
+
+# Authenticated-user cache for CachedJWTAuthentication (see core.authentication)
+AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", default=300, cast=int)
+AUTH_USER_LOCAL_CACHE_TTL = config("AUTH_USER_LOCAL_CACHE_TTL", default=5, cast=float)
+AUTH_USER_LOCAL_CACHE_SIZE = config(
+    "AUTH_USER_LOCAL_CACHE_SIZE", default=10000, cast=int
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -170,6 +294,8 @@ EMAIL_USE_TLS = True
 EMAIL_PORT = config("EMAIL_PORT")
 EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
+# Scheme and host for links in emails sent outside a request (users.jobs)
+SITE_URL = config("SITE_URL", default="http://localhost:8000")
 
 
 # Internationalization
@@ -193,6 +319,13 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 # Media files (User uploads)
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Media is stored once per distinct content (see core.storage); blobs nobody
+# references any more are removed by ``gc_media`` after MEDIA_GC_GRACE_SECONDS.
+STORAGES = {
+    "default": {"BACKEND": "core.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+MEDIA_GC_GRACE_SECONDS = config("MEDIA_GC_GRACE_SECONDS", default=3600, cast=int)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -203,7 +336,7 @@ AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -214,7 +347,7 @@ REST_FRAMEWORK = {
     #     "rest_framework.renderers.JSONRenderer",
     # ],
     "DEFAULT_PAGINATION_CLASS": "core.pagination.DefaultPagination",
-    "DeFAULT_THROTTLE_CLASSES": (
+    "DEFAULT_THROTTLE_CLASSES": (
         "core.throttling.AnonBurstRateThrottle",
         "core.throttling.AnonSustainedRateThrottle",
         "core.throttling.UserBurstRateThrottle",
@@ -247,6 +380,7 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
+    "TOKEN_REFRESH_SERIALIZER": "rbac.tokens.GrantsTokenRefreshSerializer",
 }
 
 
@@ -288,5 +422,20 @@ LOGGING = {
             "level": "DEBUG",
             "propagate": False,
         },
+        "core": {
+            "handlers": ["console", "file"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "users": {
+            "handlers": ["console", "file"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "rbac": {
+            "handlers": ["console", "file"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
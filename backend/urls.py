@@ -23,6 +23,8 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from core.views import serve_media
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
@@ -30,5 +32,7 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(
+        settings.MEDIA_URL, serve_media, document_root=settings.MEDIA_ROOT
+    )
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def local_throttle_backend(settings):
+    # Keep throttle checks off the database so query budgets stay per-view.
+    settings.THROTTLE_BACKEND = "core.ratelimit.LocalTokenBucketBackend"
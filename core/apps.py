@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+
+    def ready(self):
+        import core.signals  # noqa: F401
+        from core.ratelimit import ensure_throttle_table
+
+        post_migrate.connect(ensure_throttle_table, sender=self)
@@ -0,0 +1,163 @@
+"""
+Minimal async counterpart of DRF's ``APIView`` for endpoints served over ASGI.
+
+DRF views are synchronous, so under ``backend/asgi.py`` every request is pushed
+through a thread executor. Views built on ``AsyncAPIView`` run on the event
+loop and only leave it for blocking work (ORM calls via the async ORM or
+``sync_to_async``, password hashing via ``core.hashing``).
+
+Authentication, permission and throttle classes default to the same
+``REST_FRAMEWORK`` settings the sync views use and are checked in the same
+order. Classes with an async hook (``aauthenticate``, ``ahas_permission``,
+``aallow_request``) are awaited. DRF's plain request-attribute permissions run
+inline, and anything else runs through ``sync_to_async``.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, permissions
+from rest_framework.settings import api_settings
+
+from core.hashing import HashPoolSaturated
+
+# Permissions that only look at request attributes; no need to leave the loop.
+INLINE_PERMISSIONS = (
+    permissions.AllowAny,
+    permissions.IsAuthenticated,
+    permissions.IsAdminUser,
+    permissions.IsAuthenticatedOrReadOnly,
+)
+
+
+class AsyncAPIView(View):
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    throttle_classes = []
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # JWT-authenticated API, same as rest_framework.views.APIView.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        # DRF-style alias, so permissions and paginators work unchanged.
+        request.query_params = request.GET
+        try:
+            await self.authenticate(request)
+            await self.check_permissions(request)
+        except exceptions.APIException as exc:
+            return self.exception_response(request, exc)
+
+        wait = await self.check_throttles(request)
+        if wait is not None:
+            response = JsonResponse({"detail": "Request was throttled."}, status=429)
+            response["Retry-After"] = str(int(wait) + 1)
+            return response
+
+        try:
+            request.data = self.parse_body(request)
+        except ValueError:
+            return JsonResponse({"detail": "Malformed JSON body."}, status=400)
+
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except HashPoolSaturated:
+            response = JsonResponse(
+                {"detail": "Server is busy, please retry shortly."}, status=503
+            )
+            response["Retry-After"] = "1"
+            return response
+        except Http404:
+            return self.exception_response(request, exceptions.NotFound())
+        except exceptions.APIException as exc:
+            return self.exception_response(request, exc)
+
+    async def authenticate(self, request):
+        """Set ``request.user`` / ``request.auth`` like DRF's ``Request`` does."""
+        request.user, request.auth = AnonymousUser(), None
+        request.authenticator = None
+        for authenticator in (cls() for cls in self.authentication_classes):
+            if hasattr(authenticator, "aauthenticate"):
+                result = await authenticator.aauthenticate(request)
+            else:
+                result = await sync_to_async(authenticator.authenticate)(request)
+            if result is not None:
+                request.user, request.auth = result
+                request.authenticator = authenticator
+                return
+
+    async def check_permissions(self, request):
+        for permission in (cls() for cls in self.permission_classes):
+            if not await self._allowed(permission, "has_permission", request):
+                self.permission_denied(request, permission)
+
+    async def check_object_permissions(self, request, obj):
+        for permission in (cls() for cls in self.permission_classes):
+            if not await self._allowed(
+                permission, "has_object_permission", request, obj
+            ):
+                self.permission_denied(request, permission)
+
+    async def _allowed(self, permission, check, request, *args):
+        async_check = getattr(permission, f"a{check}", None)
+        if async_check is not None:
+            return await async_check(request, self, *args)
+        sync_check = getattr(permission, check)
+        if isinstance(permission, INLINE_PERMISSIONS):
+            return sync_check(request, self, *args)
+        return await sync_to_async(sync_check)(request, self, *args)
+
+    def permission_denied(self, request, permission):
+        if self.authentication_classes and request.authenticator is None:
+            raise exceptions.NotAuthenticated
+        raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    async def check_throttles(self, request):
+        """Return the longest wait in seconds if any throttle rejects the request."""
+        waits = []
+        for throttle in (cls() for cls in self.throttle_classes):
+            if hasattr(throttle, "aallow_request"):
+                allowed = await throttle.aallow_request(request, self)
+            else:
+                allowed = await sync_to_async(throttle.allow_request)(request, self)
+            if not allowed:
+                waits.append(throttle.wait() or 0)
+        return max(waits) if waits else None
+
+    def exception_response(self, request, exc):
+        """Render ``exc`` the way DRF's default exception handler does."""
+        data = exc.detail
+        if not isinstance(data, dict | list):
+            data = {"detail": data}
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+        if isinstance(
+            exc, exceptions.NotAuthenticated | exceptions.AuthenticationFailed
+        ):
+            header = self.authenticate_header(request)
+            if header:
+                response["WWW-Authenticate"] = header
+            else:
+                response.status_code = 403
+        return response
+
+    def authenticate_header(self, request):
+        for cls in self.authentication_classes:
+            return cls().authenticate_header(request)
+        return None
+
+    @staticmethod
+    def parse_body(request):
+        if request.method not in ("POST", "PUT", "PATCH") or not request.body:
+            return {}
+        if request.content_type == "application/json":
+            data = json.loads(request.body)
+            if not isinstance(data, dict):
+                raise ValueError("JSON body must be an object")
+            return data
+        return request.POST.dict()
@@ -0,0 +1,162 @@
+"""
+JWT authentication with cached user loading.
+
+``JWTAuthentication`` fetches the ``User`` row on every authenticated request.
+``CachedJWTAuthentication`` keeps recently seen users in a short-TTL in-process
+LRU backed by the shared Django cache. ``core.signals`` drops a user's entry on
+every save or delete, which covers deactivation and password changes; other
+processes notice within ``AUTH_USER_LOCAL_CACHE_TTL`` seconds.
+
+Entries hold the user's field values without the password hash, plus the
+digest SimpleJWT's revocation check compares the token against. Users built
+from an entry have ``password`` deferred, as with ``.only()``.
+
+``aauthenticate`` is the async variant used by ``core.async_views``. It reads
+the same caches and loads cold users with the async ORM.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.cache import MISSING, LocalTTLCache
+
+_local = LocalTTLCache(
+    maxsize=settings.AUTH_USER_LOCAL_CACHE_SIZE, ttl=settings.AUTH_USER_LOCAL_CACHE_TTL
+)
+_stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+
+def _cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    key = _cache_key(user_id)
+
+    def _drop():
+        _local.delete(key)
+        cache.delete(key)
+
+    _drop()
+    transaction.on_commit(_drop)
+
+
+def user_cache_stats():
+    """Hit/miss counters for this process since start-up."""
+    lookups = sum(_stats.values())
+    hits = _stats["local_hits"] + _stats["shared_hits"]
+    return {
+        **_stats,
+        "lookups": lookups,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+    }
+
+
+def _entry(user):
+    """Build the cache entry for ``user``: everything but the password hash."""
+    return {
+        "values": {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname != "password"
+        },
+        "password_digest": get_md5_hash_password(user.password),
+    }
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        key = _cache_key(self._user_id(validated_token))
+        entry = _local.get(key)
+        if entry is not MISSING:
+            _stats["local_hits"] += 1
+        else:
+            entry = cache.get(key)
+            if entry is not None:
+                _stats["shared_hits"] += 1
+            else:
+                _stats["misses"] += 1
+                # Loads the row and runs SimpleJWT's active/revocation checks.
+                user = super().get_user(validated_token)
+                entry = _entry(user)
+                cache.set(key, entry, settings.AUTH_USER_CACHE_TIMEOUT)
+                _local.set(key, entry)
+                return user
+            _local.set(key, entry)
+
+        return self._restore(entry, validated_token)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        key = _cache_key(user_id)
+        entry = _local.get(key)
+        if entry is not MISSING:
+            _stats["local_hits"] += 1
+        else:
+            entry = await cache.aget(key)
+            if entry is not None:
+                _stats["shared_hits"] += 1
+            else:
+                _stats["misses"] += 1
+                try:
+                    user = await self.user_model.objects.aget(
+                        **{api_settings.USER_ID_FIELD: user_id}
+                    )
+                except self.user_model.DoesNotExist:
+                    raise AuthenticationFailed(
+                        _("User not found"), code="user_not_found"
+                    ) from None
+                entry = _entry(user)
+                self._check_user(entry, validated_token)
+                await cache.aset(key, entry, settings.AUTH_USER_CACHE_TIMEOUT)
+                _local.set(key, entry)
+                return user
+            _local.set(key, entry)
+
+        return self._restore(entry, validated_token)
+
+    def _restore(self, entry, validated_token):
+        self._check_user(entry, validated_token)
+        # Each request gets its own instance; the password loads on access.
+        values = entry["values"]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model), list(values), list(values.values())
+        )
+
+    @staticmethod
+    def _user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from None
+
+    @staticmethod
+    def _check_user(entry, validated_token):
+        if not entry["values"]["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            != entry["password_digest"]
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
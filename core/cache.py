@@ -0,0 +1,70 @@
+"""Small in-process caches used in front of the shared Django cache."""
+
+import threading
+import weakref
+from collections import OrderedDict
+from time import monotonic
+
+MISSING = object()
+
+_instances = weakref.WeakSet()
+
+
+def clear_local_caches():
+    """Empty every ``LocalTTLCache`` in this process (tests, cache flushes)."""
+    for instance in list(_instances):
+        instance.clear()
+
+
+def track_local_cache(instance):
+    """Include another in-process cache (anything with ``clear()``) in ``clear_local_caches``."""
+    _instances.add(instance)
+
+
+class LocalTTLCache:
+    """
+    Thread-safe LRU with a per-entry TTL.
+
+    Entries live in this process only, so the TTL bounds how long another
+    process's invalidation can go unnoticed. ``hits`` / ``misses`` are kept for
+    hit-ratio reporting.
+    """
+
+    def __init__(self, maxsize=10_000, ttl=5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        track_local_cache(self)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,124 @@
+"""
+Bounded worker pool for password hashing on the async (ASGI) path.
+
+PBKDF2 deliberately burns CPU for tens of milliseconds. Running it on the event
+loop would stall every other connection, so the async login/register views hand
+it to this pool instead. The pool is bounded: once ``PASSWORD_HASH_POOL_MAX_PENDING``
+hashes are queued or running, new work is rejected with ``HashPoolSaturated``
+and the view sheds load with a 503 instead of queueing without limit.
+
+Settings:
+
+* ``PASSWORD_HASH_POOL_KIND``: ``"thread"`` (default; ``hashlib`` releases the
+  GIL while hashing) or ``"process"``.
+* ``PASSWORD_HASH_POOL_WORKERS``: number of workers (default: CPU count).
+* ``PASSWORD_HASH_POOL_MAX_PENDING``: queued + running hashes before shedding.
+
+Batch jobs (``import_users``) hash with ``make_passwords`` on an executor from
+``process_executor`` instead.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class HashPoolSaturated(Exception):
+    """Too many hashes are already queued; the caller should shed the request."""
+
+
+def _init_process_worker():
+    import django
+
+    django.setup()
+
+
+def _check_password(password, encoded):
+    """Return ``(matches, needs_rehash)`` for ``password`` against ``encoded``."""
+    if not hashers.check_password(password, encoded):
+        return False, False
+    return True, hashers.identify_hasher(encoded).must_update(encoded)
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+def process_executor(workers):
+    """Return a ``ProcessPoolExecutor`` whose workers have Django set up."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_process_worker)
+
+
+def make_passwords(passwords, executor=None):
+    """
+    Hash every password in ``passwords``; return an iterator of the results.
+
+    The work is spread over ``executor`` (see ``process_executor``) in chunks,
+    or done in this process, lazily, when it is None.
+    """
+    if executor is None:
+        return map(_make_password, passwords)
+    passwords = list(passwords)
+    return executor.map(
+        _make_password, passwords, chunksize=max(1, len(passwords) // 64)
+    )
+
+
+class PasswordHashPool:
+    def __init__(self, workers=None, max_pending=None, kind="thread"):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        if kind == "process":
+            self.executor = process_executor(self.workers)
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashPoolSaturated
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def check_password(self, password, encoded):
+        return await self.run(_check_password, password, encoded)
+
+    async def make_password(self, password):
+        return await self.run(_make_password, password)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordHashPool(
+                    workers=settings.PASSWORD_HASH_POOL_WORKERS,
+                    max_pending=settings.PASSWORD_HASH_POOL_MAX_PENDING,
+                    kind=settings.PASSWORD_HASH_POOL_KIND,
+                )
+    return _pool
@@ -0,0 +1,53 @@
+"""
+Per-request SQL instrumentation.
+
+``QueryRecorder`` is installed with ``connection.execute_wrapper`` and records
+how many statements ran, how long the database took and which statements were
+repeated with the same SQL (the usual signature of an N+1).
+"""
+
+from collections import Counter
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.db import connections
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    @property
+    def duplicates(self):
+        """SQL statements that ran more than once, with their repeat count."""
+        return {sql: n for sql, n in self.statements.items() if n > 1}
+
+    def record(self, aliases=None):
+        """Install the recorder on ``aliases`` (all connections by default)."""
+        stack = ExitStack()
+        for alias in aliases or connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+    def summary(self):
+        lines = [
+            f"{self.count} queries in {self.duration_ms:.1f}ms",
+        ]
+        for sql, n in sorted(self.duplicates.items(), key=lambda item: -item[1]):
+            lines.append(f"  x{n}: {sql}")
+        return "\n".join(lines)
@@ -0,0 +1,56 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed media blobs that have been unreferenced for "
+        "longer than MEDIA_GC_GRACE_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-seconds",
+            type=int,
+            default=None,
+            help="Override MEDIA_GC_GRACE_SECONDS.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Blobs examined per sweep.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Keep sweeping every this many seconds instead of exiting.",
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("The default storage is not content-addressed.")
+        grace = options["grace_seconds"]
+        if grace is None:
+            grace = settings.MEDIA_GC_GRACE_SECONDS
+        while True:
+            removed = 0
+            # A full batch means there may be more; sweep again right away.
+            while True:
+                batch = default_storage.collect_garbage(
+                    timedelta(seconds=grace), options["batch_size"]
+                )
+                removed += batch
+                if batch < options["batch_size"]:
+                    break
+            self.stdout.write(f"Removed {removed} unreferenced media blobs.")
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
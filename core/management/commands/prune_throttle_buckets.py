@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ratelimit import PostgresTokenBucketBackend, get_throttle_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete idle rows from the PostgreSQL throttle table. A pruned bucket "
+        "would have been full again anyway."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--idle-seconds",
+            type=int,
+            default=86_400,
+            help="Delete buckets untouched for this long (default: one day).",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_throttle_backend()
+        if not isinstance(backend, PostgresTokenBucketBackend):
+            raise CommandError("THROTTLE_BACKEND is not the PostgreSQL backend.")
+        deleted = backend.prune(options["idle_seconds"])
+        self.stdout.write(f"Deleted {deleted} idle throttle buckets.")
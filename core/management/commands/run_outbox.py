@@ -0,0 +1,41 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued outbox jobs (welcome emails and other deferred side "
+        "effects) on a local thread pool. Any number of workers may run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="Number of jobs run in parallel.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before looking again when no job is due.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no job is due instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            threads=options["threads"], poll_interval=options["poll_interval"]
+        )
+        # Finish the jobs in flight, then exit.
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        processed = worker.run(once=options["once"])
+        self.stdout.write(f"Ran {processed} outbox jobs.")
@@ -0,0 +1,57 @@
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.instrumentation import QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record query count, DB time and duplicated SQL for every request.
+
+    Enabled with the ``QUERY_INSTRUMENTATION`` setting. The numbers are exposed
+    as a ``Server-Timing`` header plus ``X-DB-Query-Count`` /
+    ``X-DB-Duplicate-Queries``, and a warning is logged when a view declares a
+    ``query_budget`` and the request goes over it.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = perf_counter()
+        with recorder.record():
+            response = self.get_response(request)
+        total_ms = (perf_counter() - start) * 1000
+
+        duplicates = sum(n - 1 for n in recorder.duplicates.values())
+        response["Server-Timing"] = (
+            f'db;dur={recorder.duration_ms:.2f};desc="{recorder.count} queries", '
+            f"total;dur={total_ms:.2f}"
+        )
+        response["X-DB-Query-Count"] = str(recorder.count)
+        response["X-DB-Duplicate-Queries"] = str(duplicates)
+
+        budget = self._view_budget(request)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                "Query budget exceeded: %s %s ran %s (budget %s)",
+                request.method,
+                request.path,
+                recorder.summary(),
+                budget,
+            )
+        return response
+
+    @staticmethod
+    def _view_budget(request):
+        match = getattr(request, "resolver_match", None)
+        view_class = getattr(getattr(match, "func", None), "view_class", None)
+        return getattr(view_class, "query_budget", None)
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # ---------- Base mixins ----------
 
@@ -9,3 +10,77 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+# ---------- Media ----------
+
+
+class MediaBlob(models.Model):
+    """
+    A file stored once under its content hash by ``core.storage``.
+
+    ``refcount`` counts the saves of that content not yet deleted; the
+    ``gc_media`` command removes blobs that stayed unreferenced for a while.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When refcount last dropped to zero; NULL while referenced.
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["released_at"],
+                name="mediablob_released",
+                condition=models.Q(refcount=0),
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+# ---------- Outbox ----------
+
+
+class OutboxJob(TimeStampedModel):
+    """
+    Deferred work queued in the same transaction as the change it follows.
+
+    See ``core.outbox``: ``run_outbox`` workers claim due jobs and delete them
+    once their handler succeeds; jobs out of attempts stay as ``failed``.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=8)
+    # When a pending job is due; for a running one, when its worker's lease
+    # expires and another worker may take it over.
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["run_at"],
+                name="outboxjob_due",
+                condition=models.Q(status__in=["pending", "running"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -0,0 +1,185 @@
+"""
+Transactional outbox and its worker.
+
+Side effects that must not slow down or fail a request (emails, webhooks,
+fan-out) are queued with ``enqueue`` as ``core.models.OutboxJob`` rows. The
+INSERT is part of the caller's transaction, so a job exists exactly when the
+change it follows was committed, and it is only visible to workers after
+that commit. No broker is involved.
+
+Handlers are plain functions registered under a task name::
+
+    @job("users.send_welcome_email")
+    def send_welcome_email(user_id): ...
+
+and are looked up in ``<app>/jobs.py`` modules, which the worker imports.
+``python manage.py run_outbox`` runs a ``Worker``: it claims due jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED`` (so any number of workers can share the
+table) and runs them on a thread pool. A job that succeeds is deleted. One
+that raises is retried with jittered exponential backoff until
+``max_attempts``, then kept as ``failed`` with its last error. A claim is a
+lease of ``OUTBOX_LEASE_SECONDS``: if the worker dies, the job becomes due
+again, so delivery is at-least-once and handlers should be idempotent.
+"""
+
+import logging
+import random
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core.models import OutboxJob
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def job(task):
+    """Register the decorated function as the handler of ``task``."""
+
+    def register(handler):
+        _handlers[task] = handler
+        return handler
+
+    return register
+
+
+def enqueue(task, payload=None, *, delay=None, max_attempts=None):
+    """
+    Queue ``task`` with keyword arguments ``payload`` (JSON-serializable).
+
+    Call it inside the transaction whose commit should trigger the job.
+    """
+    return OutboxJob.objects.create(
+        task=task,
+        payload=payload or {},
+        run_at=timezone.now() + (delay or timedelta(0)),
+        max_attempts=max_attempts or settings.OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def claim(limit, lease=None):
+    """Lease up to ``limit`` due jobs to the caller and return them."""
+    now = timezone.now()
+    lease = lease or timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    with transaction.atomic():
+        jobs = list(
+            OutboxJob.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[OutboxJob.PENDING, OutboxJob.RUNNING], run_at__lte=now)
+            .order_by("run_at")[:limit]
+        )
+        if jobs:
+            OutboxJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=OutboxJob.RUNNING,
+                run_at=now + lease,
+                attempts=F("attempts") + 1,
+            )
+    for job in jobs:
+        job.status, job.run_at, job.attempts = (
+            OutboxJob.RUNNING,
+            now + lease,
+            job.attempts + 1,
+        )
+    return jobs
+
+
+def backoff(attempts):
+    """Delay before retrying a job that has failed ``attempts`` times."""
+    delay = min(
+        settings.OUTBOX_BACKOFF_MAX,
+        settings.OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1),
+    )
+    # Jitter over the upper half of the delay keeps a burst of failures from
+    # retrying in lockstep.
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def run(job):
+    """Run one claimed job and record the outcome."""
+    # Matching on attempts leaves the row alone if the lease expired and
+    # another worker has claimed the job since.
+    claimed = OutboxJob.objects.filter(pk=job.pk, attempts=job.attempts)
+    try:
+        handler = _handlers.get(job.task)
+        if handler is None:
+            raise LookupError(f"No outbox handler registered for {job.task!r}.")
+        handler(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error("Outbox job %s gave up: %s", job, error)
+            claimed.update(status=OutboxJob.FAILED, last_error=error)
+        else:
+            logger.warning("Outbox job %s failed, will retry: %s", job, error)
+            claimed.update(
+                status=OutboxJob.PENDING,
+                run_at=timezone.now() + backoff(job.attempts),
+                last_error=error,
+            )
+        return False
+    claimed.delete()
+    return True
+
+
+def load_handlers():
+    autodiscover_modules("jobs")
+
+
+class Worker:
+    """Claim due jobs and run them on ``threads`` threads until stopped."""
+
+    def __init__(self, threads=4, poll_interval=1.0, lease=None):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._stopping = threading.Event()
+        self._idle = threading.Semaphore(threads)
+
+    def stop(self):
+        self._stopping.set()
+
+    def run(self, once=False):
+        """
+        Process jobs until ``stop`` is called.
+
+        With ``once``, return as soon as no job is due. Return the number of
+        jobs run.
+        """
+        load_handlers()
+        processed = 0
+        with ThreadPoolExecutor(
+            max_workers=self.threads, thread_name_prefix="outbox"
+        ) as pool:
+            while not self._stopping.is_set():
+                # Only claim what a free thread can start right away, so
+                # leases are not spent waiting in the pool's queue.
+                self._idle.acquire()
+                free = 1
+                while free < self.threads and self._idle.acquire(blocking=False):
+                    free += 1
+                jobs = claim(free, self.lease)
+                for _ in range(free - len(jobs)):
+                    self._idle.release()
+                for job in jobs:
+                    pool.submit(self._run, job)
+                processed += len(jobs)
+                if not jobs:
+                    if once:
+                        break
+                    self._stopping.wait(self.poll_interval)
+        return processed
+
+    def _run(self, job):
+        try:
+            run(job)
+        finally:
+            close_old_connections()
+            self._idle.release()
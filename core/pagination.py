@@ -1,7 +1,247 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class DefaultPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 50
+
+
+def estimate_count(queryset):
+    """
+    Return a cheap row estimate for ``queryset``.
+
+    On PostgreSQL this is the planner's estimate (no table scan); other backends
+    fall back to an exact ``COUNT(*)``.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _run_scan(steps):
+    """Drive a ``KeysetPagination._scan`` generator with plain ``list()`` fetches."""
+    try:
+        batch = steps.send(None)
+        while True:
+            batch = steps.send(list(batch))
+    except StopIteration as done:
+        return done.value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on ``(created_at, id)``, newest first.
+
+    Each page is a single indexed range scan: no ``OFFSET`` and no ``COUNT(*)``.
+    ``next``/``previous`` are opaque cursors. A total is only returned when the
+    client asks for it with ``?include_total=true``; views can pass an exact
+    ``total_hint`` (e.g. a denormalized counter), otherwise it is estimated.
+
+    Clients that still send ``?page=`` get the old page-number behaviour.
+    ``apaginate_queryset`` is the async-ORM variant for ``core.async_views``.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    cursor_query_param = "cursor"
+    total_query_param = "include_total"
+    legacy_query_param = "page"
+    legacy_pagination_class = DefaultPagination
+    invalid_cursor_message = "Invalid cursor"
+    max_filter_passes = 3
+
+    def paginate_queryset(
+        self, queryset, request, view=None, total_hint=None, row_filter=None
+    ):
+        """
+        Return one page of ``queryset``.
+
+        ``row_filter(obj) -> bool`` drops rows after they are fetched (e.g.
+        block/mute visibility). Scanning continues past dropped rows for up to
+        ``max_filter_passes`` batches. The cursors point past every scanned row,
+        so hidden rows are never re-read.
+        """
+        self.request = request
+        self.legacy = None
+        if self.legacy_query_param in request.query_params:
+            self.legacy = self.legacy_pagination_class()
+            page = self.legacy.paginate_queryset(
+                queryset.order_by("-created_at", "-id"), request, view=view
+            )
+            if row_filter is not None and page is not None:
+                page = [obj for obj in page if row_filter(obj)]
+            return page
+
+        queryset, scan, position, reverse = self._start(queryset, request)
+        scanned = _run_scan(self._scan(queryset, scan, reverse, row_filter))
+        total = None
+        if self._wants_total(request):
+            total = total_hint if total_hint is not None else estimate_count(queryset)
+        return self._finish(scanned, position, reverse, total)
+
+    async def apaginate_queryset(
+        self, queryset, request, view=None, total_hint=None, row_filter=None
+    ):
+        """Async ``paginate_queryset``: each batch is fetched with ``async for``."""
+        if self.legacy_query_param in request.query_params:
+            return await sync_to_async(self.paginate_queryset)(
+                queryset, request, view, total_hint, row_filter
+            )
+        queryset, scan, position, reverse = self._start(queryset, request)
+        steps = self._scan(queryset, scan, reverse, row_filter)
+        try:
+            batch = steps.send(None)
+            while True:
+                batch = steps.send([obj async for obj in batch])
+        except StopIteration as done:
+            scanned = done.value
+        total = None
+        if self._wants_total(request):
+            total = total_hint
+            if total is None:
+                total = await sync_to_async(estimate_count)(queryset)
+        return self._finish(scanned, position, reverse, total)
+
+    def _start(self, queryset, request):
+        self.request = request
+        self.legacy = None
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        if reverse:
+            ordered = queryset.order_by("created_at", "id")
+        else:
+            ordered = queryset.order_by("-created_at", "-id")
+        scan = ordered
+        if position is not None:
+            scan = ordered.filter(self._after(position, reverse))
+        return ordered, scan, position, reverse
+
+    def _finish(self, scanned, position, reverse, total):
+        results, first, last, has_more = scanned
+        if reverse:
+            results.reverse()
+            self.has_previous, self.has_next = has_more, True
+            self._anchors = (last, first)
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+            self._anchors = (first, last)
+        self.total = total
+        self.page = results
+        return results
+
+    def _scan(self, queryset, scan, reverse, row_filter):
+        """
+        Collect up to ``page_size`` rows that pass ``row_filter``.
+
+        A generator: it yields each batch queryset to fetch and is sent back the
+        fetched rows, so the sync and async paths share one implementation.
+        Returns ``(rows, first, last, has_more)``. ``first`` and ``last`` are the
+        first and last rows consumed, in scan order, whether they passed or not.
+        """
+        rows, first, last = [], None, None
+        for _ in range(self.max_filter_passes if row_filter else 1):
+            batch = yield scan[: self.page_size + 1]
+            for obj in batch:
+                visible = row_filter is None or row_filter(obj)
+                if visible and len(rows) == self.page_size:
+                    return rows, first, last, True
+                first = first or obj
+                last = obj
+                if visible:
+                    rows.append(obj)
+            if len(batch) <= self.page_size:
+                return rows, first, last, False
+            scan = queryset.filter(self._after((last.created_at, last.pk), reverse))
+        return rows, first, last, True
+
+    @staticmethod
+    def _after(position, reverse):
+        created_at, pk = position
+        if reverse:
+            return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+        return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        """Return the response body as a dict, for views without DRF's ``Response``."""
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data).data
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.total is not None:
+            payload["total"] = self.total
+        return payload
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        anchor = self._anchors[1]
+        if not self.has_next or anchor is None:
+            return None
+        return self._link(anchor, reverse=False)
+
+    def get_previous_link(self):
+        anchor = self._anchors[0]
+        if not self.has_previous or anchor is None:
+            return None
+        return self._link(anchor, reverse=True)
+
+    def _link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor((obj.created_at, obj.pk), reverse)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def _wants_total(self, request):
+        value = request.query_params.get(self.total_query_param, "")
+        return value.lower() in ("1", "true", "yes")
+
+    # ---------- Cursor encoding ----------
+
+    @staticmethod
+    def encode_cursor(position, reverse=False):
+        created_at, pk = position
+        raw = json.dumps({"t": created_at.isoformat(), "i": pk, "r": int(reverse)})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            position = (datetime.fromisoformat(data["t"]), int(data["i"]))
+            return position, bool(data.get("r"))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message) from None
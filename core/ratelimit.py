@@ -0,0 +1,218 @@
+"""
+Token-bucket storage for ``core.throttling``.
+
+Every backend implements ``consume(key, capacity, refill_rate, cost=1)``. The
+call refills the bucket for the time elapsed since the last check, takes
+``cost`` tokens if that many are available, and returns ``(allowed, wait)``.
+``wait`` is the number of seconds until the request would be allowed. It is
+``None`` when the request is allowed. Each check is one atomic round trip
+with constant cost: the bucket is two numbers, not a history of timestamps.
+
+* ``RedisTokenBucketBackend``: a Lua script run with ``EVALSHA``. It talks the
+  Redis protocol through ``redis-py``, so Redis, Valkey or any compatible
+  stand-in works.
+* ``PostgresTokenBucketBackend``: one ``INSERT ... ON CONFLICT DO UPDATE ...
+  RETURNING`` against an ``UNLOGGED`` table, created by ``ensure_throttle_table``
+  after ``migrate``.
+* ``LocalTokenBucketBackend``: in-process only, so each worker enforces the
+  limits on its own. The default when ``REDIS_URL`` is not set.
+
+``THROTTLE_BACKEND`` picks the backend. ``aconsume`` is the same check for
+``core.async_views``: the local backend answers on the event loop, the others
+run ``consume`` in a worker thread.
+"""
+
+import threading
+from time import monotonic
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from core.cache import MISSING, LocalTTLCache
+
+THROTTLE_TABLE = "core_throttle_bucket"
+
+
+def _wait_for(tokens, cost, refill_rate):
+    return max(0.0, (cost - tokens) / refill_rate)
+
+
+class TokenBucketBackend:
+    def consume(self, key, capacity, refill_rate, cost=1):
+        raise NotImplementedError
+
+    async def aconsume(self, key, capacity, refill_rate, cost=1):
+        return await sync_to_async(self.consume)(key, capacity, refill_rate, cost)
+
+
+class LocalTokenBucketBackend(TokenBucketBackend):
+    """Per-process buckets; limits are not shared between workers."""
+
+    def __init__(self, maxsize=100_000):
+        # Buckets idle for a day are full again anyway, so they can expire.
+        self._buckets = LocalTTLCache(maxsize=maxsize, ttl=86_400)
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        with self._lock:
+            now = monotonic()
+            state = self._buckets.get(key)
+            tokens, updated = (capacity, now) if state is MISSING else state
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets.set(key, (tokens, now))
+        return allowed, None if allowed else _wait_for(tokens, cost, refill_rate)
+
+    async def aconsume(self, key, capacity, refill_rate, cost=1):
+        # No I/O and a short critical section: safe to run on the event loop.
+        return self.consume(key, capacity, refill_rate, cost)
+
+
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisTokenBucketBackend(TokenBucketBackend):
+    """
+    Buckets in a Redis hash, updated by a server-side script.
+
+    The script reads the clock with ``TIME`` so workers with skewed clocks
+    agree, which needs Redis 5+ (or Valkey). Keys expire once the bucket would
+    be full again.
+    """
+
+    def __init__(self, url=None, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as exc:
+                raise ImproperlyConfigured(
+                    "RedisTokenBucketBackend requires the 'redis' package."
+                ) from exc
+            client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.client = client
+        self._script = client.register_script(TOKEN_BUCKET_LUA)
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        allowed, tokens = self._script(keys=[key], args=[capacity, refill_rate, cost])
+        if allowed:
+            return True, None
+        return False, _wait_for(float(tokens), cost, refill_rate)
+
+    async def aconsume(self, key, capacity, refill_rate, cost=1):
+        # The client's connection pool is thread-safe, so skip the shared
+        # thread-sensitive executor.
+        return await sync_to_async(self.consume, thread_sensitive=False)(
+            key, capacity, refill_rate, cost
+        )
+
+
+class PostgresTokenBucketBackend(TokenBucketBackend):
+    """
+    Buckets in an ``UNLOGGED`` PostgreSQL table.
+
+    The table skips the WAL. It is truncated after a crash, which only
+    refills every bucket. ``THROTTLE_DATABASE`` names the connection to use.
+    Point it at an autocommit alias when the default connection runs inside
+    request transactions, so bucket rows are not locked until the response.
+    """
+
+    def __init__(self, using=None):
+        self.using = using or settings.THROTTLE_DATABASE
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        refilled = (
+            "LEAST(EXCLUDED.capacity, b.tokens + EXTRACT(EPOCH FROM "
+            "statement_timestamp() - b.updated_at) * EXCLUDED.refill_rate)"
+        )
+        sql = f"""
+            INSERT INTO {THROTTLE_TABLE} AS b
+                (key, capacity, refill_rate, tokens, allowed, updated_at)
+            VALUES (%(key)s, %(capacity)s, %(rate)s, %(capacity)s - %(cost)s,
+                    %(capacity)s >= %(cost)s, statement_timestamp())
+            ON CONFLICT (key) DO UPDATE SET
+                capacity = EXCLUDED.capacity,
+                refill_rate = EXCLUDED.refill_rate,
+                allowed = {refilled} >= %(cost)s,
+                tokens = {refilled}
+                    - CASE WHEN {refilled} >= %(cost)s THEN %(cost)s ELSE 0 END,
+                updated_at = statement_timestamp()
+            RETURNING allowed, tokens
+        """
+        params = {"key": key, "capacity": capacity, "rate": refill_rate, "cost": cost}
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, params)
+            allowed, tokens = cursor.fetchone()
+        return allowed, None if allowed else _wait_for(tokens, cost, refill_rate)
+
+    def prune(self, idle_seconds):
+        """Delete buckets untouched for ``idle_seconds``; returns the row count."""
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {THROTTLE_TABLE} "
+                "WHERE updated_at < statement_timestamp() - make_interval(secs => %s)",
+                [idle_seconds],
+            )
+            return cursor.rowcount
+
+
+def ensure_throttle_table(using="default", **kwargs):
+    """
+    Create the ``UNLOGGED`` table behind ``PostgresTokenBucketBackend``.
+
+    Connected to ``post_migrate``. Does nothing on databases other than
+    PostgreSQL and on aliases other than ``THROTTLE_DATABASE``.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql" or using != settings.THROTTLE_DATABASE:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {THROTTLE_TABLE} (
+                key text PRIMARY KEY,
+                capacity double precision NOT NULL,
+                refill_rate double precision NOT NULL,
+                tokens double precision NOT NULL,
+                allowed boolean NOT NULL,
+                updated_at timestamptz NOT NULL
+            )
+            """
+        )
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_throttle_backend():
+    path = settings.THROTTLE_BACKEND
+    backend = _backends.get(path)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(path)
+            if backend is None:
+                backend = _backends[path] = import_string(path)()
+    return backend
@@ -0,0 +1,169 @@
+"""
+Content-addressed file storage with reference-counted deduplication.
+
+``ContentAddressedStorage`` ignores the name a file is saved under and stores
+it as ``cas/<aa>/<sha256><ext>``, where ``aa`` is the first byte of the
+SHA-256 digest. Identical uploads therefore share one file, and a stored
+name never changes content, so it can be served with a year-long
+``immutable`` cache header (see ``core.views.serve_media``).
+
+Each file has a ``core.models.MediaBlob`` row counting references: ``save``
+takes one and ``delete`` gives one back, so callers use the storage as
+usual. A blob whose count reaches zero is left on disk; ``collect_garbage``
+(``python manage.py gc_media``) removes the ones unreferenced for longer than
+a grace period. Until then, re-uploading the same content revives it.
+
+The file is written when ``save`` runs, but its row commits with the caller's
+transaction. A file whose save was rolled back has no row, so
+``collect_garbage`` first gives such files an unreferenced row released at
+their modification time, and they are collected like any other blob.
+
+Files stored before this backend existed have no blob row and are deleted
+directly, as ``FileSystemStorage`` would.
+"""
+
+import hashlib
+import os
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, When
+from django.db.models.functions import Now
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+from core.models import MediaBlob
+
+CAS_PREFIX = "cas"
+
+
+def _digest(content):
+    digest = hashlib.sha256()
+    size = 0
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    content.seek(0)
+    return digest.hexdigest(), size
+
+
+def _acquire(name, size):
+    referenced = {"refcount": F("refcount") + 1, "released_at": None}
+    if MediaBlob.objects.filter(name=name).update(**referenced):
+        return
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(name=name, size=size, refcount=1)
+    except IntegrityError:
+        # Another writer created the row first.
+        MediaBlob.objects.filter(name=name).update(**referenced)
+
+
+def _release(name):
+    """Drop one reference to ``name``; return whether it is a blob at all."""
+    updated = MediaBlob.objects.filter(name=name, refcount__gt=0).update(
+        refcount=F("refcount") - 1,
+        # Evaluated against the row before the update.
+        released_at=Case(When(refcount=1, then=Now()), default=None),
+    )
+    return bool(updated) or MediaBlob.objects.filter(name=name).exists()
+
+
+@deconstructible(path="core.storage.ContentAddressedStorage")
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest, size = _digest(content)
+        extension = os.path.splitext(name)[1].lower()[:10]
+        name = f"{CAS_PREFIX}/{digest[:2]}/{digest}{extension}"
+        validate_file_name(name, allow_relative_path=True)
+        # Take the reference first: a concurrent collect_garbage either has
+        # already removed the old row (and its file, which is rewritten
+        # below) or now sees a live reference and keeps it.
+        _acquire(name, size)
+        if not self.exists(name):
+            self._write(name, content)
+        return name
+
+    def _write(self, name, content):
+        # Written next to its final name and moved into place, so a reader
+        # never sees a partial file and racing writers of the same content
+        # simply replace each other.
+        partial = self._save(f"{name}.{uuid.uuid4().hex}.part", content)
+        os.replace(self.path(partial), self.path(name))
+
+    def delete(self, name):
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        if not _release(name):
+            super().delete(name)
+
+    def collect_garbage(self, grace=timedelta(hours=1), batch_size=500):
+        """
+        Remove blobs unreferenced for longer than ``grace``.
+
+        Return the number of blobs removed.
+        """
+        self._adopt_orphans()
+        cutoff = timezone.now() - grace
+        candidates = list(
+            MediaBlob.objects.filter(refcount=0, released_at__lt=cutoff)
+            .order_by("released_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        removed = 0
+        for pk in candidates:
+            with transaction.atomic():
+                # The row lock makes a concurrent save wait, then find no row
+                # and write the file again.
+                blob = (
+                    MediaBlob.objects.select_for_update(skip_locked=True)
+                    .filter(pk=pk, refcount=0)
+                    .first()
+                )
+                if blob is None:
+                    continue
+                super().delete(blob.name)
+                blob.delete()
+                removed += 1
+        return removed
+
+    def _adopt_orphans(self):
+        """Create a ``refcount=0`` row for every blob file that has none."""
+        root = self.path(CAS_PREFIX)
+        if not os.path.isdir(root):
+            return
+        for shard in os.scandir(root):
+            if not shard.is_dir():
+                continue
+            files = {
+                f"{CAS_PREFIX}/{shard.name}/{entry.name}": entry.stat()
+                for entry in os.scandir(shard.path)
+                if entry.is_file() and not entry.name.endswith(".part")
+            }
+            known = set(
+                MediaBlob.objects.filter(name__in=files).values_list("name", flat=True)
+            )
+            # The insert waits for a save still inserting the same name and
+            # skips it once that commits, so only rolled-back files are adopted.
+            MediaBlob.objects.bulk_create(
+                [
+                    MediaBlob(
+                        name=name,
+                        size=stat.st_size,
+                        refcount=0,
+                        released_at=datetime.fromtimestamp(stat.st_mtime, tz=UTC),
+                    )
+                    for name, stat in files.items()
+                    if name not in known
+                ],
+                ignore_conflicts=True,
+            )
@@ -0,0 +1,38 @@
+"""Test helpers for keeping endpoints inside their query budget."""
+
+from contextlib import ContextDecorator
+
+from core.instrumentation import QueryRecorder
+
+
+class query_budget(ContextDecorator):  # noqa: N801 - used like a function
+    """
+    Fail when the wrapped block or test runs more than ``max_queries``.
+
+    Usable as a decorator on a test or as a context manager around a single
+    request::
+
+        with query_budget(3):
+            api_client.get(url)
+
+    The failure message lists the repeated statements so N+1 regressions are
+    easy to spot.
+    """
+
+    def __init__(self, max_queries, aliases=None):
+        self.max_queries = max_queries
+        self.aliases = aliases
+
+    def __enter__(self):
+        self.recorder = QueryRecorder()
+        self._stack = self.recorder.record(self.aliases)
+        return self.recorder
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
+        if exc_type is None and self.recorder.count > self.max_queries:
+            raise AssertionError(
+                f"Query budget of {self.max_queries} exceeded: "
+                f"{self.recorder.summary()}"
+            )
+        return False
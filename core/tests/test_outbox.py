@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import outbox
+from core.models import OutboxJob
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+@outbox.job("tests.record")
+def record(value):
+    calls.append(value)
+
+
+@outbox.job("tests.explode")
+def explode():
+    raise RuntimeError("SMTP is down")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def _run_due():
+    return [outbox.run(job) for job in outbox.claim(10)]
+
+
+def test_job_is_queued_only_if_its_transaction_commits():
+    with pytest.raises(RuntimeError), transaction.atomic():
+        outbox.enqueue("tests.record", {"value": 1})
+        raise RuntimeError("registration failed")
+
+    assert not OutboxJob.objects.exists()
+
+
+def test_successful_job_runs_once_and_is_deleted():
+    outbox.enqueue("tests.record", {"value": "hello"})
+    outbox.enqueue("tests.record", {"value": "later"}, delay=timedelta(hours=1))
+
+    assert _run_due() == [True]
+    assert _run_due() == []
+    assert calls == ["hello"]
+    assert list(OutboxJob.objects.values_list("payload", flat=True)) == [
+        {"value": "later"}
+    ]
+
+
+def test_failures_back_off_then_give_up(settings):
+    settings.OUTBOX_BACKOFF_BASE = 10
+    queued = outbox.enqueue("tests.explode", max_attempts=2)
+
+    assert _run_due() == [False]
+    job = OutboxJob.objects.get(pk=queued.pk)
+    assert job.status == OutboxJob.PENDING and job.attempts == 1
+    assert "SMTP is down" in job.last_error
+    assert timezone.now() + timedelta(seconds=4) < job.run_at
+    assert _run_due() == []
+
+    OutboxJob.objects.update(run_at=timezone.now())
+    assert _run_due() == [False]
+    assert OutboxJob.objects.get(pk=queued.pk).status == OutboxJob.FAILED
+    OutboxJob.objects.update(run_at=timezone.now())
+    assert _run_due() == []
+
+
+def test_unknown_task_is_a_failure():
+    outbox.enqueue("tests.missing", max_attempts=1)
+
+    _run_due()
+
+    assert "No outbox handler" in OutboxJob.objects.get().last_error
+
+
+def test_expired_lease_is_taken_over():
+    outbox.enqueue("tests.record", {"value": "x"})
+    (stale,) = outbox.claim(10, lease=timedelta(seconds=-1))
+
+    (current,) = outbox.claim(10)
+    outbox.run(stale)
+
+    # The first worker's late result does not touch the new claim.
+    assert OutboxJob.objects.get().attempts == 2
+    assert outbox.run(current)
+    assert not OutboxJob.objects.exists()
+    assert calls == ["x", "x"]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("threads", [1, 3])
+def test_worker_drains_due_jobs(threads):
+    if threads > 1 and connection.vendor != "postgresql":
+        pytest.skip("concurrent writers need PostgreSQL")
+    for value in range(7):
+        outbox.enqueue("tests.record", {"value": value})
+
+    processed = outbox.Worker(threads=threads).run(once=True)
+
+    assert processed == 7
+    assert sorted(calls) == list(range(7))
+    assert not OutboxJob.objects.exists()
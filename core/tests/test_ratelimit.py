@@ -0,0 +1,99 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from core import ratelimit
+from core.ratelimit import (
+    LocalTokenBucketBackend,
+    PostgresTokenBucketBackend,
+    RedisTokenBucketBackend,
+    ensure_throttle_table,
+)
+from core.throttling import AnonBurstRateThrottle
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit, "monotonic", lambda: now[0])
+    return now
+
+
+def _drain(backend, key, capacity=3, refill_rate=1.0):
+    return [backend.consume(key, capacity, refill_rate) for _ in range(capacity + 1)]
+
+
+def test_local_bucket_allows_burst_then_reports_wait(clock):
+    results = _drain(LocalTokenBucketBackend(), "k")
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(1.0)
+
+
+def test_local_bucket_refills_over_time(clock):
+    backend = LocalTokenBucketBackend()
+    _drain(backend, "k")
+
+    clock[0] += 2.0
+    assert backend.consume("k", 3, 1.0)[0]
+    assert backend.consume("k", 3, 1.0)[0]
+    assert not backend.consume("k", 3, 1.0)[0]
+
+
+def test_local_bucket_state_does_not_grow_with_rate(clock):
+    backend = LocalTokenBucketBackend()
+    for _ in range(5000):
+        backend.consume("k", 1000, 10.0)
+
+    assert len(backend._buckets) == 1
+    assert backend._buckets.get("k") == (0, clock[0])
+
+
+def test_keys_are_independent(clock):
+    backend = LocalTokenBucketBackend()
+    _drain(backend, "a")
+
+    assert backend.consume("b", 3, 1.0) == (True, None)
+
+
+def test_redis_bucket_against_stand_in():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    backend = RedisTokenBucketBackend(client=fakeredis.FakeStrictRedis())
+
+    results = _drain(backend, "throttle_test", refill_rate=0.001)
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] > 0
+    assert backend.client.pttl("throttle_test") > 0
+
+
+@pytest.mark.django_db
+def test_postgres_bucket_single_statement():
+    if connection.vendor != "postgresql":
+        pytest.skip("UNLOGGED token buckets need PostgreSQL")
+    ensure_throttle_table(using=connection.alias)
+    backend = PostgresTokenBucketBackend(using=connection.alias)
+
+    results = _drain(backend, "throttle_test", refill_rate=0.001)
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] > 0
+
+
+def test_throttle_uses_configured_backend(settings, monkeypatch, clock):
+    settings.THROTTLE_BACKEND = "core.ratelimit.LocalTokenBucketBackend"
+    monkeypatch.setattr(ratelimit, "_backends", {})
+    monkeypatch.setattr(
+        AnonBurstRateThrottle, "THROTTLE_RATES", {"anon_burst": "2/min"}
+    )
+    request = Request(RequestFactory().get("/"))
+    request.user = AnonymousUser()
+
+    checks = [AnonBurstRateThrottle() for _ in range(3)]
+    allowed = [throttle.allow_request(request, None) for throttle in checks]
+
+    assert allowed == [True, True, False]
+    assert checks[-1].wait() == pytest.approx(30.0)
@@ -0,0 +1,131 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from core.models import MediaBlob
+from core.storage import ContentAddressedStorage
+from core.views import IMMUTABLE_CACHE_CONTROL, serve_media
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return ContentAddressedStorage(location=tmp_path)
+
+
+def _blob(name):
+    return MediaBlob.objects.get(name=name)
+
+
+def _backdate_releases():
+    MediaBlob.objects.filter(refcount=0).update(
+        released_at=timezone.now() - timedelta(hours=2)
+    )
+
+
+def test_identical_content_is_stored_once(storage, tmp_path):
+    first = storage.save("avatars/a.JPG", ContentFile(b"same bytes"))
+    second = storage.save("other/b.jpg", ContentFile(b"same bytes"))
+    different = storage.save("avatars/a.jpg", ContentFile(b"other bytes"))
+
+    assert first == second != different
+    assert first.startswith("cas/") and first.endswith(".jpg")
+    assert _blob(first).refcount == 2
+    assert _blob(first).size == len(b"same bytes")
+    assert len(list((tmp_path / "cas").rglob("*.jpg"))) == 2
+    assert not list(tmp_path.rglob("*.part"))
+
+
+def test_file_outlives_its_references_until_collected(storage):
+    name = storage.save("a.png", ContentFile(b"bytes"))
+    storage.save("b.png", ContentFile(b"bytes"))
+
+    storage.delete(name)
+    assert storage.exists(name) and _blob(name).released_at is None
+    storage.delete(name)
+    assert _blob(name).refcount == 0 and _blob(name).released_at is not None
+
+    assert storage.collect_garbage(grace=timedelta(hours=1)) == 0
+    _backdate_releases()
+    assert storage.collect_garbage(grace=timedelta(hours=1)) == 1
+    assert not storage.exists(name)
+    assert not MediaBlob.objects.exists()
+
+
+def test_resaving_revives_a_released_blob(storage):
+    name = storage.save("a.png", ContentFile(b"bytes"))
+    storage.delete(name)
+
+    _backdate_releases()
+
+    assert storage.save("again.png", ContentFile(b"bytes")) == name
+    assert storage.collect_garbage(grace=timedelta(hours=1)) == 0
+    assert storage.exists(name)
+    assert _blob(name).released_at is None
+
+
+def test_collected_blob_is_written_again_on_next_save(storage):
+    name = storage.save("a.png", ContentFile(b"bytes"))
+    storage.delete(name)
+    _backdate_releases()
+    storage.collect_garbage()
+
+    storage.save("a.png", ContentFile(b"bytes"))
+
+    assert storage.exists(name) and _blob(name).refcount == 1
+
+
+def test_files_from_before_are_deleted_directly(storage, tmp_path):
+    (tmp_path / "avatars").mkdir()
+    (tmp_path / "avatars" / "legacy.jpg").write_bytes(b"old")
+
+    storage.delete("avatars/legacy.jpg")
+
+    assert not (tmp_path / "avatars" / "legacy.jpg").exists()
+
+
+def test_gc_command_sweeps_default_storage(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    name = default_storage.save("a.png", ContentFile(b"bytes"))
+    default_storage.delete(name)
+    _backdate_releases()
+    out = io.StringIO()
+
+    call_command("gc_media", stdout=out)
+
+    assert "Removed 1 unreferenced media blobs." in out.getvalue()
+    assert not default_storage.exists(name)
+
+
+def test_content_addressed_media_is_served_immutable(storage, tmp_path):
+    name = storage.save("a.png", ContentFile(b"bytes"))
+    (tmp_path / "legacy.png").write_bytes(b"old")
+    request = RequestFactory().get("/media/")
+
+    blob = serve_media(request, name, document_root=tmp_path)
+    legacy = serve_media(request, "legacy.png", document_root=tmp_path)
+
+    assert blob["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    assert "Cache-Control" not in legacy
+
+
+def test_file_of_a_rolled_back_save_is_collected(storage):
+    with pytest.raises(RuntimeError), transaction.atomic():
+        name = storage.save("a.png", ContentFile(b"bytes"))
+        raise RuntimeError
+    assert storage.exists(name) and not MediaBlob.objects.exists()
+
+    assert storage.collect_garbage(grace=timedelta(hours=1)) == 0
+    assert _blob(name).refcount == 0
+    _backdate_releases()
+    assert storage.collect_garbage(grace=timedelta(hours=1)) == 1
+    assert not storage.exists(name)
+    assert not MediaBlob.objects.exists()
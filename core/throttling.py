@@ -1,17 +1,59 @@
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 
-
-class AnonBurstRateThrottle(AnonRateThrottle):
+from core.ratelimit import get_throttle_backend
+
+
+class TokenBucketThrottleMixin:
+    """
+    Replace ``SimpleRateThrottle``'s cached timestamp history with a token bucket.
+
+    A rate of ``N/period`` becomes a bucket of ``N`` tokens that refills at
+    ``N / period`` tokens per second. The check-and-decrement runs in a single
+    call to the configured ``core.ratelimit`` backend. ``aallow_request`` is the
+    async variant used by ``core.async_views.AsyncAPIView``.
+    """
+
+    def allow_request(self, request, view):
+        bucket = self._bucket(request, view)
+        if bucket is None:
+            return True
+        allowed, self._wait = get_throttle_backend().consume(**bucket)
+        return allowed
+
+    async def aallow_request(self, request, view):
+        bucket = self._bucket(request, view)
+        if bucket is None:
+            return True
+        allowed, self._wait = await get_throttle_backend().aconsume(**bucket)
+        return allowed
+
+    def _bucket(self, request, view):
+        if self.rate is None:
+            return None
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return None
+        return {
+            "key": self.key,
+            "capacity": self.num_requests,
+            "refill_rate": self.num_requests / self.duration,
+        }
+
+    def wait(self):
+        return getattr(self, "_wait", None)
+
+
+class AnonBurstRateThrottle(TokenBucketThrottleMixin, AnonRateThrottle):
     scope = "anon_burst"
 
 
-class AnonSustainedRateThrottle(AnonRateThrottle):
+class AnonSustainedRateThrottle(TokenBucketThrottleMixin, AnonRateThrottle):
     scope = "anon_sustained"
 
 
-class UserBurstRateThrottle(UserRateThrottle):
+class UserBurstRateThrottle(TokenBucketThrottleMixin, UserRateThrottle):
     scope = "user_burst"
 
 
-class UserSustainedRateThrottle(UserRateThrottle):
+class UserSustainedRateThrottle(TokenBucketThrottleMixin, UserRateThrottle):
     scope = "user_sustained"
@@ -0,0 +1,145 @@
+"""
+Streaming, early-rejecting image uploads.
+
+``ImageUploadHandler`` replaces Django's default upload handlers on views that
+take image files. Every file part is streamed chunk by chunk into a temporary
+file, so a worker holds one chunk plus a small header buffer in memory no
+matter how large the request is. While streaming it:
+
+* rejects the request outright when its ``Content-Length`` already exceeds the
+  byte limit, before any of the body is read,
+* stops reading once a file passes ``max_bytes``,
+* sniffs the image header from the first bytes (Pillow only parses headers on
+  ``Image.open``) and rejects unsupported formats and oversize dimensions,
+  including decompression bombs, as soon as the header is in.
+
+Headers that do not fit the sniffing buffer (e.g. a JPEG with a large EXIF
+block) are read lazily from the temporary file once the part is complete.
+Files that passed the check carry ``image_format`` and ``image_size``, and
+``CheckedImageField`` accepts them without Pillow reading the whole file
+again to verify it.
+"""
+
+import io
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException, ValidationError
+
+# Enough for the header of a PNG/WebP/GIF and of most JPEGs.
+HEADER_SNIFF_BYTES = 64 * 1024
+# Allowance for the multipart framing and non-file fields of a request.
+REQUEST_OVERHEAD_BYTES = 64 * 1024
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Upload is too large."
+    default_code = "upload_too_large"
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Stream image parts to temporary files, enforcing byte and pixel limits."""
+
+    def __init__(
+        self,
+        request=None,
+        *,
+        max_bytes,
+        max_pixels,
+        max_dimension,
+        formats=("JPEG", "PNG", "WEBP"),
+    ):
+        super().__init__(request)
+        self.max_bytes = max_bytes
+        self.max_pixels = max_pixels
+        self.max_dimension = max_dimension
+        self.formats = tuple(formats)
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        if content_length > self.max_bytes + REQUEST_OVERHEAD_BYTES:
+            raise self._too_large()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+        self.head = bytearray()
+        self.header = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_bytes:
+            self._reject(self._too_large())
+        if self.header is None and len(self.head) < HEADER_SNIFF_BYTES:
+            self.head += raw_data[: HEADER_SNIFF_BYTES - len(self.head)]
+            self.header = self._sniff(io.BytesIO(self.head), complete=False)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        if self.header is None:
+            self.header = self._sniff(self.file, complete=True)
+            self.file.seek(0)
+        image_format, image_size = self.header
+        self.file.image_format = image_format
+        self.file.image_size = image_size
+        self.file.content_type = _MIME_TYPES.get(image_format, self.content_type)
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, "file"):
+            self.file.close()
+
+    def _sniff(self, fp, complete):
+        """
+        Return ``(format, size)`` read from the image header in ``fp``.
+
+        Until the part is ``complete``, ``None`` means more bytes are needed;
+        limit violations are raised either way.
+        """
+        try:
+            with Image.open(fp, formats=self.formats) as image:
+                header = image.format, image.size
+        except Image.DecompressionBombError:
+            self._reject(self._invalid("Image dimensions are too large."))
+        except Exception:
+            if not complete:
+                return None
+            self._reject(
+                self._invalid(
+                    "Upload a valid image. Supported formats: "
+                    f"{', '.join(self.formats)}."
+                )
+            )
+        width, height = header[1]
+        if max(width, height) > self.max_dimension or width * height > self.max_pixels:
+            self._reject(self._invalid("Image dimensions are too large."))
+        return header
+
+    def _reject(self, exc):
+        # The parser only closes files it has been handed; drop the partial one.
+        self.upload_interrupted()
+        raise exc
+
+    def _invalid(self, message):
+        return ValidationError({self.field_name: [message]})
+
+    def _too_large(self):
+        return UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes.")
+
+
+class CheckedImageField(serializers.ImageField):
+    """``ImageField`` that trusts files already checked by ``ImageUploadHandler``."""
+
+    def to_internal_value(self, data):
+        if getattr(data, "image_format", None) is None:
+            return super().to_internal_value(data)
+        return serializers.FileField.to_internal_value(self, data)
@@ -0,0 +1,36 @@
+from django.views.static import serve
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.authentication import user_cache_stats
+from core.storage import CAS_PREFIX
+from rbac.grants import grants_cache_stats
+from users.services.graph import get_graph
+
+
+class CacheStatsView(APIView):
+    """Hit ratios of this worker process's in-memory caches."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "auth_user_cache": user_cache_stats(),
+                "rbac_grants_cache": grants_cache_stats(),
+                "follow_graph": get_graph().stats(),
+            }
+        )
+
+
+# A content-addressed name never changes content.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def serve_media(request, path, document_root=None):
+    """``django.views.static.serve`` that marks content-addressed files immutable."""
+    response = serve(request, path, document_root=document_root)
+    if path.startswith(f"{CAS_PREFIX}/") and response.status_code == 200:
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RbacConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "rbac"
+
+    def ready(self):
+        import rbac.signals  # noqa: F401
@@ -0,0 +1,171 @@
+"""
+Compiled RBAC grants.
+
+A user's ``PagePermission`` rows are compiled into ``{url_name: bitmask}`` and
+cached per process (``LocalTTLCache``) and in the shared Django cache, so
+``DynamicPagePermission`` adds no queries on a warm cache. ``rbac.signals``
+invalidates a user's entry whenever their grants change; other processes pick
+the change up once their local entry expires (``RBAC_LOCAL_CACHE_TTL``).
+The ``a*`` variants serve async views: a local hit never leaves the event loop.
+"""
+
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.cache import MISSING, LocalTTLCache
+from rbac.models import PagePermission
+
+VIEW, EDIT, DELETE = 1, 2, 4
+LEVEL_BITS = {
+    "view": VIEW,
+    "edit": EDIT,
+    "delete": DELETE,
+    "full": VIEW | EDIT | DELETE,
+}
+
+_local = LocalTTLCache(
+    maxsize=settings.RBAC_LOCAL_CACHE_SIZE, ttl=settings.RBAC_LOCAL_CACHE_TTL
+)
+
+
+def _cache_key(user_id):
+    return f"rbac:grants:{user_id}"
+
+
+def _version_key(user_id):
+    return f"rbac:version:{user_id}"
+
+
+def _new_epoch():
+    # Versions start from a millisecond timestamp, so a version lost from the
+    # shared cache is re-created with a value no previously issued token holds.
+    return int(time.time() * 1000)
+
+
+def compile_grants(user_id):
+    """Build ``{url_name (lowercase): permission bitmask}`` for one user."""
+    grants = {}
+    rows = (
+        PagePermission.objects.filter(user_permissions__user_id=user_id)
+        .values_list("url_name", "permission_level")
+        .distinct()
+    )
+    for url_name, level in rows:
+        key = url_name.lower()
+        grants[key] = grants.get(key, 0) | LEVEL_BITS.get(level, 0)
+    return grants
+
+
+def get_grants(user_id):
+    key = _cache_key(user_id)
+    grants = _local.get(key)
+    if grants is not MISSING:
+        return grants
+    grants = cache.get(key)
+    if grants is None:
+        grants = compile_grants(user_id)
+        cache.set(key, grants, settings.RBAC_CACHE_TIMEOUT)
+    _local.set(key, grants)
+    return grants
+
+
+async def aget_grants(user_id):
+    key = _cache_key(user_id)
+    grants = _local.get(key)
+    if grants is not MISSING:
+        return grants
+    grants = await cache.aget(key)
+    if grants is None:
+        grants = await sync_to_async(compile_grants)(user_id)
+        await cache.aset(key, grants, settings.RBAC_CACHE_TIMEOUT)
+    _local.set(key, grants)
+    return grants
+
+
+def _shared_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_epoch(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_grants_version(user_id):
+    """Return the current grants version for ``user_id`` (embedded in JWTs)."""
+    key = _version_key(user_id)
+    version = _local.get(key)
+    if version is not MISSING:
+        return version
+    version = _shared_version(key)
+    _local.set(key, version)
+    return version
+
+
+def grants_for_token(user_id):
+    """
+    Return ``(grants, version)`` to embed in a new access token.
+
+    The version is read from the shared cache first, then the grants are
+    compiled from the database; the per-process cache is skipped for both. A
+    change landing in between leaves newer grants under an older version, so
+    the token is merely refreshed early. It never carries stale grants under
+    the current version.
+    """
+    version = _shared_version(_version_key(user_id))
+    return compile_grants(user_id), version
+
+
+async def aget_grants_version(user_id):
+    key = _version_key(user_id)
+    version = _local.get(key)
+    if version is not MISSING:
+        return version
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _new_epoch(), timeout=None)
+        version = await cache.aget(key)
+    _local.set(key, version)
+    return version
+
+
+def _bump_versions(user_ids):
+    for user_id in user_ids:
+        key = _version_key(user_id)
+        _local.delete(key)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_epoch(), timeout=None)
+
+
+def grants_cache_stats():
+    lookups = _local.hits + _local.misses
+    return {
+        "local_hits": _local.hits,
+        "local_misses": _local.misses,
+        "hit_ratio": round(_local.hits / lookups, 4) if lookups else None,
+    }
+
+
+def is_granted(grants, url_name, level):
+    return bool(grants.get(url_name.lower(), 0) & LEVEL_BITS[level])
+
+
+def invalidate_user_grants(*user_ids):
+    keys = [_cache_key(user_id) for user_id in user_ids]
+
+    def _drop():
+        for key in keys:
+            _local.delete(key)
+        cache.delete_many(keys)
+
+    _bump_versions(user_ids)
+
+    # Drop now, and again after commit so a request that re-read the old grants
+    # while the transaction was open cannot leave them cached.
+    _drop()
+    transaction.on_commit(_drop)
@@ -0,0 +1,85 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import resolve
+from rest_framework.request import Request
+
+from core.cache import clear_local_caches
+from core.instrumentation import QueryRecorder
+from rbac.models import PagePermission, Role, UserPermission
+from rbac.permissions import DynamicPagePermission
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Measure per-request overhead of DynamicPagePermission (cold vs warm)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=10_000)
+        parser.add_argument("--roles", type=int, default=3)
+        parser.add_argument("--pages", type=int, default=50)
+
+    def handle(self, *args, **options):
+        user = self._bench_user(options["roles"], options["pages"])
+        path = "/api/profiles/bench/"
+        django_request = RequestFactory().get(path)
+        django_request.resolver_match = resolve(path)
+        request = Request(django_request)
+        request.user = user
+        request.auth = None
+        permission = DynamicPagePermission()
+
+        def cold():
+            cache.clear()
+            clear_local_caches()
+            return permission.has_permission(request, None)
+
+        def warm():
+            return permission.has_permission(request, None)
+
+        warm()
+        for label, check, iterations in (
+            ("cold", cold, max(1, options["iterations"] // 100)),
+            ("warm", warm, options["iterations"]),
+        ):
+            recorder = QueryRecorder()
+            with recorder.record():
+                start = perf_counter()
+                for _ in range(iterations):
+                    assert check()
+                elapsed = perf_counter() - start
+            self.stdout.write(
+                f"{label}: {elapsed / iterations * 1e6:8.1f} us/check  "
+                f"{recorder.count / iterations:.2f} queries/check  "
+                f"({iterations} checks)"
+            )
+
+    @staticmethod
+    def _bench_user(roles, pages):
+        user, _ = User.objects.get_or_create(
+            username="bench_rbac",
+            defaults={
+                "email": "bench_rbac@bench.invalid",
+                "mobile": "0000000002",
+                "full_name": "Benchmark RBAC",
+            },
+        )
+        for r in range(roles):
+            role, _ = Role.objects.get_or_create(name=f"bench-role-{r}")
+            user_perm, _ = UserPermission.objects.get_or_create(user=user, role=role)
+            url_names = [f"bench-page-{r}-{p}" for p in range(pages)]
+            if r == 0:
+                url_names.append("profile-detail")
+            user_perm.page_permissions.add(
+                *(
+                    PagePermission.objects.get_or_create(
+                        url_name=url_name, permission_level="view"
+                    )[0]
+                    for url_name in url_names
+                )
+            )
+        return user
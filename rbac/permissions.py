@@ -1,7 +1,8 @@
 from django.urls import resolve
 from rest_framework.permissions import BasePermission
 
-from rbac.models import UserPermission
+from rbac.grants import aget_grants, get_grants, is_granted
+from rbac.tokens import agrants_from_token, grants_from_token
 
 
 class DynamicPagePermission(BasePermission):
@@ -17,23 +18,36 @@ class DynamicPagePermission(BasePermission):
         if not request.user.is_authenticated:
             return False
 
+        current_url, required_perm = self._required(request, view)
+
+        # Compiled url_name -> bitmask grants: from the access token when they
+        # are embedded (RBAC_JWT_GRANTS), else from the per-process/shared cache
+        grants = grants_from_token(request.auth, request.user.pk)
+        if grants is None:
+            grants = get_grants(request.user.pk)
+        return is_granted(grants, current_url, required_perm)
+
+    async def ahas_permission(self, request, view):
+        """Async ``has_permission`` for ``core.async_views.AsyncAPIView``."""
+        if not request.user.is_authenticated:
+            return False
+        current_url, required_perm = self._required(request, view)
+        grants = await agrants_from_token(request.auth, request.user.pk)
+        if grants is None:
+            grants = await aget_grants(request.user.pk)
+        return is_granted(grants, current_url, required_perm)
+
+    def _required(self, request, view):
         # Get required permission for this HTTP method
         required_perm = self.HTTP_TO_PERMISSION.get(request.method, "view")
 
-        # Get current page/URL
-        current_url = resolve(request.path_info).url_name or request.path.strip(
-            "/"
-        ).replace("/", "_")
-        # Fetch user permissions from DB
-        user_perms = UserPermission.objects.filter(user=request.user).prefetch_related(
-            "page_permissions"
-        )
-
-        for uperm in user_perms:
-            if uperm.page_permissions.filter(
-                url_name__iexact=current_url,
-                permission_level__in=[required_perm, "full"],
-            ).exists():
-                return True
-
-        return False
+        # Views can share another page's grants (e.g. the async mirror of a
+        # sync endpoint); otherwise use the current page/URL (already resolved
+        # by Django for this request)
+        current_url = getattr(view, "rbac_url_name", None)
+        if current_url is None:
+            match = getattr(request, "resolver_match", None) or resolve(
+                request.path_info
+            )
+            current_url = match.url_name or request.path.strip("/").replace("/", "_")
+        return current_url, required_perm
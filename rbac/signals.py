@@ -0,0 +1,46 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from rbac.grants import invalidate_user_grants
+from rbac.models import PagePermission, UserPermission
+
+
+def _users_holding(page_permission):
+    return list(
+        UserPermission.objects.filter(page_permissions=page_permission)
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_save, sender=UserPermission)
+@receiver(post_delete, sender=UserPermission)
+def user_permission_changed(sender, instance, **kwargs):
+    invalidate_user_grants(instance.user_id)
+
+
+@receiver(post_save, sender=PagePermission)
+@receiver(pre_delete, sender=PagePermission)
+def page_permission_changed(sender, instance, **kwargs):
+    if user_ids := _users_holding(instance):
+        invalidate_user_grants(*user_ids)
+
+
+@receiver(m2m_changed, sender=UserPermission.page_permissions.through)
+def page_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_user_grants(instance.user_id)
+        return
+    # Reverse side: ``instance`` is a PagePermission and ``pk_set`` holds
+    # UserPermission ids (unknown for clear, so capture holders beforehand).
+    if action == "pre_clear":
+        user_ids = _users_holding(instance)
+    elif action in ("post_add", "post_remove"):
+        user_ids = UserPermission.objects.filter(pk__in=pk_set).values_list(
+            "user_id", flat=True
+        )
+    else:
+        return
+    if user_ids := list(user_ids):
+        invalidate_user_grants(*user_ids)
@@ -0,0 +1,42 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from core.cache import clear_local_caches
+from rbac.models import PagePermission, Role, UserPermission
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    clear_local_caches()
+    yield
+    cache.clear()
+    clear_local_caches()
+
+
+@pytest.fixture
+def member():
+    return User.objects.create_user(
+        username="member",
+        email="member@example.com",
+        mobile="9000000001",
+        password="Password@123",
+        full_name="Member",
+    )
+
+
+@pytest.fixture
+def grant():
+    def _grant(user, url_name, level, role_name="member"):
+        role, _ = Role.objects.get_or_create(name=role_name)
+        user_perm, _ = UserPermission.objects.get_or_create(user=user, role=role)
+        page, _ = PagePermission.objects.get_or_create(
+            url_name=url_name, permission_level=level
+        )
+        user_perm.page_permissions.add(page)
+        return page
+
+    return _grant
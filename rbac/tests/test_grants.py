@@ -0,0 +1,81 @@
+import pytest
+from django.test import RequestFactory
+from django.urls import resolve
+from rest_framework.request import Request
+
+from rbac.grants import EDIT, VIEW, compile_grants, get_grants
+from rbac.models import UserPermission
+from rbac.permissions import DynamicPagePermission
+
+pytestmark = pytest.mark.django_db
+
+
+def _request(user, method, path="/api/profiles/someone/"):
+    django_request = getattr(RequestFactory(), method.lower())(path)
+    django_request.resolver_match = resolve(path)
+    request = Request(django_request)
+    request.user = user
+    request.auth = None
+    return request
+
+
+def test_compile_grants_merges_levels_case_insensitively(member, grant):
+    grant(member, "Profile-Detail", "view")
+    grant(member, "profile-detail", "edit", role_name="editor")
+
+    assert compile_grants(member.pk) == {"profile-detail": VIEW | EDIT}
+
+
+@pytest.mark.parametrize(
+    "level, method, allowed",
+    [
+        ("view", "GET", True),
+        ("view", "PATCH", False),
+        ("edit", "PATCH", True),
+        ("full", "DELETE", True),
+        ("delete", "GET", False),
+    ],
+)
+def test_permission_levels(member, grant, level, method, allowed):
+    grant(member, "profile-detail", level)
+
+    permission = DynamicPagePermission()
+
+    assert permission.has_permission(_request(member, method), None) is allowed
+
+
+def test_warm_cache_adds_no_queries(member, grant, django_assert_num_queries):
+    grant(member, "profile-detail", "view")
+    permission = DynamicPagePermission()
+    permission.has_permission(_request(member, "GET"), None)
+
+    with django_assert_num_queries(0):
+        assert permission.has_permission(_request(member, "GET"), None)
+
+
+def test_granting_invalidates_cached_matrix(member, grant):
+    grant(member, "followers", "view")
+    assert get_grants(member.pk) == {"followers": VIEW}
+
+    grant(member, "profile-detail", "edit")
+
+    assert get_grants(member.pk) == {"followers": VIEW, "profile-detail": EDIT}
+
+
+def test_removing_user_permission_invalidates(member, grant):
+    grant(member, "followers", "view")
+    assert get_grants(member.pk)
+
+    UserPermission.objects.filter(user=member).delete()
+
+    assert get_grants(member.pk) == {}
+
+
+def test_page_permission_change_invalidates_holders(member, grant):
+    page = grant(member, "followers", "view")
+    assert get_grants(member.pk) == {"followers": VIEW}
+
+    page.permission_level = "edit"
+    page.save()
+
+    assert get_grants(member.pk) == {"followers": EDIT}
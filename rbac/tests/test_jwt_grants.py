@@ -0,0 +1,97 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from rbac import grants
+from rbac.grants import VIEW
+from rbac.tokens import GRANTS_CLAIM, VERSION_CLAIM, GrantsRefreshToken
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("jwt_grants"),
+]
+
+
+@pytest.fixture
+def jwt_grants():
+    with override_settings(RBAC_JWT_GRANTS=True, RBAC_JWT_VERSION_CHECK=True):
+        yield
+
+
+def _client(access):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+def test_access_token_carries_grants(member, grant):
+    grant(member, "profile-detail", "view")
+
+    access = GrantsRefreshToken.for_user(member).access_token
+
+    assert access[GRANTS_CLAIM] == {"profile-detail": VIEW}
+
+
+def test_authorizes_from_token_without_rbac_queries(
+    member, grant, django_assert_max_num_queries
+):
+    grant(member, "profile-detail", "view")
+    client = _client(GrantsRefreshToken.for_user(member).access_token)
+    url = reverse("profile-detail", args=["member"])
+
+    # JWT user lookup + profile (+ audit log); no RBAC tables are touched.
+    with django_assert_max_num_queries(3) as captured:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert not any("rbac_" in query["sql"] for query in captured.captured_queries)
+
+
+def test_grants_changed_while_minting_make_the_token_stale(member, grant, monkeypatch):
+    grant(member, "followers", "view")
+    compile_grants = grants.compile_grants
+
+    def change_then_compile(user_id):
+        # A grant change lands between the version read and the grants read.
+        grants.invalidate_user_grants(user_id)
+        return compile_grants(user_id)
+
+    monkeypatch.setattr(grants, "compile_grants", change_then_compile)
+    access = GrantsRefreshToken.for_user(member).access_token
+    monkeypatch.undo()
+
+    assert access[VERSION_CLAIM] != grants.get_grants_version(member.pk)
+    response = _client(access).get(reverse("followers", args=["member"]))
+    assert response.data["detail"].code == "token_stale"
+
+
+def test_minting_ignores_the_process_local_grants(member, grant):
+    grant(member, "profile-detail", "view")
+    # What this process still holds when the change came from another one.
+    grants._local.set(grants._cache_key(member.pk), {})
+
+    access = GrantsRefreshToken.for_user(member).access_token
+
+    assert access[GRANTS_CLAIM] == {"profile-detail": VIEW}
+    assert access[VERSION_CLAIM] == grants.get_grants_version(member.pk)
+
+
+def test_grants_change_forces_reissue(member, grant):
+    grant(member, "followers", "view")
+    refresh = GrantsRefreshToken.for_user(member)
+    client = _client(refresh.access_token)
+
+    grant(member, "profile-detail", "view")
+    stale = client.get(reverse("profile-detail", args=["member"]))
+
+    assert stale.status_code == 401
+    assert stale.data["detail"].code == "token_stale"
+
+    refreshed = APIClient().post(
+        reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+    )
+    response = _client(refreshed.data["access"]).get(
+        reverse("profile-detail", args=["member"])
+    )
+    assert response.status_code == 200
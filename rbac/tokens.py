@@ -0,0 +1,77 @@
+"""
+Stateless authorization: RBAC grants embedded in SimpleJWT access tokens.
+
+With ``RBAC_JWT_GRANTS`` enabled, every access token minted at login or refresh
+carries the user's compiled grants (``rbac.grants``) and the grants version.
+``DynamicPagePermission`` then authorizes from the token alone. When
+``RBAC_JWT_VERSION_CHECK`` is on, a token whose version is older than the
+user's current one (bumped whenever their grants change) is rejected with
+``token_stale`` so the client refreshes and receives the new grants.
+"""
+
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from rbac.grants import aget_grants_version, get_grants_version, grants_for_token
+
+GRANTS_CLAIM = "rbac"
+VERSION_CLAIM = "rbac_ver"
+
+
+class GrantsTokenStale(exceptions.AuthenticationFailed):
+    default_detail = "Permissions changed, refresh your access token."
+    default_code = "token_stale"
+
+
+class GrantsRefreshToken(RefreshToken):
+    @property
+    def access_token(self):
+        access = super().access_token
+        if settings.RBAC_JWT_GRANTS:
+            user_id = self.payload[api_settings.USER_ID_CLAIM]
+            access[GRANTS_CLAIM], access[VERSION_CLAIM] = grants_for_token(user_id)
+        return access
+
+
+class GrantsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = GrantsRefreshToken
+
+
+def _embedded_grants(token):
+    if not settings.RBAC_JWT_GRANTS or token is None:
+        return None
+    try:
+        return token[GRANTS_CLAIM]
+    except (KeyError, TypeError):
+        return None
+
+
+def grants_from_token(token, user_id):
+    """
+    Return the grants embedded in ``token``, or ``None`` if it carries none.
+
+    Raises ``GrantsTokenStale`` when version checking is on and the user's
+    grants changed after the token was issued.
+    """
+    grants = _embedded_grants(token)
+    if grants is None:
+        return None
+    if settings.RBAC_JWT_VERSION_CHECK and token.get(
+        VERSION_CLAIM
+    ) != get_grants_version(user_id):
+        raise GrantsTokenStale
+    return grants
+
+
+async def agrants_from_token(token, user_id):
+    grants = _embedded_grants(token)
+    if grants is None:
+        return None
+    if settings.RBAC_JWT_VERSION_CHECK and token.get(
+        VERSION_CLAIM
+    ) != await aget_grants_version(user_id):
+        raise GrantsTokenStale
+    return grants
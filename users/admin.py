@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from users.models import Profile, User
+from users.models import Profile, SuggestedFollow, User
 
 
 @admin.register(User)
@@ -37,7 +37,14 @@ class UserAdmin(BaseUserAdmin):
 class ProfileAdmin(admin.ModelAdmin):
     """Admin for Profile model."""
 
-    list_display = ["user", "gender", "bio", "avatar"]
+    list_display = [
+        "user",
+        "gender",
+        "bio",
+        "avatar",
+        "followers_count",
+        "following_count",
+    ]
     list_filter = ["gender"]
     search_fields = ["user__username", "user__email", "bio"]
     raw_id_fields = ["user"]  # Use widget for user selection
@@ -47,3 +54,23 @@ class ProfileAdmin(admin.ModelAdmin):
         ("User", {"fields": ("user",)}),
         ("Profile Information", {"fields": ("bio", "avatar", "gender")}),
     )
+
+
+@admin.register(SuggestedFollow)
+class SuggestedFollowAdmin(admin.ModelAdmin):
+    """Read-only view of precomputed follow suggestions."""
+
+    list_display = ["user", "suggested", "score", "mutual_count", "created_at"]
+    search_fields = ["user__username", "suggested__username"]
+    raw_id_fields = ["user", "suggested"]
+    ordering = ["user", "-score"]
+
+    # compute_follow_suggestions rewrites these rows; edits would not last.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
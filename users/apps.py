@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
@@ -6,4 +7,8 @@ class UsersConfig(AppConfig):
     name = "users"
 
     def ready(self):
-        pass
+        from users.services.search import ensure_trigram_indexes
+        from users.signals import backfill_user_settings
+
+        post_migrate.connect(ensure_trigram_indexes, sender=self)
+        post_migrate.connect(backfill_user_settings, sender=self)
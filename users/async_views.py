@@ -0,0 +1,236 @@
+"""
+Async auth and read endpoints, meant to be served through ``backend/asgi.py``.
+
+The auth views mirror ``RegisterView`` / ``LoginView`` but run password hashing
+in the bounded ``core.hashing`` pool so a worker is never held for a whole
+PBKDF2 run, and shed load with 503 when that pool is saturated.
+
+The read views mirror the ``get`` of ``ProfileView``, ``FollowersView``,
+``FollowingView`` and ``UserSettingsView`` on the async ORM, sharing their RBAC
+pages through ``rbac_url_name``. The profile's relationship fields and
+follow-list search still call sync services, each through one
+``sync_to_async`` hop.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
+from django.shortcuts import aget_object_or_404
+from rest_framework.permissions import AllowAny
+
+from core.async_views import AsyncAPIView
+from core.hashing import get_hash_pool
+from core.pagination import KeysetPagination
+from core.throttling import (
+    AnonBurstRateThrottle,
+    AnonSustainedRateThrottle,
+    UserBurstRateThrottle,
+    UserSustainedRateThrottle,
+)
+from users.models import FollowList, Profile, User, UserSettings
+from users.serializers import (
+    FollowerSerializer,
+    FollowingSerializer,
+    LoginSerializer,
+    ProfileSerializer,
+    RegisterSerializer,
+    UserSettingsSerializer,
+)
+from users.services.graph import is_following
+from users.services.identifiers import aresolve_login_user
+from users.services.mutuals import mutual_followers
+from users.services.visibility import EMPTY, avisibility_for
+from users.views import login_payload, search_follow_list
+
+logger = logging.getLogger(__name__)
+
+
+# ===================== Async Register View =====================
+
+
+class AsyncRegisterView(AsyncAPIView):
+    permission_classes = [AllowAny]
+    throttle_classes = [
+        AnonBurstRateThrottle,
+        AnonSustainedRateThrottle,
+    ]
+
+    async def post(self, request):
+        serializer = RegisterSerializer(data=request.data)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=400)
+
+        password_hash = await get_hash_pool().make_password(
+            serializer.validated_data["password"]
+        )
+        user = await sync_to_async(serializer.save)(password_hash=password_hash)
+        return JsonResponse(
+            {"message": f"User {user.username} registered successfully."},
+            status=201,
+        )
+
+
+# ===================== Async Login View =====================
+
+
+class AsyncLoginView(AsyncAPIView):
+    permission_classes = [AllowAny]
+    throttle_classes = [
+        AnonBurstRateThrottle,
+        AnonSustainedRateThrottle,
+    ]
+
+    async def post(self, request):
+        serializer = LoginSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+        identifier = serializer.validated_data["identifier"]
+        password = serializer.validated_data["password"]
+
+        kind, user = await aresolve_login_user(User.objects.all(), identifier)
+        if not user or not user.is_active:
+            # Only users who can log in get a password check, but every attempt
+            # costs one hash so response times do not tell the cases apart.
+            await get_hash_pool().make_password(password)
+        if not user:
+            logger.info(
+                "login_failed reason=unknown_identifier identifier_type=%s", kind
+            )
+            return JsonResponse(
+                {"error": "Invalid credentials. User not found."}, status=401
+            )
+        if not user.is_active:
+            logger.info("login_failed reason=inactive user_id=%s", user.pk)
+            return JsonResponse({"error": "User account is disabled."}, status=403)
+
+        matches, needs_rehash = await get_hash_pool().check_password(
+            password, user.password
+        )
+        if not matches:
+            logger.info(
+                "login_failed reason=bad_password user_id=%s identifier_type=%s",
+                user.pk,
+                kind,
+            )
+            return JsonResponse(
+                {"error": "Invalid credentials. Incorrect password."}, status=401
+            )
+        if needs_rehash:
+            user.password = await get_hash_pool().make_password(password)
+            await user.asave(update_fields=["password"])
+
+        payload = await sync_to_async(login_payload)(user)
+        logger.info("login_succeeded user_id=%s identifier_type=%s", user.pk, kind)
+        return JsonResponse(payload, status=200)
+
+
+# ===================== Async Profile View =====================
+
+
+def _relationship(viewer_id, user_id, visibility):
+    return (
+        is_following(viewer_id, user_id),
+        mutual_followers(viewer_id, user_id, exclude=visibility.hidden),
+    )
+
+
+class AsyncProfileView(AsyncAPIView):
+    rbac_url_name = "profile-detail"
+    throttle_classes = [
+        UserBurstRateThrottle,
+        UserSustainedRateThrottle,
+    ]
+
+    async def get(self, request, username):
+        profile = await aget_object_or_404(
+            Profile.objects.select_related("user"), user__username=username
+        )
+        is_owner = profile.user_id == request.user.pk
+        visibility = EMPTY if is_owner else await avisibility_for(request.user)
+        if visibility.hides(profile.user_id):
+            raise Http404
+        await self.check_object_permissions(request, profile)
+        data = ProfileSerializer(profile).data
+        data["is_owner"] = is_owner
+        data["is_following"] = data["mutual_followers"] = None
+        if request.user.is_authenticated and not is_owner:
+            data["is_following"], data["mutual_followers"] = await sync_to_async(
+                _relationship
+            )(request.user.pk, profile.user_id, visibility)
+        return JsonResponse(data)
+
+
+# ===================== Async Followers / Following Views =====================
+
+
+class AsyncFollowListView(AsyncAPIView):
+    """Shared ``get`` of the async follower and following lists."""
+
+    # The side of the edge listed, the side matched against the profile owner
+    # and the denormalized counter used as the total.
+    relation = owner_field = count_field = None
+    serializer_class = None
+    pagination_class = KeysetPagination
+    throttle_classes = [
+        UserBurstRateThrottle,
+        UserSustainedRateThrottle,
+    ]
+
+    async def get(self, request, username):
+        profile = await aget_object_or_404(
+            Profile.objects.select_related("user"), user__username=username
+        )
+        visibility = await avisibility_for(request.user)
+        if visibility.hides(profile.user_id):
+            raise Http404
+        queryset = FollowList.objects.filter(
+            **{self.owner_field: profile.user}
+        ).select_related(f"{self.relation}__profile")
+        paginator = self.pagination_class()
+        search = request.GET.get("search", "")
+        if search:
+            response = await sync_to_async(search_follow_list)(
+                paginator,
+                queryset,
+                self.relation,
+                search,
+                self.serializer_class,
+                request,
+            )
+            return JsonResponse(response.data, status=response.status_code)
+        hidden_id = f"{self.relation}_id"
+        page = await paginator.apaginate_queryset(
+            queryset,
+            request,
+            view=self,
+            total_hint=getattr(profile, self.count_field),
+            row_filter=lambda row: not visibility.hides(getattr(row, hidden_id)),
+        )
+        data = self.serializer_class(page, many=True, context={"request": request}).data
+        return JsonResponse(paginator.get_paginated_data(data))
+
+
+class AsyncFollowersView(AsyncFollowListView):
+    rbac_url_name = "followers"
+    relation, owner_field, count_field = "follower", "following", "followers_count"
+    serializer_class = FollowerSerializer
+
+
+class AsyncFollowingView(AsyncFollowListView):
+    rbac_url_name = "following"
+    relation, owner_field, count_field = "following", "follower", "following_count"
+    serializer_class = FollowingSerializer
+
+
+# ===================== Async User Settings View =====================
+
+
+class AsyncUserSettingsView(AsyncAPIView):
+    # The sync route is unnamed, so its RBAC page is the path-derived key.
+    rbac_url_name = "api_settings"
+    throttle_classes = [UserSustainedRateThrottle]
+
+    async def get(self, request):
+        settings_obj = await aget_object_or_404(UserSettings, user=request.user)
+        return JsonResponse(UserSettingsSerializer(settings_obj).data)
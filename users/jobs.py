@@ -0,0 +1,47 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.core.signing import TimestampSigner
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from core.outbox import job
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+signer = TimestampSigner()
+
+
+@job("users.send_welcome_email")
+def send_welcome_email(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        # Deleted before the job ran; nobody to welcome.
+        return
+
+    # The token alone can delete the account: it goes in the email only,
+    # never in the logs.
+    token = signer.sign(user.pk)
+    delete_url = "{}{}?{}".format(
+        settings.SITE_URL.rstrip("/"),
+        reverse("delete-account"),
+        urlencode({"token": token}),
+    )
+    logger.info("Sending welcome email to user %s", user.pk)
+
+    send_mail(
+        subject="Welcome to Our Instagram App 🎉",
+        message=(
+            f"Hi {user.username},\n\n"
+            f"Your account has been created successfully.\n\n"
+            f"If you did NOT create this account, click below to delete it:\n"
+            f"{delete_url}\n\n"
+            f"This link is valid for 24 hours."
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[user.email],
+        fail_silently=False,
+    )
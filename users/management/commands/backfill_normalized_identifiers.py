@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill User.email_normalized / mobile_normalized for rows created before "
+        "those columns existed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        pending = (
+            User.objects.filter(
+                Q(email_normalized__isnull=True) | Q(mobile_normalized__isnull=True)
+            )
+            .only("id", "email", "mobile")
+            .order_by("id")
+        )
+        batch, updated = [], 0
+        for user in pending.iterator(chunk_size=options["batch_size"]):
+            user.normalize_identifiers()
+            batch.append(user)
+            if len(batch) >= options["batch_size"]:
+                updated += self._flush(batch)
+        updated += self._flush(batch)
+        self.stdout.write(self.style.SUCCESS(f"{updated} user(s) backfilled."))
+
+    @staticmethod
+    def _flush(batch):
+        User.objects.bulk_update(batch, ["email_normalized", "mobile_normalized"])
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,156 @@
+import asyncio
+import statistics
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.throttling import TokenBucketThrottleMixin
+from rbac.models import PagePermission, Role, UserPermission
+from rbac.tokens import GrantsRefreshToken
+from users.models import User
+
+BENCH_USERNAME = "bench_async_reader"
+
+# endpoint -> (sync url name, async url name, RBAC page, takes a username)
+ENDPOINTS = {
+    "profile": ("profile-detail", "async-profile-detail", "profile-detail", True),
+    "followers": ("followers", "async-followers", "followers", True),
+    "following": ("following", "async-following", "following", True),
+    "settings": (None, "async-settings", "api_settings", False),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and memory per in-flight request between a WSGI read "
+        "endpoint (thread per request) and its async ASGI counterpart at high "
+        "concurrency. Runs in process, so it measures the Django stack, not the "
+        "server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint", choices=sorted(ENDPOINTS), default="followers"
+        )
+        parser.add_argument(
+            "--username",
+            default="bench_star",
+            help="Profile to read, e.g. one seeded with seed_follow_graph.",
+        )
+        parser.add_argument("--requests", type=int, default=2_000)
+        parser.add_argument("--concurrency", type=int, default=256)
+
+    def handle(self, *args, **options):
+        sync_name, async_name, page, by_username = ENDPOINTS[options["endpoint"]]
+        url_args = [options["username"]] if by_username else []
+        if by_username and not User.objects.filter(username=url_args[0]).exists():
+            raise CommandError("Account not found; run seed_follow_graph first.")
+        token = str(GrantsRefreshToken.for_user(self._reader(page)).access_token)
+
+        # Throttles would reject a benchmark within seconds; measure the views.
+        with (
+            override_settings(ALLOWED_HOSTS=["*"]),
+            mock.patch.object(TokenBucketThrottleMixin, "allow_request", _allow),
+            mock.patch.object(TokenBucketThrottleMixin, "aallow_request", _aallow),
+        ):
+            if sync_name is not None:
+                self._report(
+                    f"WSGI  {reverse(sync_name, args=url_args)}",
+                    self._run_wsgi(reverse(sync_name, args=url_args), token, options),
+                    options,
+                )
+            self._report(
+                f"ASGI  {reverse(async_name, args=url_args)}",
+                self._run_asgi(reverse(async_name, args=url_args), token, options),
+                options,
+            )
+
+    @staticmethod
+    def _reader(page):
+        reader, _ = User.objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={
+                "email": f"{BENCH_USERNAME}@bench.invalid",
+                "mobile": "0000000004",
+                "full_name": "Benchmark Reader",
+            },
+        )
+        role, _ = Role.objects.get_or_create(name="benchmark")
+        grant, _ = UserPermission.objects.get_or_create(user=reader, role=role)
+        permission, _ = PagePermission.objects.get_or_create(
+            url_name=page, permission_level="view"
+        )
+        grant.page_permissions.add(permission)
+        return reader
+
+    def _run_wsgi(self, url, token, options):
+        def read(_):
+            start = perf_counter()
+            response = Client().get(url, headers={"authorization": f"Bearer {token}"})
+            return response.status_code, perf_counter() - start
+
+        def run():
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                results = list(pool.map(read, range(options["requests"])))
+                return results, threading.active_count()
+
+        return self._measured(run)
+
+    def _run_asgi(self, url, token, options):
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def read():
+            async with semaphore:
+                start = perf_counter()
+                response = await AsyncClient().get(
+                    url, headers={"authorization": f"Bearer {token}"}
+                )
+                return response.status_code, perf_counter() - start
+
+        async def run_all():
+            results = await asyncio.gather(
+                *(read() for _ in range(options["requests"]))
+            )
+            return results, threading.active_count()
+
+        return self._measured(lambda: asyncio.run(run_all()))
+
+    @staticmethod
+    def _measured(run):
+        tracemalloc.start()
+        try:
+            wall = perf_counter()
+            results, threads = run()
+            wall = perf_counter() - wall
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return results, wall, peak, threads
+
+    def _report(self, label, measurement, options):
+        results, wall, peak, threads = measurement
+        ok = sum(1 for status, _ in results if status == 200)
+        latencies = sorted(latency * 1000 for _, latency in results)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f"{label:<48} {ok}/{len(results)} ok  "
+            f"{ok / wall:8.1f} req/s  "
+            f"p50={statistics.median(latencies):.1f}ms p95={p95:.1f}ms  "
+            f"heap/conn={peak / options['concurrency'] / 1024:.1f}KiB  "
+            f"threads={threads}"
+        )
+
+
+def _allow(self, request, view):
+    return True
+
+
+async def _aallow(self, request, view):
+    return True
@@ -0,0 +1,70 @@
+import statistics
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core.instrumentation import QueryRecorder
+from users.models import FollowList, User
+from users.services.search import SearchTimeout, get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure follower search latency for one account, typically one seeded "
+        "with seed_follow_graph."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", default="bench_star")
+        parser.add_argument(
+            "--terms", nargs="+", default=["ka", "karimo", "len", "fan12", "zzz"]
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--backend",
+            help="Dotted path overriding FOLLOW_SEARCH_BACKEND for this run.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            star = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(
+                "Account not found; run seed_follow_graph first."
+            ) from None
+
+        overrides = {}
+        if options["backend"]:
+            overrides["FOLLOW_SEARCH_BACKEND"] = options["backend"]
+        with override_settings(**overrides):
+            backend = get_search_backend()
+            queryset = FollowList.objects.filter(following=star).select_related(
+                "follower__profile"
+            )
+            self.stdout.write(f"Backend: {type(backend).__name__}")
+            for term in options["terms"]:
+                self._bench_term(backend, queryset, term, options)
+
+    def _bench_term(self, backend, queryset, term, options):
+        timings, hits, timeouts = [], 0, 0
+        recorder = QueryRecorder()
+        with recorder.record():
+            for _ in range(options["iterations"]):
+                start = perf_counter()
+                try:
+                    hits = len(
+                        backend.search(queryset, "follower", term, options["limit"])
+                    )
+                except SearchTimeout:
+                    timeouts += 1
+                timings.append((perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f"{term!r:>10}: p50={statistics.median(timings):.1f}ms "
+            f"p95={p95:.1f}ms max={timings[-1]:.1f}ms hits={hits} "
+            f"timeouts={timeouts} queries/search="
+            f"{recorder.count / options['iterations']:.1f}"
+        )
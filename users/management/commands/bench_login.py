@@ -0,0 +1,98 @@
+import asyncio
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, process_time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from users.async_views import AsyncLoginView
+from users.models import User
+from users.views import LoginView
+
+BENCH_USERNAME = "bench_login"
+BENCH_PASSWORD = "BenchPass123!"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare logins/sec and logins per CPU-second between the WSGI login view "
+        "and the async login view with the off-loop hashing pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=16)
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={
+                "email": f"{BENCH_USERNAME}@bench.invalid",
+                "mobile": "0000000001",
+                "full_name": "Benchmark Login",
+            },
+        )
+        user.set_password(BENCH_PASSWORD)
+        user.save(update_fields=["password"])
+        body = {"identifier": BENCH_USERNAME, "password": BENCH_PASSWORD}
+
+        # Throttles would reject a benchmark within seconds; measure the views.
+        with (
+            override_settings(ALLOWED_HOSTS=["*"]),
+            mock.patch.object(LoginView, "throttle_classes", []),
+            mock.patch.object(AsyncLoginView, "throttle_classes", []),
+        ):
+            self._report("WSGI  /api/login/", self._run_wsgi(body, options))
+            self._report("ASGI  /api/async/login/", self._run_asgi(body, options))
+
+    def _run_wsgi(self, body, options):
+        url = reverse("login")
+
+        def login(_):
+            client = Client()
+            start = perf_counter()
+            response = client.post(url, body, content_type="application/json")
+            return response.status_code, perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            return self._timed(
+                lambda: list(pool.map(login, range(options["requests"])))
+            )
+
+    def _run_asgi(self, body, options):
+        url = reverse("async-login")
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        client = AsyncClient()
+
+        async def login():
+            async with semaphore:
+                start = perf_counter()
+                response = await client.post(url, body, content_type="application/json")
+                return response.status_code, perf_counter() - start
+
+        async def run_all():
+            return await asyncio.gather(*(login() for _ in range(options["requests"])))
+
+        return self._timed(lambda: asyncio.run(run_all()))
+
+    @staticmethod
+    def _timed(run):
+        wall, cpu = perf_counter(), process_time()
+        results = run()
+        return results, perf_counter() - wall, process_time() - cpu
+
+    def _report(self, label, measurement):
+        results, wall, cpu = measurement
+        ok = sum(1 for status, _ in results if status == 200)
+        latencies = sorted(latency * 1000 for _, latency in results)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f"{label:<26} {ok}/{len(results)} ok  "
+            f"{ok / wall:8.1f} logins/s  "
+            f"{ok / cpu if cpu else 0:8.1f} logins/CPU-s  "
+            f"p50={statistics.median(latencies):.1f}ms p95={p95:.1f}ms"
+        )
@@ -0,0 +1,94 @@
+import random
+import statistics
+from time import perf_counter
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import clear_local_caches
+from core.instrumentation import QueryRecorder
+from users.models import FollowList, User
+from users.services.mutuals import mutual_followers
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure mutual-connection latency against an account seeded with "
+        "seed_follow_graph (1M followers by default)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", default="bench_star")
+        parser.add_argument(
+            "--viewer-follows",
+            type=int,
+            default=2_000,
+            help="How many of the star's followers the benchmark viewer follows.",
+        )
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        try:
+            star = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(
+                "Account not found; run seed_follow_graph first."
+            ) from None
+        viewer = self._bench_viewer(star, options)
+
+        def cold():
+            cache.clear()
+            clear_local_caches()
+            return mutual_followers(viewer.pk, star.pk)
+
+        def shared():
+            clear_local_caches()
+            return mutual_followers(viewer.pk, star.pk)
+
+        def warm():
+            return mutual_followers(viewer.pk, star.pk)
+
+        iterations = options["iterations"]
+        for label, run, count in (
+            ("cold (database)", cold, max(1, iterations // 10)),
+            ("shared cache", shared, iterations),
+            ("local cache", warm, iterations),
+        ):
+            timings, recorder = [], QueryRecorder()
+            with recorder.record():
+                for _ in range(count):
+                    start = perf_counter()
+                    result = run()
+                    timings.append((perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+            self.stdout.write(
+                f"{label:<16} p50={statistics.median(timings):7.2f}ms "
+                f"p95={p95:7.2f}ms mutuals={result['count']} "
+                f"queries/call={recorder.count / count:.1f}"
+            )
+
+    @staticmethod
+    def _bench_viewer(star, options):
+        viewer, _ = User.objects.get_or_create(
+            username="bench_mutuals_viewer",
+            defaults={
+                "email": "bench_mutuals_viewer@bench.invalid",
+                "mobile": "0000000003",
+                "full_name": "Benchmark Viewer",
+            },
+        )
+        fan_ids = list(
+            FollowList.objects.filter(following=star).values_list(
+                "follower_id", flat=True
+            )
+        )
+        sample = random.Random(options["seed"]).sample(
+            fan_ids, min(options["viewer_follows"], len(fan_ids))
+        )
+        FollowList.objects.bulk_create(
+            [FollowList(follower=viewer, following_id=uid) for uid in sample],
+            ignore_conflicts=True,
+        )
+        return viewer
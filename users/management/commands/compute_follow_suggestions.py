@@ -0,0 +1,89 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max, Min
+
+from users.models import Profile
+from users.services.suggestions import compute_range
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+
+
+def _compute_chunk(args):
+    start_id, end_id, options = args
+    try:
+        return compute_range(start_id, end_id, **options)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute friend-of-friend follow suggestions (SuggestedFollow) in "
+        "user-id chunks across a process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of user ids scored per chunk.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help="Worker processes; 1 runs every chunk in this process.",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only recompute users whose following list changed since their last run.",
+        )
+        parser.add_argument("--top-k", type=int, help="Suggestions kept per user.")
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.all()
+        if options["incremental"]:
+            profiles = profiles.filter(suggestions_dirty=True)
+        bounds = profiles.aggregate(low=Min("user_id"), high=Max("user_id"))
+        if bounds["low"] is None:
+            self.stdout.write("No users to recompute.")
+            return
+
+        chunk_size = options["chunk_size"]
+        run_options = {
+            "incremental": options["incremental"],
+            "top_k": options["top_k"],
+        }
+        chunks = [
+            (start, start + chunk_size, run_options)
+            for start in range(bounds["low"], bounds["high"] + 1, chunk_size)
+        ]
+        if options["workers"] <= 1:
+            results = map(_compute_chunk, chunks)
+            self._report(results, len(chunks), options)
+            return
+
+        # Children are forked from this process; don't hand them open sockets.
+        connections.close_all()
+        with multiprocessing.Pool(options["workers"], initializer=_init_worker) as pool:
+            self._report(
+                pool.imap_unordered(_compute_chunk, chunks), len(chunks), options
+            )
+
+    def _report(self, results, total, options):
+        users = 0
+        for done, count in enumerate(results, start=1):
+            users += count
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Chunk {done}/{total} done ({count} users).")
+        self.stdout.write(
+            self.style.SUCCESS(f"Recomputed suggestions for {users} user(s).")
+        )
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from users.models import Profile
+from users.services.avatars import generate_derivatives
+
+
+def _generate(profile_id, source):
+    # Each worker thread gets its own connection; close it when done so the
+    # pool does not leak connections to the database.
+    try:
+        return generate_derivatives(profile_id, source)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Render resized avatar copies for every profile whose manifest is "
+        "missing or was built from an older avatar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of avatars rendered in parallel.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render avatars whose manifest is already up to date.",
+        )
+
+    def handle(self, *args, **options):
+        pending = [
+            (profile_id, avatar)
+            for profile_id, avatar, manifest in Profile.objects.exclude(avatar="")
+            .values_list("id", "avatar", "avatar_manifest")
+            .iterator()
+            if options["force"] or (manifest or {}).get("source") != avatar
+        ]
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = [pool.submit(_generate, *args) for args in pending]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"Failed: {exc}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Rendered {done} avatar(s), {failed} failed.")
+        )
@@ -0,0 +1,274 @@
+import csv
+import io
+import json
+import os
+import sys
+from itertools import islice
+from time import perf_counter
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.hashing import make_passwords, process_executor
+from users.models import Profile, User, UserSettings
+
+REQUIRED_FIELDS = ("username", "email", "mobile", "full_name")
+
+
+def _read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+def _read_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+READERS = {"csv": _read_csv, "ndjson": _read_ndjson}
+
+
+def _batches(records, size):
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def _parse(record):
+    """
+    Build an unsaved ``User`` from an input record.
+
+    Return ``(user, password)``: ``password`` is the plain text still to be
+    hashed, or None once ``user.password`` is set.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    missing = [name for name in REQUIRED_FIELDS if not record.get(name)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    values = {name: str(record[name]).strip() for name in REQUIRED_FIELDS}
+    for name, value in values.items():
+        if len(value) > User._meta.get_field(name).max_length:
+            raise ValueError(f"{name} is too long")
+    user = User(**values)
+    user.normalize_identifiers()
+    if encoded := record.get("password_hash"):
+        try:
+            identify_hasher(encoded)
+        except ValueError:
+            raise ValueError("password_hash is not a known hash format") from None
+        user.password = encoded
+        return user, None
+    if password := record.get("password"):
+        return user, password
+    user.password = make_password(None)
+    return user, None
+
+
+def _columns():
+    fields = [field for field in User._meta.concrete_fields if not field.primary_key]
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    return fields, columns
+
+
+def _values(fields, user):
+    return [
+        field.get_db_prep_save(field.pre_save(user, True), connection)
+        for field in fields
+    ]
+
+
+def _copy_users(users):
+    """
+    Load ``users`` with COPY and insert the ones that do not clash.
+
+    Returns the ids of the rows inserted.
+    """
+    fields, columns = _columns()
+    table = connection.ops.quote_name(User._meta.db_table)
+    buffer = io.StringIO()
+    # Only NULLs are left unquoted, which is how COPY tells them from "".
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+    for user in users:
+        writer.writerow(_values(fields, user))
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE import_users AS "
+            f"SELECT {columns} FROM {table} WITH NO DATA"
+        )
+        copy = f"COPY import_users ({columns}) FROM STDIN WITH (FORMAT csv)"
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(copy, buffer)
+        else:
+            with cursor.copy(copy) as stream:
+                stream.write(buffer.getvalue())
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM import_users "
+            f"ON CONFLICT DO NOTHING RETURNING id"
+        )
+        inserted = [user_id for (user_id,) in cursor.fetchall()]
+        cursor.execute("DROP TABLE import_users")
+    return inserted
+
+
+def _insert_users(users):
+    """Multi-row ``INSERT ... ON CONFLICT DO NOTHING``; returns the new ids."""
+    fields, columns = _columns()
+    table = connection.ops.quote_name(User._meta.db_table)
+    row = f"({', '.join(['%s'] * len(fields))})"
+    inserted = []
+    size = connection.ops.bulk_batch_size(fields, users) or len(users)
+    with connection.cursor() as cursor:
+        for offset in range(0, len(users), size):
+            chunk = users[offset : offset + size]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES "
+                f"{', '.join([row] * len(chunk))} "
+                f"ON CONFLICT DO NOTHING RETURNING id",
+                [value for user in chunk for value in _values(fields, user)],
+            )
+            inserted += [user_id for (user_id,) in cursor.fetchall()]
+    return inserted
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from a CSV or NDJSON file (columns: username, email, "
+        "mobile, full_name and password or password_hash). Passwords are "
+        "hashed on a process pool; users, profiles and settings are inserted "
+        "in batches without per-row signals, so no welcome email is sent. "
+        "Rows clashing with an existing username, email or mobile are "
+        "skipped. Progress is checkpointed after every batch and an "
+        "interrupted import resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Input file, or "-" for standard input.')
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format (default: from the file extension).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Password hashing processes (0 hashes in this process).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Progress file (default: <path>.checkpoint; none for stdin).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint and start from the first record.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or {
+            ".csv": "csv",
+            ".ndjson": "ndjson",
+            ".jsonl": "ndjson",
+        }.get(os.path.splitext(path)[1].lower())
+        if fmt is None:
+            raise CommandError("Cannot tell the input format; pass --format.")
+        self.checkpoint = options["checkpoint"] or (
+            None if path == "-" else f"{path}.checkpoint"
+        )
+        start = 0 if options["restart"] else self._read_checkpoint()
+        if start:
+            self.stdout.write(f"Resuming after record {start}.")
+
+        self.start, self.read, self.started = start, start, perf_counter()
+        self.processed, self.created, self.skipped, self.rejected = start, 0, 0, 0
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        pool = process_executor(options["workers"]) if options["workers"] else None
+        try:
+            records = islice(READERS[fmt](stream), start, None)
+            queued = None
+            for batch in _batches(records, options["batch_size"]):
+                # Hash the next batch while the current one is written.
+                parsed = self._parse_batch(batch, pool)
+                if queued:
+                    self._write(*queued)
+                queued = parsed
+            if queued:
+                self._write(*queued)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {self.created} user(s); {self.skipped} already "
+                f"taken, {self.rejected} rejected."
+            )
+        )
+
+    def _parse_batch(self, batch, pool):
+        users, passwords = [], []
+        for number, record in enumerate(batch, start=self.read + 1):
+            try:
+                user, password = _parse(record)
+            except ValueError as exc:
+                self.stderr.write(f"Record {number} rejected: {exc}")
+                continue
+            users.append(user)
+            if password is not None:
+                passwords.append((user, password))
+        self.read += len(batch)
+        hashed = make_passwords([password for _, password in passwords], pool)
+        return len(batch), users, passwords, hashed
+
+    def _write(self, count, users, passwords, hashed):
+        for (user, _), encoded in zip(passwords, hashed, strict=True):
+            user.password = encoded
+        with transaction.atomic():
+            if not users:
+                user_ids = []
+            elif connection.vendor == "postgresql":
+                user_ids = _copy_users(users)
+            else:
+                user_ids = _insert_users(users)
+            # Only the users inserted here: skipped rows belong to existing
+            # accounts, and a replayed batch was committed with its dependents.
+            Profile.objects.bulk_create(
+                [Profile(user_id=user_id) for user_id in user_ids]
+            )
+            UserSettings.objects.bulk_create(
+                [UserSettings(user_id=user_id) for user_id in user_ids]
+            )
+        self.processed += count
+        self.created += len(user_ids)
+        self.skipped += len(users) - len(user_ids)
+        self.rejected += count - len(users)
+        self._write_checkpoint()
+        rate = (self.processed - self.start) / (perf_counter() - self.started)
+        self.stdout.write(
+            f"{self.processed} records: {self.created} imported, "
+            f"{self.skipped} already taken, {self.rejected} rejected "
+            f"({rate:.0f}/s)"
+        )
+
+    def _read_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint) as f:
+            return int(f.read().strip() or 0)
+
+    def _write_checkpoint(self):
+        if not self.checkpoint:
+            return
+        partial = f"{self.checkpoint}.part"
+        with open(partial, "w") as f:
+            f.write(str(self.processed))
+        os.replace(partial, self.checkpoint)
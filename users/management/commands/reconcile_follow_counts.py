@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max, Min
+
+from users.models import Profile
+from users.services.counters import reconcile_range
+
+
+def _reconcile_chunk(start_id, end_id, dry_run):
+    # Each worker thread gets its own connection; close it when done so the
+    # pool does not leak connections to the database.
+    try:
+        return reconcile_range(start_id, end_id, dry_run=dry_run)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount Profile.followers_count / following_count from FollowList and "
+        "repair any counters that have drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Number of profile ids recounted per chunk.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of chunks recounted in parallel.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted profiles without writing the fixed counters.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        bounds = Profile.objects.aggregate(low=Min("id"), high=Max("id"))
+        if bounds["low"] is None:
+            self.stdout.write("No profiles to reconcile.")
+            return
+
+        chunks = [
+            (start, start + chunk_size)
+            for start in range(bounds["low"], bounds["high"] + 1, chunk_size)
+        ]
+        drifted = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = [
+                pool.submit(_reconcile_chunk, start, end, options["dry_run"])
+                for start, end in chunks
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                drifted += future.result()
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Chunk {done}/{len(chunks)} reconciled.")
+
+        action = "found" if options["dry_run"] else "repaired"
+        self.stdout.write(
+            self.style.SUCCESS(f"{drifted} drifted profile counter(s) {action}.")
+        )
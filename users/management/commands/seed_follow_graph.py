@@ -0,0 +1,73 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.models import FollowList, Profile, User
+from users.services.counters import apply_count_deltas
+
+SYLLABLES = ["ka", "ri", "mo", "sa", "len", "vi", "dra", "no", "tes", "ju", "pa", "ro"]
+
+
+def _fake_name(rng):
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+    last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return f"{first.title()} {last.title()}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed an account with a large synthetic follower base, for benchmarks "
+        "(e.g. bench_follow_search). Never run this against production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", default="bench_star")
+        parser.add_argument("--followers", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        star_name = options["username"]
+        star, _ = User.objects.get_or_create(
+            username=star_name,
+            defaults={
+                "email": f"{star_name}@bench.invalid",
+                "mobile": "0000000000",
+                "full_name": "Benchmark Star",
+            },
+        )
+        Profile.objects.get_or_create(user=star)
+        password = make_password(None)  # Unusable, hashed once for all rows.
+
+        total, batch_size = options["followers"], options["batch_size"]
+        prefix = f"{star_name}_fan"
+        start = User.objects.filter(username__startswith=prefix).count()
+        for offset in range(start, total, batch_size):
+            count = min(batch_size, total - offset)
+            fans = [
+                User(
+                    username=f"{prefix}{offset + i}",
+                    email=f"{prefix}{offset + i}@bench.invalid",
+                    mobile=f"1{star.pk:04d}{offset + i:010d}"[-15:],
+                    full_name=_fake_name(rng),
+                    password=password,
+                )
+                for i in range(count)
+            ]
+            for fan in fans:
+                fan.normalize_identifiers()
+            with transaction.atomic():
+                fans = User.objects.bulk_create(fans)
+                Profile.objects.bulk_create(
+                    Profile(user=fan, following_count=1) for fan in fans
+                )
+                FollowList.objects.bulk_create(
+                    FollowList(follower=fan, following=star) for fan in fans
+                )
+                apply_count_deltas(followers={star.pk: len(fans)})
+            self.stdout.write(f"{offset + count}/{total} followers seeded")
+
+        self.stdout.write(self.style.SUCCESS(f"{star_name} has {total} followers."))
@@ -3,6 +3,7 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 from core.models import TimeStampedModel
+from users.services.identifiers import normalize_email, normalize_mobile
 
 # ---------- User and Profile Models ----------
 
@@ -26,6 +27,15 @@ class User(AbstractUser):
         verbose_name="Mobile Number",
     )
 
+    # Lowercased email / digits-only mobile, kept in sync on save. Login resolves
+    # identifiers against these unique (hence indexed) columns in one query.
+    email_normalized = models.CharField(
+        max_length=254, unique=True, null=True, blank=True, editable=False
+    )
+    mobile_normalized = models.CharField(
+        max_length=15, unique=True, null=True, blank=True, editable=False
+    )
+
     # AbstractUser already has: username, email, password, is_staff, is_superuser, is_active
     # So we don't need to redefine them
 
@@ -35,6 +45,20 @@ class User(AbstractUser):
     def __str__(self):
         return str(self.username)
 
+    def normalize_identifiers(self):
+        self.email_normalized = normalize_email(self.email)
+        self.mobile_normalized = normalize_mobile(self.mobile)
+
+    def save(self, *args, **kwargs):
+        self.normalize_identifiers()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            extra = {"email": "email_normalized", "mobile": "mobile_normalized"}
+            kwargs["update_fields"] = set(update_fields) | {
+                extra[name] for name in update_fields if name in extra
+            }
+        super().save(*args, **kwargs)
+
 
 GENDER_CHOICES = [
     ("M", "Male"),
@@ -51,6 +75,9 @@ class Profile(TimeStampedModel):
     )
     bio = models.TextField(max_length=250, blank=True)
     avatar = models.ImageField(upload_to="avatars/", blank=True)
+    # Resized copies of ``avatar`` written by users.services.avatars:
+    # {"source": <avatar name>, "sizes": {"<px>": {"<format>": <storage name>}}}
+    avatar_manifest = models.JSONField(default=dict, blank=True, editable=False)
     gender = models.CharField(
         max_length=12,
         choices=GENDER_CHOICES,
@@ -59,6 +86,20 @@ class Profile(TimeStampedModel):
     )
     website = models.URLField(blank=True)
     is_private = models.BooleanField(default=False)
+    # Denormalized from FollowList, kept in sync by users.services.counters and
+    # repaired by the ``reconcile_follow_counts`` management command.
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set whenever the user's following list changes (in the same UPDATE as
+    # following_count); compute_follow_suggestions --incremental clears it.
+    suggestions_dirty = models.BooleanField(default=True, editable=False)
+
+    @classmethod
+    def from_db(cls, *args, **kwargs):
+        instance = super().from_db(*args, **kwargs)
+        # Lets users.signals release the stored file once it is replaced.
+        instance._loaded_avatar = instance.__dict__.get("avatar")
+        return instance
 
     def __str__(self):
         return f"Profile of {self.user.username}"
@@ -97,9 +138,17 @@ class FollowList(TimeStampedModel):
                 fields=["follower", "following"], name="unique_follow_pair"
             )
         ]
+        # Composite keyset indexes: they serve plain follower/following lookups
+        # and the (created_at, id) ordering used by core.pagination.KeysetPagination.
         indexes = [
-            models.Index(fields=["follower"]),
-            models.Index(fields=["following"]),
+            models.Index(
+                fields=["follower", "-created_at", "-id"],
+                name="followlist_follower_keyset",
+            ),
+            models.Index(
+                fields=["following", "-created_at", "-id"],
+                name="followlist_following_keyset",
+            ),
         ]
 
     def __str__(self):
@@ -124,11 +173,46 @@ class FollowRequest(TimeStampedModel):
                 fields=["from_user", "to_user"], name="unique_follow_request"
             )
         ]
+        # Keyset index for the recipient's inbox (FollowRequestInboxView).
+        indexes = [
+            models.Index(
+                fields=["to_user", "-created_at", "-id"],
+                name="followrequest_inbox_keyset",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.from_user.username} requested to follow {self.to_user.username}"
 
 
+class SuggestedFollow(TimeStampedModel):
+    """Precomputed friend-of-friend suggestion, see compute_follow_suggestions."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="follow_suggestions",
+    )
+    suggested = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    score = models.FloatField()
+    mutual_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "suggested"], name="unique_suggested_follow"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "-score"], name="suggestedfollow_user_score")
+        ]
+
+    def __str__(self):
+        return f"Suggest {self.suggested_id} to {self.user_id} ({self.score:.2f})"
+
+
 # ---------- Blocking & Muting ----------
 
 
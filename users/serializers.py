@@ -1,17 +1,20 @@
 import re
 
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
+from core.uploads import CheckedImageField
 from users.models import (
     BlockedUser,
     CloseFriend,
-    FollowList,
     MutedUser,
     Profile,
     User,
     UserSettings,
 )
+from users.services.avatars import avatar_url
 
 
 class RegisterSerializer(ModelSerializer):
@@ -29,10 +32,15 @@ class RegisterSerializer(ModelSerializer):
         ]
         extra_kwargs = {
             "password": {"write_only": True, "required": True},
-            "mobile": {"write_only": True, "required": True},
+            # Uniqueness is left to the database: see create().
+            "mobile": {"write_only": True, "required": True, "validators": []},
             "email": {"write_only": True, "required": True},
             "full_name": {"write_only": True, "required": True},
-            "username": {"write_only": True, "required": True},
+            "username": {
+                "write_only": True,
+                "required": True,
+                "validators": [User.username_validator],
+            },
             "confirm_password": {"write_only": True, "required": True},
         }
 
@@ -44,13 +52,9 @@ class RegisterSerializer(ModelSerializer):
             )
         if not mobile_str.isdigit():
             raise serializers.ValidationError("Mobile number must contain only digits.")
-        if User.objects.filter(mobile=value).exists():
-            raise serializers.ValidationError("Mobile number already exists.")
         return value
 
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Email already exists.")
         if "@" not in value:
             raise serializers.ValidationError("Enter a valid email address.")
         if len(value) < 5:
@@ -91,13 +95,53 @@ class RegisterSerializer(ModelSerializer):
 
     def create(self, validated_data):
         password = validated_data.pop("password")
+        # The async register view hashes off the event loop and passes the result.
+        password_hash = validated_data.pop("password_hash", None)
         validated_data.pop("confirm_password", None)
         user = User(**validated_data)
-        user.set_password(password)
-        user.save()
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(password)
+        # The user, profile, settings and welcome email job are INSERTed
+        # together (see users.signals); a taken username, email or mobile
+        # surfaces as a unique violation instead of a SELECT per field.
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError as exc:
+            errors = _duplicate_errors(exc)
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors) from exc
         return user
 
 
+# Unique column -> (field, message) for registration conflicts.
+_UNIQUE_COLUMNS = {
+    "username": ("username", "A user with that username already exists."),
+    "email_normalized": ("email", "Email already exists."),
+    "mobile": ("mobile", "Mobile number already exists."),
+    "mobile_normalized": ("mobile", "Mobile number already exists."),
+}
+
+
+def _duplicate_errors(exc):
+    """Map a unique violation on ``User`` to serializer field errors."""
+    # PostgreSQL names the violated constraint (<table>_<column>_key); SQLite
+    # only says "UNIQUE constraint failed: <table>.<column>".
+    diag = getattr(exc.__cause__, "diag", None)
+    constraint = getattr(diag, "constraint_name", None)
+    message = str(exc)
+    table = User._meta.db_table
+    return {
+        field: [error]
+        for column, (field, error) in _UNIQUE_COLUMNS.items()
+        if constraint == f"{table}_{column}_key"
+        or (constraint is None and message.endswith(f"{table}.{column}"))
+    }
+
+
 class LoginSerializer(serializers.Serializer):
     identifier = serializers.CharField(required=True, allow_blank=False)
     password = serializers.CharField(required=True, allow_blank=False, min_length=8)
@@ -115,9 +159,55 @@ class LoginSerializer(serializers.Serializer):
         return value
 
 
+class BulkFollowSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=150), required=False, default=list
+    )
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list
+    )
+
+    def validate(self, attrs):
+        # Duplicates are dropped, keeping the first occurrence.
+        attrs["usernames"] = list(dict.fromkeys(attrs["usernames"]))
+        attrs["user_ids"] = list(dict.fromkeys(attrs["user_ids"]))
+        total = len(attrs["usernames"]) + len(attrs["user_ids"])
+        if not total:
+            raise serializers.ValidationError("Provide usernames or user_ids.")
+        if total > settings.FOLLOW_BULK_MAX_TARGETS:
+            raise serializers.ValidationError(
+                f"At most {settings.FOLLOW_BULK_MAX_TARGETS} targets per request."
+            )
+        return attrs
+
+
+class FollowRequestBulkSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=["accept", "reject"])
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False
+    )
+    all = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        ids = attrs.get("ids")
+        if attrs["all"] == (ids is not None):
+            raise serializers.ValidationError('Provide either "ids" or "all": true.')
+        if ids is not None:
+            attrs["ids"] = list(dict.fromkeys(ids))
+            if not attrs["ids"]:
+                raise serializers.ValidationError("ids must not be empty.")
+            if len(attrs["ids"]) > settings.FOLLOW_BULK_MAX_TARGETS:
+                raise serializers.ValidationError(
+                    f"At most {settings.FOLLOW_BULK_MAX_TARGETS} ids per request."
+                )
+        return attrs
+
+
 class ProfileSerializer(ModelSerializer):
-    followers_count = serializers.SerializerMethodField()
-    following_count = serializers.SerializerMethodField()
+    serializer_field_mapping = {
+        **ModelSerializer.serializer_field_mapping,
+        models.ImageField: CheckedImageField,
+    }
 
     class Meta:
         model = Profile
@@ -134,6 +224,7 @@ class ProfileSerializer(ModelSerializer):
         extra_kwargs = {
             "user": {"read_only": True},
         }
+        read_only_fields = ["followers_count", "following_count"]
 
     def validate(self, attrs):
         bio = attrs.get("bio", "")
@@ -151,12 +242,6 @@ class ProfileSerializer(ModelSerializer):
                 raise serializers.ValidationError("Enter a valid URL for the website.")
         return attrs
 
-    def get_followers_count(self, obj):
-        return FollowList.objects.filter(following=obj.user).count()
-
-    def get_following_count(self, obj):
-        return FollowList.objects.filter(follower=obj.user).count()
-
 
 class UserPublicSerializer(serializers.ModelSerializer):
     avatar = serializers.SerializerMethodField()
@@ -166,11 +251,9 @@ class UserPublicSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "full_name", "avatar"]
 
     def get_avatar(self, obj):
-        return (
-            obj.profile.avatar.url
-            if hasattr(obj, "profile") and obj.profile.avatar
-            else None
-        )
+        if not hasattr(obj, "profile"):
+            return None
+        return avatar_url(obj.profile, self.context.get("request"))
 
 
 class FollowerSerializer(serializers.Serializer):
@@ -181,8 +264,7 @@ class FollowerSerializer(serializers.Serializer):
     profile_url = serializers.SerializerMethodField()
 
     def get_avatar(self, obj):
-        profile = obj.follower.profile
-        return profile.avatar.url if profile.avatar else None
+        return avatar_url(obj.follower.profile, self.context.get("request"))
 
     def get_profile_url(self, obj):
         return f"/profiles/{obj.follower.username}/"
@@ -196,13 +278,43 @@ class FollowingSerializer(serializers.Serializer):
     profile_url = serializers.SerializerMethodField()
 
     def get_avatar(self, obj):
-        profile = obj.following.profile
-        return profile.avatar.url if profile.avatar else None
+        return avatar_url(obj.following.profile, self.context.get("request"))
 
     def get_profile_url(self, obj):
         return f"/profiles/{obj.following.username}/"
 
 
+class SuggestedFollowSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source="suggested.id")
+    username = serializers.CharField(source="suggested.username")
+    full_name = serializers.CharField(source="suggested.full_name")
+    avatar = serializers.SerializerMethodField()
+    profile_url = serializers.SerializerMethodField()
+    mutual_count = serializers.IntegerField()
+
+    def get_avatar(self, obj):
+        return avatar_url(obj.suggested.profile, self.context.get("request"))
+
+    def get_profile_url(self, obj):
+        return f"/profiles/{obj.suggested.username}/"
+
+
+class FollowRequestSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    created_at = serializers.DateTimeField()
+    user_id = serializers.IntegerField(source="from_user.id")
+    username = serializers.CharField(source="from_user.username")
+    full_name = serializers.CharField(source="from_user.full_name")
+    avatar = serializers.SerializerMethodField()
+    profile_url = serializers.SerializerMethodField()
+
+    def get_avatar(self, obj):
+        return avatar_url(obj.from_user.profile, self.context.get("request"))
+
+    def get_profile_url(self, obj):
+        return f"/profiles/{obj.from_user.username}/"
+
+
 # ---------- Blocking ----------
 
 
@@ -0,0 +1,228 @@
+"""
+Avatar derivatives: small square copies of ``Profile.avatar`` for list rows.
+
+``ProfileView`` streams uploads through ``upload_handler``, which checks their
+size and dimensions on the way in. ``ProfileView.patch`` stores the upload as
+is and calls ``schedule_derivatives``, which hands the profile to a pool of
+``AVATAR_WORKERS`` threads once the transaction commits. A worker decodes the
+original once with Pillow, applies its EXIF orientation, and writes one
+centre-cropped copy per ``AVATAR_SIZES`` x ``AVATAR_FORMATS`` to the default
+storage. The copies carry no EXIF or other metadata. Their names are recorded
+in ``Profile.avatar_manifest`` together with the avatar they were rendered
+from.
+
+The manifest is only written if that avatar is still the current one, so a
+slow worker can never attach stale copies to a newer upload. Until the
+manifest catches up, ``avatar_url`` falls back to the original file.
+``python manage.py generate_avatar_derivatives`` renders missing manifests
+inline, e.g. for avatars uploaded before this existed.
+"""
+
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from core.uploads import ImageUploadHandler
+from users.models import Profile
+
+logger = logging.getLogger(__name__)
+
+# Pillow releases the GIL while decoding, resampling and encoding, so threads
+# render in parallel.
+_workers = ThreadPoolExecutor(
+    max_workers=settings.AVATAR_WORKERS, thread_name_prefix="avatars"
+)
+
+_SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "method": 4},
+    "jpeg": {"format": "JPEG", "optimize": True, "progressive": True},
+}
+
+
+def upload_handler(request):
+    """Return an upload handler enforcing the ``AVATAR_UPLOAD_*`` limits."""
+    return ImageUploadHandler(
+        request,
+        max_bytes=settings.AVATAR_UPLOAD_MAX_BYTES,
+        max_pixels=settings.AVATAR_UPLOAD_MAX_PIXELS,
+        max_dimension=settings.AVATAR_UPLOAD_MAX_DIMENSION,
+    )
+
+
+def schedule_derivatives(profile):
+    """
+    Render derivatives of ``profile.avatar`` in the background after commit.
+
+    A cleared avatar drops its manifest and derivatives right away.
+    """
+    if not profile.avatar:
+        _clear(profile)
+        return
+    source = profile.avatar.name
+    transaction.on_commit(lambda: _submit(_process, profile.pk, source))
+
+
+def _submit(fn, *args):
+    _workers.submit(fn, *args)
+
+
+def _process(profile_id, source):
+    try:
+        generate_derivatives(profile_id, source)
+    except Exception:
+        logger.exception("Avatar derivatives failed for profile %s", profile_id)
+    finally:
+        close_old_connections()
+
+
+def generate_derivatives(profile_id, source):
+    """
+    Render and store the derivatives of ``source``, the avatar of ``profile_id``.
+
+    Return the new manifest, or ``None`` when the profile no longer has
+    ``source`` as its avatar.
+    """
+    if not Profile.objects.filter(pk=profile_id, avatar=source).exists():
+        return None
+    with default_storage.open(source, "rb") as original:
+        content = original.read()
+    # Names follow the content, so a re-upload never reuses a cached URL.
+    digest = hashlib.blake2b(content, digest_size=8).hexdigest()
+    sizes = {}
+    for size, fmt, data in render(content):
+        name = default_storage.save(
+            f"avatars/derived/{profile_id}/{digest}/{size}.{fmt}", ContentFile(data)
+        )
+        sizes.setdefault(str(size), {})[fmt] = name
+    manifest = {"source": source, "sizes": sizes}
+
+    previous = (
+        Profile.objects.filter(pk=profile_id)
+        .values_list("avatar_manifest", flat=True)
+        .first()
+    )
+    updated = Profile.objects.filter(pk=profile_id, avatar=source).update(
+        avatar_manifest=manifest
+    )
+    if not updated:
+        _delete_files(manifest)
+        return None
+    if previous:
+        # Every save took its own reference, so release all previous names,
+        # including ones the new manifest shares.
+        _delete_files(previous)
+    return manifest
+
+
+def render(content):
+    """Yield ``(size, format, bytes)`` for every configured derivative of ``content``."""
+    largest = max(settings.AVATAR_SIZES)
+    with Image.open(io.BytesIO(content)) as image:
+        # JPEG sources decode straight at a reduced scale that still covers
+        # the largest size.
+        image.draft("RGB", (largest, largest))
+        image = _flatten(ImageOps.exif_transpose(image))
+    for size in sorted(settings.AVATAR_SIZES, reverse=True):
+        # Downscale from the previous (larger) crop; each step stays cheap.
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        for fmt in settings.AVATAR_FORMATS:
+            buffer = io.BytesIO()
+            # No ``exif``/``icc_profile`` is passed, so none is written.
+            image.save(buffer, quality=settings.AVATAR_QUALITY, **_SAVE_OPTIONS[fmt])
+            yield size, fmt, buffer.getvalue()
+
+
+def _flatten(image):
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _clear(profile):
+    if profile.avatar_manifest:
+        _delete_files(profile.avatar_manifest)
+        Profile.objects.filter(pk=profile.pk).update(avatar_manifest={})
+        profile.avatar_manifest = {}
+
+
+def _delete_files(manifest):
+    for name in _names(manifest):
+        default_storage.delete(name)
+
+
+def release_files(*names):
+    """Delete the stored files ``names`` once the transaction commits."""
+    names = [name for name in names if name]
+
+    def _delete():
+        for name in names:
+            default_storage.delete(name)
+
+    if names:
+        transaction.on_commit(_delete)
+
+
+def stored_files(profile):
+    """Names of the avatar of ``profile`` and its derivatives."""
+    return [profile.avatar.name, *_names(profile.avatar_manifest)]
+
+
+def _names(manifest):
+    # A list, not a set: each occurrence was saved, and holds a reference.
+    return [
+        name
+        for formats in manifest.get("sizes", {}).values()
+        for name in formats.values()
+    ]
+
+
+def avatar_preferences(request):
+    """
+    Return the ``(size, format)`` ``request`` asked for.
+
+    ``?avatar_size=`` and ``?avatar_format=`` win; otherwise the size is
+    ``AVATAR_DEFAULT_SIZE`` and the format WebP when the client accepts it.
+    """
+    size, fmt = settings.AVATAR_DEFAULT_SIZE, None
+    if request is None:
+        return size, fmt
+    try:
+        size = int(request.GET.get("avatar_size", size))
+    except (TypeError, ValueError):
+        pass
+    fmt = request.GET.get("avatar_format")
+    if fmt not in settings.AVATAR_FORMATS:
+        accepts_webp = "image/webp" in request.headers.get("Accept", "")
+        fmt = "webp" if accepts_webp else None
+    return size, fmt
+
+
+def avatar_url(profile, request=None):
+    """
+    URL of ``profile``'s avatar at the size and format ``request`` asked for.
+
+    The smallest derivative at least as large as requested is used, or the
+    largest one. Without up-to-date derivatives, the original's URL is
+    returned; without an avatar, ``None``.
+    """
+    if not profile.avatar:
+        return None
+    manifest = profile.avatar_manifest
+    if not manifest or manifest.get("source") != profile.avatar.name:
+        return profile.avatar.url
+    size, fmt = avatar_preferences(request)
+    available = sorted(int(px) for px in manifest["sizes"])
+    chosen = next((px for px in available if px >= size), available[-1])
+    formats = manifest["sizes"][str(chosen)]
+    name = formats.get(fmt) or formats.get("jpeg") or next(iter(formats.values()))
+    return default_storage.url(name)
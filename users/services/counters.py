@@ -0,0 +1,151 @@
+"""
+Denormalized follower/following counters stored on ``Profile``.
+
+Every write to ``FollowList`` has to go through one of these helpers (directly,
+or through the ``FollowList`` signal receivers) so the counters change in the
+same transaction as the follow rows themselves.
+"""
+
+from contextvars import ContextVar
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from users.models import FollowList, Profile
+from users.services import graph, profile_cache
+from users.services.mutuals import invalidate_follow_ids
+
+# User ids whose follow rows are being removed by an account deletion. Their
+# counters are released in bulk, so the per-row receivers must skip them.
+_released_users: ContextVar[frozenset] = ContextVar(
+    "released_users", default=frozenset()
+)
+
+
+def apply_count_deltas(followers=None, following=None):
+    """
+    Apply per-user deltas to ``followers_count`` and ``following_count``.
+
+    ``followers`` and ``following`` map ``user_id -> delta``. Users sharing the
+    same delta are updated with a single ``UPDATE ... WHERE user_id IN (...)``.
+    The cached id lists behind ``users.services.mutuals`` are dropped and the
+    cached profile responses (``users.services.profile_cache``) invalidated.
+    """
+    invalidate_follow_ids(
+        followers=[uid for uid, delta in (followers or {}).items() if delta],
+        following=[uid for uid, delta in (following or {}).items() if delta],
+    )
+    profile_cache.bump_versions(
+        *{
+            uid
+            for deltas in (followers or {}, following or {})
+            for uid, delta in deltas.items()
+            if delta
+        }
+    )
+    for field, deltas in (
+        ("followers_count", followers or {}),
+        ("following_count", following or {}),
+    ):
+        by_delta = {}
+        for user_id, delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(user_id)
+        extra = {"suggestions_dirty": True} if field == "following_count" else {}
+        for delta, user_ids in by_delta.items():
+            Profile.objects.filter(user_id__in=user_ids).update(
+                **{field: Greatest(F(field) + delta, Value(0))}, **extra
+            )
+
+
+def record_follow(follower_id, following_id, delta=1):
+    """Account for one follow edge being created (``delta=1``) or removed."""
+    apply_count_deltas(followers={following_id: delta}, following={follower_id: delta})
+    edge = [(follower_id, following_id)]
+    graph.edges_changed(
+        added=edge if delta > 0 else (), removed=edge if delta < 0 else ()
+    )
+
+
+def is_released(follower_id, following_id):
+    released = _released_users.get()
+    return follower_id in released or following_id in released
+
+
+def release_user(user_id):
+    """
+    Drop the counters held by ``user_id``'s edges before the account is deleted.
+
+    Runs two set-based updates instead of one update per follow row, then marks
+    the user so the per-row ``post_delete`` receivers leave the counters alone.
+    As with ``apply_count_deltas``, the counterparts' cached id lists and
+    profile responses are invalidated and their suggestions marked dirty.
+    """
+    follower_ids = list(
+        FollowList.objects.filter(following_id=user_id).values_list(
+            "follower_id", flat=True
+        )
+    )
+    followed_ids = list(
+        FollowList.objects.filter(follower_id=user_id).values_list(
+            "following_id", flat=True
+        )
+    )
+    Profile.objects.filter(user_id__in=follower_ids).update(
+        following_count=Greatest(F("following_count") - 1, Value(0)),
+        suggestions_dirty=True,
+    )
+    Profile.objects.filter(user_id__in=followed_ids).update(
+        followers_count=Greatest(F("followers_count") - 1, Value(0)),
+        suggestions_dirty=True,
+    )
+    invalidate_follow_ids(
+        followers=[user_id, *followed_ids], following=[user_id, *follower_ids]
+    )
+    profile_cache.bump_versions(*follower_ids, *followed_ids)
+    graph.forget_users(user_id)
+    _released_users.set(_released_users.get() | {user_id})
+
+
+def forget_released_user(user_id):
+    _released_users.set(_released_users.get() - {user_id})
+
+
+def _count_subquery(field):
+    return Coalesce(
+        Subquery(
+            FollowList.objects.filter(**{field: OuterRef("user_id")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def reconcile_range(start_id, end_id, dry_run=False):
+    """
+    Recount the profiles with ``start_id <= id < end_id``.
+
+    Returns the number of profiles whose stored counters had drifted; those are
+    rewritten from ``FollowList`` unless ``dry_run`` is set.
+    """
+    profiles = Profile.objects.filter(id__gte=start_id, id__lt=end_id)
+    drifted = list(
+        profiles.annotate(
+            actual_followers=_count_subquery("following"),
+            actual_following=_count_subquery("follower"),
+        )
+        .filter(
+            ~Q(followers_count=F("actual_followers"))
+            | ~Q(following_count=F("actual_following"))
+        )
+        .values_list("id", flat=True)
+    )
+    if drifted and not dry_run:
+        Profile.objects.filter(id__in=drifted).update(
+            followers_count=_count_subquery("following"),
+            following_count=_count_subquery("follower"),
+        )
+    return len(drifted)
@@ -0,0 +1,426 @@
+"""
+Follow writes: single-statement upserts for one target, set-based batches.
+
+The single-target helpers (``follow_user``, ``request_follow``,
+``accept_follow_request``) are built on ``INSERT ... ON CONFLICT DO NOTHING
+RETURNING`` and ``unfollow_user`` on ``DELETE ... RETURNING``. The database
+settles duplicate taps, so concurrent requests get an idempotent answer
+instead of an ``IntegrityError``. Whoever actually inserted or deleted the row
+applies the counter change.
+
+For batches, targets are resolved with one query and each kind of row
+(``FollowList`` for public accounts, ``FollowRequest`` for private ones) is
+written with a single statement. The follower's ``Profile`` row is locked for
+the duration, so two batches from the same account serialize, and the counters
+are updated in the same transaction with one ``apply_count_deltas`` call.
+The follow-request inbox is accepted or rejected in bulk the same way.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import FollowList, FollowRequest, Profile, User
+from users.services import counters, graph
+
+FOLLOWED = "followed"
+REQUESTED = "requested"
+ALREADY_FOLLOWING = "already_following"
+ALREADY_REQUESTED = "already_requested"
+UNFOLLOWED = "unfollowed"
+REQUEST_CANCELLED = "request_cancelled"
+NOT_FOLLOWING = "not_following"
+NOT_FOUND = "not_found"
+SELF = "self"
+ACCEPTED = "accepted"
+FORBIDDEN = "forbidden"
+
+FOLLOW_TABLE = FollowList._meta.db_table
+REQUEST_TABLE = FollowRequest._meta.db_table
+
+
+def _now():
+    return connection.ops.adapt_datetimefield_value(timezone.now())
+
+
+@transaction.atomic
+def follow_user(follower_id, following_id):
+    """Create the follow edge; returns ``FOLLOWED`` or ``ALREADY_FOLLOWING``."""
+    now = _now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {FOLLOW_TABLE} (follower_id, following_id, created_at, updated_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT DO NOTHING
+            RETURNING id
+            """,
+            [follower_id, following_id, now, now],
+        )
+        created = cursor.fetchone() is not None
+    if not created:
+        return ALREADY_FOLLOWING
+    counters.record_follow(follower_id, following_id)
+    return FOLLOWED
+
+
+@transaction.atomic
+def unfollow_user(follower_id, following_id):
+    """Delete the follow edge; returns ``UNFOLLOWED`` or ``NOT_FOLLOWING``."""
+    removed = _delete_returning(
+        FOLLOW_TABLE, "follower_id", follower_id, "following_id", [following_id]
+    )
+    if not removed:
+        return NOT_FOLLOWING
+    counters.record_follow(follower_id, following_id, delta=-1)
+    return UNFOLLOWED
+
+
+def request_follow(from_user_id, to_user_id):
+    """
+    Ask to follow a private account.
+
+    Returns ``REQUESTED``, ``ALREADY_REQUESTED`` or ``ALREADY_FOLLOWING``. The
+    insert is skipped when the edge already exists. Only that no-op path runs a
+    second query to tell the two "already" cases apart.
+    """
+    now = _now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {REQUEST_TABLE} (from_user_id, to_user_id, created_at, updated_at)
+            SELECT %s, %s, %s, %s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {FOLLOW_TABLE} WHERE follower_id = %s AND following_id = %s
+            )
+            ON CONFLICT DO NOTHING
+            RETURNING id
+            """,
+            [from_user_id, to_user_id, now, now, from_user_id, to_user_id],
+        )
+        if cursor.fetchone() is not None:
+            return REQUESTED
+    if FollowList.objects.filter(
+        follower_id=from_user_id, following_id=to_user_id
+    ).exists():
+        return ALREADY_FOLLOWING
+    return ALREADY_REQUESTED
+
+
+@transaction.atomic
+def accept_follow_request(request_id, to_user_id):
+    """
+    Turn a pending request addressed to ``to_user_id`` into a follow edge.
+
+    On PostgreSQL the delete and the insert are one statement (a data-modifying
+    CTE). Other databases use ``DELETE ... RETURNING`` followed by the insert.
+    Returns ``ACCEPTED``, ``FORBIDDEN`` (the request is someone else's) or
+    ``NOT_FOUND`` (including a request that a concurrent call just accepted).
+    """
+    now = _now()
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"""
+                WITH accepted AS (
+                    DELETE FROM {REQUEST_TABLE} WHERE id = %s AND to_user_id = %s
+                    RETURNING from_user_id, to_user_id
+                ), inserted AS (
+                    INSERT INTO {FOLLOW_TABLE}
+                        (follower_id, following_id, created_at, updated_at)
+                    SELECT from_user_id, to_user_id, %s, %s FROM accepted
+                    ON CONFLICT DO NOTHING
+                    RETURNING follower_id
+                )
+                SELECT (SELECT from_user_id FROM accepted),
+                       (SELECT follower_id FROM inserted)
+                """,
+                [request_id, to_user_id, now, now],
+            )
+            from_user_id, inserted = cursor.fetchone()
+        else:
+            cursor.execute(
+                f"DELETE FROM {REQUEST_TABLE} WHERE id = %s AND to_user_id = %s "
+                "RETURNING from_user_id",
+                [request_id, to_user_id],
+            )
+            row = cursor.fetchone()
+            from_user_id = inserted = row and row[0]
+            if from_user_id is not None:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {FOLLOW_TABLE}
+                        (follower_id, following_id, created_at, updated_at)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT DO NOTHING
+                    RETURNING follower_id
+                    """,
+                    [from_user_id, to_user_id, now, now],
+                )
+                inserted = cursor.fetchone()
+    if from_user_id is None:
+        if FollowRequest.objects.filter(id=request_id).exists():
+            return FORBIDDEN
+        return NOT_FOUND
+    if inserted is not None:
+        counters.record_follow(from_user_id, to_user_id)
+    return ACCEPTED
+
+
+def _inbox_clause(to_user_id, request_ids):
+    sql, params = "to_user_id = %s", [to_user_id]
+    if request_ids is not None:
+        sql += f" AND id IN ({', '.join(['%s'] * len(request_ids))})"
+        params += list(request_ids)
+    return sql, params
+
+
+@transaction.atomic
+def accept_follow_requests(to_user, request_ids=None):
+    """
+    Accept pending requests addressed to ``to_user``: ``request_ids``, or all.
+
+    The rows are moved into ``FollowList`` with one ``INSERT ... SELECT`` fed by
+    the ``DELETE`` (a data-modifying CTE on PostgreSQL; ``DELETE ... RETURNING``
+    plus a multi-row insert elsewhere), so a request that arrives meanwhile is
+    neither accepted nor lost. Counters are applied once for the batch.
+    Returns the ids of the accepted requests.
+    """
+    if request_ids is not None and not request_ids:
+        return []
+    _lock_follower(to_user)
+    where, params = _inbox_clause(to_user.pk, request_ids)
+    now = _now()
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {REQUEST_TABLE} WHERE {where}
+                    RETURNING id, from_user_id
+                ), inserted AS (
+                    INSERT INTO {FOLLOW_TABLE}
+                        (follower_id, following_id, created_at, updated_at)
+                    SELECT from_user_id, %s, %s, %s FROM moved
+                    ON CONFLICT DO NOTHING
+                    RETURNING follower_id
+                )
+                SELECT moved.id, inserted.follower_id
+                FROM moved LEFT JOIN inserted ON inserted.follower_id = moved.from_user_id
+                """,
+                [*params, to_user.pk, now, now],
+            )
+            rows = cursor.fetchall()
+            accepted = [request_id for request_id, _ in rows]
+            followers = [follower_id for _, follower_id in rows if follower_id]
+        else:
+            cursor.execute(
+                f"DELETE FROM {REQUEST_TABLE} WHERE {where} RETURNING id, from_user_id",
+                params,
+            )
+            moved = cursor.fetchall()
+            accepted = [request_id for request_id, _ in moved]
+            followers = []
+            if moved:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {FOLLOW_TABLE}
+                        (follower_id, following_id, created_at, updated_at)
+                    VALUES {", ".join(["(%s, %s, %s, %s)"] * len(moved))}
+                    ON CONFLICT DO NOTHING
+                    RETURNING follower_id
+                    """,
+                    [
+                        value
+                        for _, from_user_id in moved
+                        for value in (from_user_id, to_user.pk, now, now)
+                    ],
+                )
+                followers = [follower_id for (follower_id,) in cursor.fetchall()]
+    counters.apply_count_deltas(
+        followers={to_user.pk: len(followers)},
+        following=dict.fromkeys(followers, 1),
+    )
+    graph.edges_changed(added=[(follower_id, to_user.pk) for follower_id in followers])
+    return accepted
+
+
+@transaction.atomic
+def reject_follow_requests(to_user, request_ids=None):
+    """Delete pending requests addressed to ``to_user``; returns their ids."""
+    if request_ids is not None and not request_ids:
+        return []
+    where, params = _inbox_clause(to_user.pk, request_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {REQUEST_TABLE} WHERE {where} RETURNING id", params
+        )
+        return [request_id for (request_id,) in cursor.fetchall()]
+
+
+def resolve_targets(usernames=(), user_ids=()):
+    """
+    Map each requested username / id to ``(user_id, is_private)`` in one query.
+
+    Unknown targets are left out of the result.
+    """
+    rows = (
+        User.objects.filter(username__in=list(usernames))
+        | User.objects.filter(id__in=list(user_ids))
+    ).values_list("id", "username", "profile__is_private")
+    resolved = {}
+    for user_id, username, is_private in rows:
+        resolved[username] = resolved[user_id] = (user_id, bool(is_private))
+    return resolved
+
+
+def _lock_follower(follower):
+    list(
+        Profile.objects.select_for_update()
+        .filter(user_id=follower.pk)
+        .values_list("id", flat=True)
+    )
+
+
+def _existing_follows(follower, target_ids):
+    return set(
+        FollowList.objects.filter(
+            follower=follower, following_id__in=target_ids
+        ).values_list("following_id", flat=True)
+    )
+
+
+def _insert_returning(table, columns, rows, returning):
+    """
+    Insert ``rows`` with ``ON CONFLICT DO NOTHING`` in one statement.
+
+    Returns the set of ``returning`` values of the rows actually inserted.
+    """
+    if not rows:
+        return set()
+    values = ", ".join([f"({', '.join(['%s'] * len(columns))})"] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES {values}
+            ON CONFLICT DO NOTHING
+            RETURNING {returning}
+            """,
+            [value for row in rows for value in row],
+        )
+        return {value for (value,) in cursor.fetchall()}
+
+
+def _delete_returning(table, owner_column, owner_id, target_column, target_ids):
+    """
+    Delete ``owner_id``'s rows pointing at ``target_ids`` in one statement.
+
+    Returns the set of ``target_column`` values of the rows actually deleted.
+    """
+    if not target_ids:
+        return set()
+    placeholders = ", ".join(["%s"] * len(target_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            DELETE FROM {table}
+            WHERE {owner_column} = %s AND {target_column} IN ({placeholders})
+            RETURNING {target_column}
+            """,
+            [owner_id, *target_ids],
+        )
+        return {value for (value,) in cursor.fetchall()}
+
+
+def _statuses(targets, resolved, follower, decide):
+    results = []
+    for target in targets:
+        user_id, is_private = resolved.get(target, (None, False))
+        if user_id is None:
+            status = NOT_FOUND
+        elif user_id == follower.pk:
+            status = SELF
+        else:
+            status = decide(user_id, is_private)
+        results.append({"target": target, "status": status})
+    return results
+
+
+@transaction.atomic
+def bulk_follow(follower, usernames=(), user_ids=()):
+    """
+    Follow every public target and request every private one.
+
+    Returns ``[{"target": ..., "status": ...}]`` in request order (usernames
+    first, then ids).
+    """
+    _lock_follower(follower)
+    resolved = resolve_targets(usernames, user_ids)
+    target_ids = {user_id for user_id, _ in resolved.values()} - {follower.pk}
+    public = {uid for uid, private in resolved.values() if not private} & target_ids
+    private = target_ids - public
+
+    following = _existing_follows(follower, target_ids)
+    now = _now()
+    # Deltas and statuses come from what the INSERTs report, not from the read
+    # above: a single follow_user committed since then is skipped here, not
+    # counted twice.
+    followed = _insert_returning(
+        FOLLOW_TABLE,
+        ("follower_id", "following_id", "created_at", "updated_at"),
+        [(follower.pk, uid, now, now) for uid in public - following],
+        "following_id",
+    )
+    requested = _insert_returning(
+        REQUEST_TABLE,
+        ("from_user_id", "to_user_id", "created_at", "updated_at"),
+        [(follower.pk, uid, now, now) for uid in private - following],
+        "to_user_id",
+    )
+    counters.apply_count_deltas(
+        followers=dict.fromkeys(followed, 1),
+        following={follower.pk: len(followed)},
+    )
+    graph.edges_changed(added=[(follower.pk, uid) for uid in followed])
+
+    def decide(user_id, is_private):
+        if user_id in followed:
+            return FOLLOWED
+        if user_id in requested:
+            return REQUESTED
+        if user_id in following or not is_private:
+            return ALREADY_FOLLOWING
+        return ALREADY_REQUESTED
+
+    return _statuses([*usernames, *user_ids], resolved, follower, decide)
+
+
+@transaction.atomic
+def bulk_unfollow(follower, usernames=(), user_ids=()):
+    """Remove follow edges and cancel pending requests to every target."""
+    _lock_follower(follower)
+    resolved = resolve_targets(usernames, user_ids)
+    target_ids = {user_id for user_id, _ in resolved.values()} - {follower.pk}
+
+    # As in bulk_follow, deltas come from the rows the DELETE removed: an edge
+    # a concurrent unfollow already deleted is not counted twice.
+    unfollowed = _delete_returning(
+        FOLLOW_TABLE, "follower_id", follower.pk, "following_id", target_ids
+    )
+    cancelled = _delete_returning(
+        REQUEST_TABLE, "from_user_id", follower.pk, "to_user_id", target_ids
+    )
+    counters.apply_count_deltas(
+        followers=dict.fromkeys(unfollowed, -1),
+        following={follower.pk: -len(unfollowed)},
+    )
+    graph.edges_changed(removed=[(follower.pk, uid) for uid in unfollowed])
+
+    def decide(user_id, is_private):
+        if user_id in unfollowed:
+            return UNFOLLOWED
+        if user_id in cancelled:
+            return REQUEST_CANCELLED
+        return NOT_FOLLOWING
+
+    return _statuses([*usernames, *user_ids], resolved, follower, decide)
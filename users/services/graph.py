@@ -0,0 +1,242 @@
+"""
+Optional in-process adjacency cache of the follow graph.
+
+With ``FOLLOW_GRAPH_CACHE`` enabled, each user's follower and following ids
+are kept as a sorted ``array('q')`` (one CSR row per user and direction). Rows
+are loaded on first use with one query, evicted least-recently-used once
+``FOLLOW_GRAPH_MEMORY_BYTES`` is exceeded, and expire after
+``FOLLOW_GRAPH_TTL`` seconds. The TTL bounds how stale a row can get from
+writes made by other processes.
+
+Writes in this process patch cached rows instead of dropping them.
+``counters.record_follow`` (the ``FollowList`` post_save/post_delete receivers
+and the single-statement upserts) and the bulk follow helpers report edges
+here. The change is applied when the transaction commits. Rows are replaced,
+never mutated, so an array handed to a caller stays valid.
+
+``is_following``, ``followers_of`` and ``following_of`` fall back to plain
+queries when the cache is disabled.
+"""
+
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from time import monotonic
+
+from django.conf import settings
+from django.db import transaction
+
+from core.cache import track_local_cache
+from users.models import FollowList
+
+FOLLOWERS = "followers"
+FOLLOWING = "following"
+
+# (filter field, id column) for each direction.
+_SIDES = {
+    FOLLOWERS: ("following_id", "follower_id"),
+    FOLLOWING: ("follower_id", "following_id"),
+}
+
+
+def load_row(user_id, side):
+    """Sorted ``array('q')`` of ``user_id``'s followers or followings, from SQL."""
+    filter_field, column = _SIDES[side]
+    return array(
+        "q",
+        FollowList.objects.filter(**{filter_field: user_id})
+        .order_by(column)
+        .values_list(column, flat=True)
+        .iterator(chunk_size=10_000),
+    )
+
+
+def _contains(row, value):
+    i = bisect_left(row, value)
+    return i < len(row) and row[i] == value
+
+
+def _with(row, value, present):
+    """Copy of ``row`` with ``value`` inserted or removed, kept sorted."""
+    i = bisect_left(row, value)
+    found = i < len(row) and row[i] == value
+    if found == present:
+        return row
+    updated = array("q", row)
+    if present:
+        updated.insert(i, value)
+    else:
+        del updated[i]
+    return updated
+
+
+class AdjacencyCache:
+    """LRU of per-user adjacency rows under a memory budget in bytes."""
+
+    def __init__(self, memory_budget, ttl):
+        self.memory_budget = memory_budget
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._rows = OrderedDict()  # (side, user_id) -> (expires, size, row)
+        self._loading = {}  # (side, user_id) -> dirty flag
+        self._lock = threading.Lock()
+        track_local_cache(self)
+
+    def row(self, user_id, side):
+        key = (side, user_id)
+        with self._lock:
+            entry = self._rows.get(key)
+            if entry is not None and entry[0] > monotonic():
+                self._rows.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            self._loading[key] = False
+        try:
+            row = load_row(user_id, side)
+        except BaseException:
+            with self._lock:
+                self._loading.pop(key, None)
+            raise
+        with self._lock:
+            # An edge changed while we were reading: the row may be stale.
+            if not self._loading.pop(key, True):
+                self._store(key, row)
+        return row
+
+    def peek(self, user_id, side):
+        """Return the cached row, or ``None``; never loads."""
+        with self._lock:
+            entry = self._rows.get((side, user_id))
+            if entry is None or entry[0] <= monotonic():
+                return None
+            return entry[2]
+
+    def is_following(self, follower_id, following_id):
+        # Answer from whichever row is already cached before loading one.
+        row = self.peek(follower_id, FOLLOWING)
+        if row is not None:
+            return _contains(row, following_id)
+        row = self.peek(following_id, FOLLOWERS)
+        if row is not None:
+            return _contains(row, follower_id)
+        return _contains(self.row(follower_id, FOLLOWING), following_id)
+
+    def apply(self, added=(), removed=()):
+        """Add/remove ``(follower_id, following_id)`` edges in cached rows."""
+        with self._lock:
+            for edges, present in ((added, True), (removed, False)):
+                for follower_id, following_id in edges:
+                    self._update((FOLLOWING, follower_id), following_id, present)
+                    self._update((FOLLOWERS, following_id), follower_id, present)
+
+    def forget(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                for side in _SIDES:
+                    self._drop((side, user_id))
+                    if (side, user_id) in self._loading:
+                        self._loading[(side, user_id)] = True
+
+    def memory_usage(self, user_id):
+        """Bytes held for ``user_id`` across both directions."""
+        with self._lock:
+            return sum(
+                self._rows[(side, user_id)][1]
+                for side in _SIDES
+                if (side, user_id) in self._rows
+            )
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "rows": len(self._rows),
+            "bytes": self.bytes,
+            "memory_budget": self.memory_budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self.bytes = 0
+            for key in self._loading:
+                self._loading[key] = True
+
+    def _update(self, key, value, present):
+        if key in self._loading:
+            self._loading[key] = True
+        entry = self._rows.get(key)
+        if entry is not None:
+            expires, _, row = entry
+            self._store(key, _with(row, value, present), expires)
+
+    def _store(self, key, row, expires=None):
+        size = sys.getsizeof(row)
+        if size > self.memory_budget:
+            return
+        self._drop(key)
+        self._rows[key] = (expires or monotonic() + self.ttl, size, row)
+        self.bytes += size
+        while self.bytes > self.memory_budget:
+            _, (_, evicted, _) = self._rows.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def _drop(self, key):
+        entry = self._rows.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+
+_graph = AdjacencyCache(
+    memory_budget=settings.FOLLOW_GRAPH_MEMORY_BYTES, ttl=settings.FOLLOW_GRAPH_TTL
+)
+
+
+def get_graph():
+    return _graph
+
+
+def is_following(follower_id, following_id):
+    if settings.FOLLOW_GRAPH_CACHE:
+        return _graph.is_following(follower_id, following_id)
+    return FollowList.objects.filter(
+        follower_id=follower_id, following_id=following_id
+    ).exists()
+
+
+def followers_of(user_id):
+    if settings.FOLLOW_GRAPH_CACHE:
+        return _graph.row(user_id, FOLLOWERS)
+    return load_row(user_id, FOLLOWERS)
+
+
+def following_of(user_id):
+    if settings.FOLLOW_GRAPH_CACHE:
+        return _graph.row(user_id, FOLLOWING)
+    return load_row(user_id, FOLLOWING)
+
+
+def edges_changed(added=(), removed=()):
+    """Report committed-to-be edge changes; applied once the transaction commits."""
+    if not settings.FOLLOW_GRAPH_CACHE or not (added or removed):
+        return
+    added, removed = list(added), list(removed)
+    transaction.on_commit(lambda: _graph.apply(added=added, removed=removed))
+
+
+def forget_users(*user_ids):
+    if settings.FOLLOW_GRAPH_CACHE:
+        _graph.forget(*user_ids)
+        transaction.on_commit(lambda: _graph.forget(*user_ids))
@@ -0,0 +1,75 @@
+"""
+Login identifier classification and normalization.
+
+A login identifier is classified once (email / phone / username) and resolved
+with a single indexed query against ``User.username`` and the normalized
+``email_normalized`` / ``mobile_normalized`` columns.
+"""
+
+import re
+
+from django.db.models import Q
+
+EMAIL, PHONE, USERNAME = "email", "phone", "username"
+
+_PHONE_RE = re.compile(r"^\+?[\d\s().-]+$")
+_MIN_PHONE_DIGITS = 7
+
+
+def normalize_email(value):
+    value = (value or "").strip().lower()
+    return value or None
+
+
+def normalize_mobile(value):
+    """Return the canonical digits-only form of a mobile number."""
+    digits = re.sub(r"\D", "", str(value or ""))
+    return digits or None
+
+
+def classify_identifier(identifier):
+    """Return ``(kind, normalized_value)`` for a login identifier."""
+    if "@" in identifier:
+        return EMAIL, normalize_email(identifier)
+    if _PHONE_RE.match(identifier):
+        digits = normalize_mobile(identifier)
+        if digits and len(digits) >= _MIN_PHONE_DIGITS:
+            return PHONE, digits
+    return USERNAME, identifier
+
+
+def _login_lookup(identifier):
+    kind, normalized = classify_identifier(identifier)
+    lookup = Q(username=identifier)
+    if kind == EMAIL:
+        lookup |= Q(email_normalized=normalized)
+    elif kind == PHONE:
+        lookup |= Q(mobile_normalized=normalized)
+    return kind, lookup
+
+
+def _pick_login_user(candidates, identifier):
+    for user in candidates:
+        if user.username == identifier:
+            return user
+    return candidates[0] if candidates else None
+
+
+def resolve_login_user(queryset, identifier):
+    """
+    Return ``(kind, user)`` for ``identifier`` using one query.
+
+    Usernames may contain ``@`` or look like phone numbers, so an exact username
+    match is always part of the lookup and wins over the classified column,
+    matching the old username -> email -> mobile precedence.
+    """
+    kind, lookup = _login_lookup(identifier)
+    candidates = list(queryset.filter(lookup)[:2])
+    return kind, _pick_login_user(candidates, identifier)
+
+
+async def aresolve_login_user(queryset, identifier):
+    """Async version of ``resolve_login_user`` built on the async ORM."""
+    kind, lookup = _login_lookup(identifier)
+    candidates = [user async for user in queryset.filter(lookup)[:2]]
+    return kind, _pick_login_user(candidates, identifier)
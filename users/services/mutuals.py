@@ -0,0 +1,132 @@
+"""
+Mutual connections: "followed by X, Y and 12 others you follow".
+
+The answer is the intersection of the viewer's following list with the viewed
+user's follower list. Running that as a self-join on ``FollowList`` gets slow
+for large accounts. Instead, each side is loaded once as a sorted ``array('q')``
+of user ids and kept in two tiers: a small in-process LRU and the shared Django
+cache (zlib-compressed bytes). Intersecting two sorted arrays in Python takes
+milliseconds even with a million ids on one side.
+
+``counters.apply_count_deltas`` sees every follow write, so it calls
+``invalidate_follow_ids`` for the affected users. With ``FOLLOW_GRAPH_CACHE``
+enabled the rows come from ``users.services.graph`` instead.
+"""
+
+import zlib
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.cache import MISSING, LocalTTLCache
+from users.models import User
+from users.services import graph
+from users.services.graph import FOLLOWERS, FOLLOWING
+
+_local = LocalTTLCache(
+    maxsize=settings.MUTUALS_LOCAL_CACHE_SIZE, ttl=settings.MUTUALS_LOCAL_CACHE_TTL
+)
+
+
+def _cache_key(side, user_id):
+    return f"follow:ids:{side}:{user_id}"
+
+
+def _encode(ids):
+    return zlib.compress(ids.tobytes(), 1)
+
+
+def _decode(blob):
+    ids = array("q")
+    ids.frombytes(zlib.decompress(blob))
+    return ids
+
+
+def follow_ids(user_id, side):
+    """Sorted ``array('q')`` of ``user_id``'s followers or followings."""
+    if settings.FOLLOW_GRAPH_CACHE:
+        return graph.get_graph().row(user_id, side)
+    key = _cache_key(side, user_id)
+    ids = _local.get(key)
+    if ids is not MISSING:
+        return ids
+    blob = cache.get(key)
+    if blob is not None:
+        ids = _decode(blob)
+    else:
+        ids = graph.load_row(user_id, side)
+        cache.set(key, _encode(ids), settings.MUTUALS_CACHE_TIMEOUT)
+    _local.set(key, ids)
+    return ids
+
+
+def invalidate_follow_ids(followers=(), following=()):
+    """Drop cached follower lists of ``followers`` and following lists of ``following``."""
+    keys = [_cache_key(FOLLOWERS, user_id) for user_id in followers]
+    keys += [_cache_key(FOLLOWING, user_id) for user_id in following]
+    if not keys:
+        return
+
+    def _drop():
+        for key in keys:
+            _local.delete(key)
+        cache.delete_many(keys)
+
+    # As with RBAC grants: drop now and again after commit.
+    _drop()
+    transaction.on_commit(_drop)
+
+
+def intersect_sorted(a, b):
+    """
+    Intersect two sorted id arrays; the result is sorted too.
+
+    When one side is much smaller, each of its ids is binary-searched in the
+    other: O(m log n). Otherwise the smaller side becomes a set and the larger
+    one is scanned: O(n).
+    """
+    small, large = (a, b) if len(a) <= len(b) else (b, a)
+    if not small:
+        return []
+    if len(small) * max(1, len(large).bit_length()) < len(large):
+        result, lo, size = [], 0, len(large)
+        for value in small:
+            lo = bisect_left(large, value, lo)
+            if lo == size:
+                break
+            if large[lo] == value:
+                result.append(value)
+        return result
+    members = set(small)
+    return [value for value in large if value in members]
+
+
+def mutual_followers(viewer_id, user_id, limit=None, exclude=()):
+    """
+    People ``viewer_id`` follows who also follow ``user_id``.
+
+    Returns ``{"count": n, "users": [{"username", "full_name"}, ...]}``. The
+    named users are the ``limit`` most-followed mutuals among the first
+    ``MUTUALS_NAME_CANDIDATES`` ids, so that lookup stays one bounded query.
+    Ids in ``exclude`` (e.g. the viewer's hidden users) are left out.
+    """
+    limit = settings.MUTUALS_TOP_K if limit is None else limit
+    mine = follow_ids(viewer_id, FOLLOWING)
+    if not mine:
+        return {"count": 0, "users": []}
+    mutual = intersect_sorted(mine, follow_ids(user_id, FOLLOWERS))
+    if exclude:
+        mutual = [uid for uid in mutual if uid not in exclude]
+    users = []
+    if mutual and limit:
+        users = list(
+            User.objects.filter(
+                id__in=mutual[: settings.MUTUALS_NAME_CANDIDATES], is_active=True
+            )
+            .order_by("-profile__followers_count", "id")
+            .values("username", "full_name")[:limit]
+        )
+    return {"count": len(mutual), "users": users}
@@ -0,0 +1,177 @@
+"""
+Versioned response cache for ``ProfileView.get``.
+
+The public part of a profile (``ProfileSerializer`` output) is cached in the
+shared Django cache under the username, together with the profile version it
+was built from and a strong ETag of its content. Each user has a version
+counter. ``users.signals`` bumps it when their ``User`` or ``Profile`` row is
+saved or deleted and when a block involves them, and
+``counters.apply_count_deltas`` bumps it for every follow write. An entry
+whose version is behind is never served.
+
+Entries are fresh for ``PROFILE_CACHE_TIMEOUT`` seconds. For
+``PROFILE_CACHE_STALE_TTL`` seconds after that they are still served while one
+background refresh per profile rebuilds them (stale-while-revalidate); the
+timer guards against writes that bypass the signals, e.g. bulk ``update()``
+calls, and against a write committing between a cache miss loading the
+profile and reading its version.
+
+Viewer-specific fields (``is_owner``, ``is_following``, ``mutual_followers``)
+are merged per request. The response ETag mixes the public ETag with the
+viewer's own version, which every follow or block involving the viewer bumps,
+so ``If-None-Match`` can be answered with 304 from two cache reads.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils.http import parse_etags
+
+from users.models import Profile
+from users.serializers import ProfileSerializer
+
+logger = logging.getLogger(__name__)
+
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="profile-cache")
+# Upper bound on one background rebuild; the lock is released when it ends.
+REFRESH_LOCK_TIMEOUT = 30
+
+
+def _entry_key(username):
+    return f"profile:resp:{username}"
+
+
+def _version_key(user_id):
+    return f"profile:ver:{user_id}"
+
+
+def _refresh_key(username):
+    return f"profile:refreshing:{username}"
+
+
+def _new_epoch():
+    # As with RBAC grant versions: a version lost from the cache restarts above
+    # every value handed out before.
+    return int(time.time() * 1000)
+
+
+def _digest(*parts):
+    raw = ":".join(str(part) for part in parts).encode()
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def get_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_epoch(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_versions(*user_ids):
+    """Invalidate cached profiles of ``user_ids``, now and again after commit."""
+    user_ids = [user_id for user_id in user_ids if user_id is not None]
+    if not user_ids:
+        return
+
+    def _bump():
+        for user_id in user_ids:
+            try:
+                cache.incr(_version_key(user_id))
+            except ValueError:
+                cache.set(_version_key(user_id), _new_epoch(), timeout=None)
+
+    # A reader that rebuilt the entry from pre-commit rows under the first bump
+    # is invalidated by the second.
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def build_entry(profile, version=None):
+    """
+    Serialize ``profile`` and store it under ``version``.
+
+    Pass the version read before ``profile`` was loaded when it is known;
+    otherwise the current one is used.
+    """
+    if version is None:
+        version = get_version(profile.user_id)
+    data = ProfileSerializer(profile).data
+    entry = {
+        "user_id": profile.user_id,
+        "version": version,
+        "etag": _digest(json.dumps(data, sort_keys=True, default=str)),
+        "fresh_until": time.time() + settings.PROFILE_CACHE_TIMEOUT,
+        "data": dict(data),
+    }
+    cache.set(
+        _entry_key(profile.user.username),
+        entry,
+        settings.PROFILE_CACHE_TIMEOUT + settings.PROFILE_CACHE_STALE_TTL,
+    )
+    return entry
+
+
+def cached_entry(username):
+    """
+    Return the servable cached entry for ``username``, or ``None``.
+
+    A stale (but not yet expired) entry is returned as is, after scheduling a
+    background rebuild.
+    """
+    entry = cache.get(_entry_key(username))
+    if entry is None or entry["version"] != get_version(entry["user_id"]):
+        return None
+    if entry["fresh_until"] < time.time() and cache.add(
+        _refresh_key(username), 1, timeout=REFRESH_LOCK_TIMEOUT
+    ):
+        _submit(_refresh, username, entry["user_id"])
+    return entry
+
+
+def _submit(fn, *args):
+    _refresher.submit(fn, *args)
+
+
+def _refresh(username, user_id):
+    try:
+        version = get_version(user_id)
+        profile = (
+            Profile.objects.select_related("user")
+            .filter(user__username=username)
+            .first()
+        )
+        if profile is None:
+            cache.delete(_entry_key(username))
+        else:
+            build_entry(profile, version)
+    except Exception:
+        logger.exception("Profile cache refresh failed for %s", username)
+    finally:
+        cache.delete(_refresh_key(username))
+        close_old_connections()
+
+
+def response_etag(entry, viewer):
+    """Strong ETag of the response ``viewer`` gets for ``entry``."""
+    if viewer.is_authenticated:
+        viewer_part = (viewer.pk, get_version(viewer.pk))
+    else:
+        viewer_part = ("anonymous", 0)
+    return f'"{_digest(entry["etag"], *viewer_part)}"'
+
+
+def etag_matches(request, etag):
+    """Whether ``If-None-Match`` on ``request`` already names ``etag``."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
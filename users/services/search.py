@@ -0,0 +1,144 @@
+"""
+Search inside a user's follower / following list.
+
+The backend is chosen with the ``FOLLOW_SEARCH_BACKEND`` setting:
+
+* ``TrigramSearchBackend`` (default) runs one query that PostgreSQL answers from
+  trigram GIN indexes on ``UPPER(username)`` / ``UPPER(full_name)``, under a
+  ``statement_timeout`` so a pathological term cannot hold a connection.
+* ``PythonSearchBackend`` is a pure-Python fallback for databases without
+  ``pg_trgm`` (SQLite in tests): it filters a bounded candidate set in memory.
+
+Both return at most ``limit`` ``FollowList`` rows ranked with username prefix
+matches first, then full-name prefix matches, then substring matches; ties are
+broken newest-first.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+USERNAME_PREFIX, FULL_NAME_PREFIX, SUBSTRING = 0, 1, 2
+
+# SQLSTATE raised by PostgreSQL when statement_timeout cancels a query.
+QUERY_CANCELED = "57014"
+
+TRIGRAM_INDEXES = {
+    "users_user_username_trgm": "username",
+    "users_user_full_name_trgm": "full_name",
+}
+
+
+class SearchTimeout(Exception):
+    """The search did not finish within ``FOLLOW_SEARCH_TIMEOUT_MS``."""
+
+
+class FollowSearchBackend:
+    def search(self, queryset, relation, term, limit):
+        """
+        Return up to ``limit`` rows of ``queryset`` whose ``relation`` user matches.
+
+        ``queryset`` is a ``FollowList`` queryset already scoped to one account
+        and ``relation`` is the side holding the users to match (``"follower"``
+        or ``"following"``).
+        """
+        raise NotImplementedError
+
+
+class TrigramSearchBackend(FollowSearchBackend):
+    def search(self, queryset, relation, term, limit):
+        username, full_name = f"{relation}__username", f"{relation}__full_name"
+        ranked = (
+            queryset.filter(
+                Q(**{f"{username}__icontains": term})
+                | Q(**{f"{full_name}__icontains": term})
+            )
+            .annotate(
+                search_rank=Case(
+                    When(**{f"{username}__istartswith": term}, then=USERNAME_PREFIX),
+                    When(**{f"{full_name}__istartswith": term}, then=FULL_NAME_PREFIX),
+                    default=Value(SUBSTRING),
+                    output_field=IntegerField(),
+                )
+            )
+            .order_by("search_rank", "-created_at", "-id")[:limit]
+        )
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return list(ranked)
+        try:
+            # Inside a request transaction this is a savepoint, which SET LOCAL
+            # outlives: the previous timeout is put back once the search is
+            # done. A failed search rolls the savepoint back, setting included.
+            with transaction.atomic(using=queryset.db), connection.cursor() as cursor:
+                cursor.execute("SELECT current_setting('statement_timeout')")
+                (previous,) = cursor.fetchone()
+                cursor.execute(
+                    "SET LOCAL statement_timeout = %s",
+                    [int(settings.FOLLOW_SEARCH_TIMEOUT_MS)],
+                )
+                rows = list(ranked)
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true)", [previous]
+                )
+                return rows
+        except DatabaseError as exc:
+            if getattr(exc.__cause__, "pgcode", None) != QUERY_CANCELED:
+                raise
+            logger.warning("Follow search for %r timed out: %s", term, exc)
+            raise SearchTimeout from exc
+
+
+class PythonSearchBackend(FollowSearchBackend):
+    max_candidates = 50_000
+
+    def search(self, queryset, relation, term, limit):
+        needle = term.casefold()
+        candidates = queryset.order_by("-created_at", "-id").values_list(
+            "id", f"{relation}__username", f"{relation}__full_name"
+        )[: self.max_candidates]
+        matches = []
+        for position, (pk, username, full_name) in enumerate(candidates):
+            username, full_name = username.casefold(), full_name.casefold()
+            if username.startswith(needle):
+                rank = USERNAME_PREFIX
+            elif full_name.startswith(needle):
+                rank = FULL_NAME_PREFIX
+            elif needle in username or needle in full_name:
+                rank = SUBSTRING
+            else:
+                continue
+            matches.append((rank, position, pk))
+        matches.sort()
+        ids = [pk for _, _, pk in matches[:limit]]
+        rows = queryset.in_bulk(ids)
+        return [rows[pk] for pk in ids]
+
+
+def get_search_backend():
+    return import_string(settings.FOLLOW_SEARCH_BACKEND)()
+
+
+def ensure_trigram_indexes(using="default", **kwargs):
+    """
+    Create ``pg_trgm`` and the trigram indexes used by ``TrigramSearchBackend``.
+
+    Connected to ``post_migrate``; a no-op on databases other than PostgreSQL.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    table = connection.ops.quote_name(get_user_model()._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, column in TRIGRAM_INDEXES.items():
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                f"USING gin (UPPER({column}::text) gin_trgm_ops)"
+            )
@@ -0,0 +1,178 @@
+"""
+Friend-of-friend follow suggestions ("suggested for you").
+
+``compute_range`` scores second-degree connections for one id range of users
+and rewrites their ``SuggestedFollow`` rows. The ``compute_follow_suggestions``
+command fans the ranges out over a process pool. A candidate scores one point
+per mutual path (people you follow who follow them), plus up to one more point
+per path when that edge is recent. The bonus halves every
+``SUGGESTIONS_RECENCY_HALF_LIFE_DAYS``.
+
+Existing follows, pending requests, blocks in either direction and mutes are
+excluded when scoring and again when serving, so suggestions stay correct
+between runs.
+"""
+
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from users.models import (
+    BlockedUser,
+    FollowList,
+    FollowRequest,
+    MutedUser,
+    Profile,
+    SuggestedFollow,
+)
+
+
+def _group(pairs):
+    grouped = defaultdict(list)
+    for key, value in pairs:
+        grouped[key].append(value)
+    return grouped
+
+
+def _excluded(user_ids):
+    """Map each user to the ids they must never be suggested."""
+    excluded = defaultdict(set)
+    for user_id, other in FollowRequest.objects.filter(
+        from_user_id__in=user_ids
+    ).values_list("from_user_id", "to_user_id"):
+        excluded[user_id].add(other)
+    for user_id, other in BlockedUser.objects.filter(
+        blocker_id__in=user_ids
+    ).values_list("blocker_id", "blocked_id"):
+        excluded[user_id].add(other)
+    for user_id, other in BlockedUser.objects.filter(
+        blocked_id__in=user_ids
+    ).values_list("blocked_id", "blocker_id"):
+        excluded[user_id].add(other)
+    for user_id, other in MutedUser.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "muted_user_id"
+    ):
+        excluded[user_id].add(other)
+    return excluded
+
+
+def score_candidates(following, second_degree, excluded, now, half_life_days):
+    """
+    Score friend-of-friend candidates for one user.
+
+    ``following`` is the set of ids the user follows, ``second_degree`` maps
+    each of those to ``[(candidate_id, followed_at), ...]``. Returns
+    ``{candidate_id: (score, mutual_count)}``.
+    """
+    half_life = half_life_days * 86_400
+    scores, mutuals = defaultdict(float), defaultdict(int)
+    for friend in following:
+        for candidate, followed_at in second_degree.get(friend, ()):
+            if candidate in following or candidate in excluded:
+                continue
+            age = max(0.0, (now - followed_at).total_seconds())
+            scores[candidate] += 1 + 0.5 ** (age / half_life)
+            mutuals[candidate] += 1
+    return {c: (score, mutuals[c]) for c, score in scores.items()}
+
+
+def compute_range(start_id, end_id, incremental=False, top_k=None, half_life_days=None):
+    """
+    Recompute suggestions for users with ``start_id <= id < end_id``.
+
+    With ``incremental`` only users whose following list changed since their
+    last run (``Profile.suggestions_dirty``) are recomputed. No profile row is
+    locked while scoring: the flag is cleared up front, so a follow write that
+    lands meanwhile sets it again and the next run picks the user up. The rows
+    are rewritten in one short transaction at the end. Returns the number of
+    users recomputed.
+    """
+    top_k = top_k or settings.SUGGESTIONS_TOP_K
+    half_life_days = half_life_days or settings.SUGGESTIONS_RECENCY_HALF_LIFE_DAYS
+    profiles = Profile.objects.filter(user_id__gte=start_id, user_id__lt=end_id)
+    if incremental:
+        profiles = profiles.filter(suggestions_dirty=True)
+    user_ids = list(profiles.values_list("user_id", flat=True))
+    if not user_ids:
+        return 0
+
+    Profile.objects.filter(user_id__in=user_ids, suggestions_dirty=True).update(
+        suggestions_dirty=False
+    )
+    try:
+        rows = _score(user_ids, top_k, half_life_days)
+        with transaction.atomic():
+            SuggestedFollow.objects.filter(user_id__in=user_ids).delete()
+            SuggestedFollow.objects.bulk_create(rows, batch_size=5000)
+    except BaseException:
+        # Leave the users for the next run.
+        Profile.objects.filter(user_id__in=user_ids).update(suggestions_dirty=True)
+        raise
+    return len(user_ids)
+
+
+def _score(user_ids, top_k, half_life_days):
+    following = _group(
+        FollowList.objects.filter(follower_id__in=user_ids).values_list(
+            "follower_id", "following_id"
+        )
+    )
+    friends = {friend for ids in following.values() for friend in ids}
+    second_degree = _group(
+        (follower_id, (candidate, created_at))
+        for follower_id, candidate, created_at in FollowList.objects.filter(
+            follower_id__in=friends
+        ).values_list("follower_id", "following_id", "created_at")
+    )
+    excluded = _excluded(user_ids)
+
+    now = timezone.now()
+    rows = []
+    for user_id in user_ids:
+        mine = set(following.get(user_id, ()))
+        scored = score_candidates(
+            mine,
+            second_degree,
+            excluded.get(user_id, set()) | {user_id},
+            now,
+            half_life_days,
+        )
+        for candidate, (score, mutual_count) in heapq.nlargest(
+            top_k, scored.items(), key=lambda item: item[1]
+        ):
+            rows.append(
+                SuggestedFollow(
+                    user_id=user_id,
+                    suggested_id=candidate,
+                    score=score,
+                    mutual_count=mutual_count,
+                )
+            )
+    return rows
+
+
+def suggestions_for(user):
+    """``SuggestedFollow`` rows for ``user``, best first, minus fresh exclusions."""
+    suggested = OuterRef("suggested_id")
+    return (
+        SuggestedFollow.objects.filter(user=user, suggested__is_active=True)
+        .exclude(Exists(FollowList.objects.filter(follower=user, following=suggested)))
+        .exclude(
+            Exists(FollowRequest.objects.filter(from_user=user, to_user=suggested))
+        )
+        .exclude(
+            Exists(
+                BlockedUser.objects.filter(
+                    Q(blocker=user, blocked=suggested)
+                    | Q(blocker=suggested, blocked=user)
+                )
+            )
+        )
+        .exclude(Exists(MutedUser.objects.filter(user=user, muted_user=suggested)))
+        .select_related("suggested__profile")
+        .order_by("-score", "suggested_id")
+    )
@@ -0,0 +1,151 @@
+"""
+Block/mute visibility filtering for list and detail views.
+
+Each viewer's exclusions are loaded with one query into a ``VisibilitySet``:
+
+* hidden: users the viewer blocked and users who blocked the viewer. They
+  are removed from follower/following lists and profile lookups.
+* muted: users the viewer muted. Profiles stay reachable; feeds and
+  suggestions consult ``is_muted``.
+
+The ids are kept as sorted ``array('q')`` rows and looked up by binary
+search. Sets are cached in process and in the shared cache; ``users.signals``
+invalidates both sides of a block and the muting user on every change.
+
+Views filter the rows of a page in Python, so no per-row query or ``NOT IN``
+subquery is added. ``KeysetPagination`` accepts the filter as ``row_filter``
+and keeps scanning until the page is full. ``avisibility_for`` serves async
+views from the same caches.
+"""
+
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Value
+
+from core.cache import MISSING, LocalTTLCache
+from users.models import BlockedUser, MutedUser
+
+_local = LocalTTLCache(
+    maxsize=settings.VISIBILITY_LOCAL_CACHE_SIZE,
+    ttl=settings.VISIBILITY_LOCAL_CACHE_TTL,
+)
+
+
+class IdSet:
+    """Sorted id array with binary-search membership."""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def __contains__(self, value):
+        ids = self.ids
+        i = bisect_left(ids, value)
+        return i < len(ids) and ids[i] == value
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class VisibilitySet:
+    def __init__(self, hidden=(), muted=()):
+        self.hidden = IdSet(array("q", sorted(set(hidden))))
+        self.muted = IdSet(array("q", sorted(set(muted))))
+
+    def hides(self, user_id):
+        return user_id in self.hidden
+
+    def is_muted(self, user_id):
+        return user_id in self.muted
+
+    def visible(self, rows, key):
+        """Drop the rows whose ``key(row)`` user is hidden from the viewer."""
+        if not len(self.hidden):
+            return list(rows)
+        return [row for row in rows if key(row) not in self.hidden]
+
+
+EMPTY = VisibilitySet()
+
+
+def _cache_key(user_id):
+    return f"visibility:{user_id}"
+
+
+def _queries(user_id):
+    blocks = (
+        BlockedUser.objects.filter(Q(blocker_id=user_id) | Q(blocked_id=user_id))
+        .annotate(kind=Value("block"))
+        .values_list("kind", "blocker_id", "blocked_id")
+    )
+    mutes = (
+        MutedUser.objects.filter(user_id=user_id)
+        .annotate(kind=Value("mute"))
+        .values_list("kind", "user_id", "muted_user_id")
+    )
+    return blocks.union(mutes, all=True)
+
+
+def _encode(user_id, rows):
+    hidden, muted = array("q"), array("q")
+    for kind, source, target in rows:
+        if kind == "mute":
+            muted.append(target)
+        else:
+            hidden.append(target if source == user_id else source)
+    return hidden.tobytes(), muted.tobytes()
+
+
+def _decode(stored):
+    hidden, muted = array("q"), array("q")
+    hidden.frombytes(stored[0])
+    muted.frombytes(stored[1])
+    return VisibilitySet(hidden, muted)
+
+
+def visibility_for(user):
+    """Return the ``VisibilitySet`` of ``user`` (empty for anonymous viewers)."""
+    if not getattr(user, "is_authenticated", False):
+        return EMPTY
+    key = _cache_key(user.pk)
+    visibility = _local.get(key)
+    if visibility is not MISSING:
+        return visibility
+    stored = cache.get(key)
+    if stored is None:
+        stored = _encode(user.pk, _queries(user.pk))
+        cache.set(key, stored, settings.VISIBILITY_CACHE_TIMEOUT)
+    visibility = _decode(stored)
+    _local.set(key, visibility)
+    return visibility
+
+
+async def avisibility_for(user):
+    if not getattr(user, "is_authenticated", False):
+        return EMPTY
+    key = _cache_key(user.pk)
+    visibility = _local.get(key)
+    if visibility is not MISSING:
+        return visibility
+    stored = await cache.aget(key)
+    if stored is None:
+        stored = _encode(user.pk, [row async for row in _queries(user.pk)])
+        await cache.aset(key, stored, settings.VISIBILITY_CACHE_TIMEOUT)
+    visibility = _decode(stored)
+    _local.set(key, visibility)
+    return visibility
+
+
+def invalidate_visibility(*user_ids):
+    keys = [_cache_key(user_id) for user_id in user_ids]
+
+    def _drop():
+        for key in keys:
+            _local.delete(key)
+        cache.delete_many(keys)
+
+    _drop()
+    transaction.on_commit(_drop)
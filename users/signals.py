@@ -1,12 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.core.signing import TimestampSigner
-from django.db.models.signals import post_save
+from django.db import connections
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
-from users.models import Profile
+from core import outbox
+from users.models import BlockedUser, FollowList, MutedUser, Profile, UserSettings
+from users.services import avatars, counters, profile_cache
+from users.services.visibility import invalidate_visibility
 
 User = get_user_model()
-signer = TimestampSigner()
 
 
 @receiver(post_save, sender=User)
@@ -14,27 +16,126 @@ def create_profile_and_send_email(sender, instance, created, **kwargs):
     if not created:
         return
 
-    # ✅ Create profile safely
-    Profile.objects.get_or_create(user=instance)
-
-    # ✅ Generate signed token
-    token = signer.sign(instance.pk)
-
-    delete_url = f"http://127.0.0.1:8000/users/delete-account/?token={token}"
-    print("🔥 SIGNAL FIRED")
-    print("Delete URL:", delete_url)
-
-    # OPTIONAL: send mail
-    # send_mail(
-    #     subject="Welcome to Our Instagram App 🎉",
-    #     message=(
-    #         f"Hi {instance.username},\n\n"
-    #         f"Your account has been created successfully.\n\n"
-    #         f"If you did NOT create this account, click below to delete it:\n"
-    #         f"{delete_url}\n\n"
-    #         f"This link is valid for 24 hours."
-    #     ),
-    #     from_email=settings.DEFAULT_FROM_EMAIL,
-    #     recipient_list=[instance.email],
-    #     fail_silently=False,
-    # )
+    # A new user has neither row yet: plain INSERTs (idempotent, like the
+    # get_or_create they replace) instead of a lookup first.
+    Profile.objects.bulk_create([Profile(user=instance)], ignore_conflicts=True)
+    UserSettings.objects.bulk_create(
+        [UserSettings(user=instance)], ignore_conflicts=True
+    )
+    # Committed with the user and sent by ``run_outbox`` afterwards, so SMTP
+    # never holds up (or fails) the registration request.
+    outbox.enqueue("users.send_welcome_email", {"user_id": instance.pk})
+
+
+def backfill_user_settings(using="default", batch_size=5000, **kwargs):
+    """
+    Create ``UserSettings`` for users who signed up before registration did.
+
+    Connected to ``post_migrate``, so the settings views can rely on the row
+    existing. Once every user has one, this is a single empty query.
+    """
+    if (
+        UserSettings._meta.db_table
+        not in connections[using].introspection.table_names()
+    ):
+        return
+    missing = (
+        User.objects.using(using)
+        .filter(settings__isnull=True)
+        .values_list("id", flat=True)
+    )
+    UserSettings.objects.using(using).bulk_create(
+        (UserSettings(user_id=user_id) for user_id in missing.iterator()),
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+
+# ---------- Follow counters ----------
+
+
+@receiver(post_save, sender=FollowList)
+def increment_follow_counts(sender, instance, created, raw=False, **kwargs):
+    if (
+        created
+        and not raw
+        and not counters.is_released(instance.follower_id, instance.following_id)
+    ):
+        counters.record_follow(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=FollowList)
+def decrement_follow_counts(sender, instance, **kwargs):
+    if counters.is_released(instance.follower_id, instance.following_id):
+        return
+    counters.record_follow(instance.follower_id, instance.following_id, delta=-1)
+
+
+@receiver(pre_delete, sender=User)
+def release_follow_counts(sender, instance, **kwargs):
+    counters.release_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def forget_released_user(sender, instance, **kwargs):
+    counters.forget_released_user(instance.pk)
+
+
+# ---------- Block/mute visibility ----------
+
+
+@receiver(post_save, sender=BlockedUser)
+@receiver(post_delete, sender=BlockedUser)
+def drop_block_visibility(sender, instance, **kwargs):
+    invalidate_visibility(instance.blocker_id, instance.blocked_id)
+    # Cached profile ETags must not outlive a block in either direction.
+    profile_cache.bump_versions(instance.blocker_id, instance.blocked_id)
+
+
+@receiver(post_save, sender=MutedUser)
+@receiver(post_delete, sender=MutedUser)
+def drop_mute_visibility(sender, instance, **kwargs):
+    invalidate_visibility(instance.user_id)
+
+
+# ---------- Avatar files ----------
+
+
+@receiver(pre_save, sender=Profile)
+def note_avatar_upload(sender, instance, **kwargs):
+    # A newly assigned file is stored during the save and replaces the loaded
+    # one, even when both have the same content-addressed name.
+    instance._avatar_uploaded = not instance.avatar._committed
+
+
+@receiver(post_save, sender=Profile)
+def release_replaced_avatar(sender, instance, raw=False, **kwargs):
+    loaded = getattr(instance, "_loaded_avatar", None)
+    current = instance.avatar.name
+    if (
+        loaded
+        and not raw
+        and (loaded != current or getattr(instance, "_avatar_uploaded", False))
+    ):
+        avatars.release_files(loaded)
+    instance._loaded_avatar = current
+
+
+@receiver(post_delete, sender=Profile)
+def release_avatar_files(sender, instance, **kwargs):
+    avatars.release_files(*avatars.stored_files(instance))
+
+
+# ---------- Profile response cache ----------
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def bump_profile_version(sender, instance, **kwargs):
+    profile_cache.bump_versions(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_profile_version(sender, instance, **kwargs):
+    profile_cache.bump_versions(instance.pk)
@@ -0,0 +1,97 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core import hashing
+from users.models import User
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def _post(url_name, payload):
+    return async_to_sync(AsyncClient().post)(
+        reverse(url_name), payload, content_type="application/json"
+    )
+
+
+def test_async_login_success(active_user):
+    response = _post(
+        "async-login", {"identifier": "testuser", "password": "TestPass123"}
+    )
+
+    assert response.status_code == 200
+    assert set(response.json()["tokens"]) == {"access", "refresh"}
+
+
+def test_async_login_wrong_password(active_user):
+    response = _post(
+        "async-login", {"identifier": "testuser", "password": "WrongPass123"}
+    )
+
+    assert response.status_code == 401
+
+
+def test_async_login_inactive_user(inactive_user):
+    response = _post(
+        "async-login", {"identifier": "inactiveuser", "password": "TestPass123"}
+    )
+
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize(
+    ("identifier", "status"), [("inactiveuser", 403), ("nobody", 401)]
+)
+def test_refused_logins_cost_one_hash_without_a_check(
+    inactive_user, monkeypatch, identifier, status
+):
+    pool = hashing.PasswordHashPool(workers=1)
+    calls = []
+    run = pool.run
+
+    async def spy(func, *args):
+        calls.append(func.__name__)
+        return await run(func, *args)
+
+    monkeypatch.setattr(pool, "run", spy)
+    monkeypatch.setattr(hashing, "_pool", pool)
+
+    response = _post(
+        "async-login", {"identifier": identifier, "password": "WrongPass123"}
+    )
+
+    assert response.status_code == status
+    assert calls == ["_make_password"]
+    pool.shutdown()
+
+
+def test_async_register_hashes_in_pool(valid_register_payload):
+    response = _post("async-register", valid_register_payload)
+
+    assert response.status_code == 201
+    user = User.objects.get(username="testuser")
+    assert user.check_password(valid_register_payload["password"])
+
+
+def test_async_register_validation_errors(valid_register_payload):
+    valid_register_payload["confirm_password"] = "Mismatch123"
+
+    response = _post("async-register", valid_register_payload)
+
+    assert response.status_code == 400
+    assert "confirm_password" in response.json()
+
+
+def test_saturated_pool_sheds_load(active_user, monkeypatch):
+    pool = hashing.PasswordHashPool(workers=1)
+    pool.max_pending = 0
+    monkeypatch.setattr(hashing, "_pool", pool)
+
+    response = _post(
+        "async-login", {"identifier": "testuser", "password": "TestPass123"}
+    )
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == "1"
+    pool.shutdown()
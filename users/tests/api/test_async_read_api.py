@@ -0,0 +1,132 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core.throttling import UserBurstRateThrottle
+from rbac.tokens import GrantsRefreshToken
+from users.models import BlockedUser, FollowList, UserSettings
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def _get(url, user=None, token=None):
+    if user is not None:
+        token = GrantsRefreshToken.for_user(user).access_token
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    return async_to_sync(AsyncClient().get)(url, headers=headers)
+
+
+@pytest.fixture
+def star(user_factory):
+    star = user_factory(username="star")
+    for _ in range(5):
+        FollowList.objects.create(follower=user_factory(), following=star)
+    return star
+
+
+@pytest.fixture
+def viewer(user_factory, grant_pages):
+    viewer = user_factory(username="viewer")
+    grant_pages(viewer, "profile-detail", "followers", "following", "api_settings")
+    return viewer
+
+
+def test_profile_matches_sync_view(auth_client, star, viewer):
+    FollowList.objects.create(follower=viewer, following=star)
+
+    response = _get(reverse("async-profile-detail", args=["star"]), viewer)
+    sync = auth_client(viewer).get(reverse("profile-detail", args=["star"]))
+
+    assert response.status_code == 200
+    assert response.json() == dict(sync.data)
+    assert response.json()["is_following"] is True
+
+
+def test_profile_hidden_by_block_is_not_found(star, viewer):
+    BlockedUser.objects.create(blocker=star, blocked=viewer)
+
+    response = _get(reverse("async-profile-detail", args=["star"]), viewer)
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Not found."}
+
+
+def test_requires_authentication_and_grants(star, user_factory):
+    url = reverse("async-profile-detail", args=["star"])
+
+    anonymous = _get(url)
+    ungranted = _get(url, user_factory())
+
+    assert anonymous.status_code == 401
+    assert anonymous["WWW-Authenticate"].startswith("Bearer")
+    assert ungranted.status_code == 403
+
+
+def test_invalid_token_is_rejected(star):
+    response = _get(reverse("async-profile-detail", args=["star"]), token="garbage")
+
+    assert response.status_code == 401
+    assert response.json()["code"] == "token_not_valid"
+
+
+def test_follower_pages_walk_the_whole_list(star, viewer):
+    BlockedUser.objects.create(
+        blocker=viewer,
+        blocked=FollowList.objects.filter(following=star).first().follower,
+    )
+
+    seen, url = [], reverse("async-followers", args=["star"]) + "?page_size=2"
+    while url:
+        response = _get(url, viewer)
+        assert response.status_code == 200
+        seen.extend(row["username"] for row in response.json()["results"])
+        url = response.json()["next"]
+
+    expected = FollowList.objects.filter(following=star).order_by("-created_at", "-id")
+    assert seen == [row.follower.username for row in expected][:4]
+
+
+def test_hidden_owners_lists_are_not_found(star, viewer):
+    BlockedUser.objects.create(blocker=star, blocked=viewer)
+
+    response = _get(reverse("async-followers", args=["star"]), viewer)
+
+    assert response.status_code == 404
+
+
+def test_following_total_and_legacy_pages(star, viewer):
+    FollowList.objects.create(follower=star, following=viewer)
+
+    keyset = _get(
+        reverse("async-following", args=["star"]) + "?include_total=1", viewer
+    ).json()
+    legacy = _get(reverse("async-following", args=["star"]) + "?page=1", viewer).json()
+
+    assert keyset["total"] == 1
+    assert [row["username"] for row in keyset["results"]] == ["viewer"]
+    assert legacy["count"] == 1
+
+
+def test_settings_are_read_not_created(viewer):
+    UserSettings.objects.filter(user=viewer).update(allow_mentions=False)
+
+    response = _get(reverse("async-settings"), viewer)
+
+    assert response.status_code == 200
+    assert response.json()["allow_mentions"] is False
+
+
+def test_throttled_requests_get_429(star, viewer, monkeypatch):
+    monkeypatch.setattr(
+        UserBurstRateThrottle,
+        "THROTTLE_RATES",
+        {**UserBurstRateThrottle.THROTTLE_RATES, "user_burst": "1/min"},
+    )
+    url = reverse("async-profile-detail", args=["star"])
+    _get(url, viewer)
+
+    response = _get(url, viewer)
+
+    assert response.status_code == 429
+    assert "Retry-After" in response
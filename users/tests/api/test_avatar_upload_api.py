@@ -0,0 +1,135 @@
+import io
+import os
+import struct
+import zlib
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+
+from core.models import MediaBlob
+from users.models import Profile
+from users.services import avatars
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path
+    monkeypatch.setattr(avatars, "_submit", lambda fn, *args: None)
+
+
+@pytest.fixture
+def user(user_factory):
+    return user_factory()
+
+
+@pytest.fixture
+def upload(auth_client, user):
+    client = auth_client(user, "profile-detail")
+
+    def _upload(name, content, content_type="application/octet-stream"):
+        return client.patch(
+            reverse("profile-detail", args=[user.username]),
+            {"avatar": SimpleUploadedFile(name, content, content_type)},
+            format="multipart",
+        )
+
+    return _upload
+
+
+def _image(fmt="PNG", size=(64, 64), **params):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "blue").save(buffer, fmt, **params)
+    return buffer.getvalue()
+
+
+def _png_header(width, height):
+    # Signature, IHDR and the start of an IDAT chunk: Pillow reads the size
+    # and stops at the pixel data.
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = b"IHDR" + ihdr
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(ihdr))
+        + chunk
+        + struct.pack(">I", zlib.crc32(chunk))
+        + struct.pack(">I", 1024)
+        + b"IDAT"
+    )
+
+
+def test_valid_image_is_stored(upload, user):
+    response = upload("me.bin", _image("PNG"))
+
+    assert response.status_code == 200
+    assert Profile.objects.get(user=user).avatar.name.startswith("cas/")
+
+
+def test_replaced_avatar_releases_its_blob(
+    upload, user, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        upload("a.png", _image("PNG"))
+        upload("b.png", _image("PNG"))
+    first = Profile.objects.get(user=user).avatar.name
+    assert MediaBlob.objects.get(name=first).refcount == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        upload("c.png", _image("PNG", size=(32, 32)))
+
+    assert MediaBlob.objects.get(name=first).refcount == 0
+    with django_capture_on_commit_callbacks(execute=True):
+        Profile.objects.get(user=user).delete()
+    assert not MediaBlob.objects.filter(refcount__gt=0).exists()
+
+
+def test_header_past_the_sniff_buffer_is_read_from_disk(upload, user):
+    # A 100 KiB ICC profile pushes the JPEG frame header past 64 KiB.
+    content = _image("JPEG", icc_profile=os.urandom(100 * 1024))
+
+    response = upload("me.jpg", content, "image/jpeg")
+
+    assert response.status_code == 200
+    assert Profile.objects.get(user=user).avatar
+
+
+def test_oversize_request_is_rejected_before_reading_the_body(upload, settings):
+    settings.AVATAR_UPLOAD_MAX_BYTES = 1024
+
+    response = upload("me.png", _png_header(64, 64) + os.urandom(200 * 1024))
+
+    assert response.status_code == 413
+    assert response.data["detail"].code == "upload_too_large"
+
+
+def test_oversize_file_is_rejected_while_streaming(upload, settings, user):
+    settings.AVATAR_UPLOAD_MAX_BYTES = 16 * 1024
+
+    response = upload("me.png", _png_header(64, 64) + os.urandom(40 * 1024))
+
+    assert response.status_code == 413
+    assert not Profile.objects.get(user=user).avatar
+
+
+@pytest.mark.parametrize(
+    "width, height", [(20_000, 20_000), (9000, 10), (1_000_000, 1_000_000)]
+)
+def test_oversize_dimensions_are_rejected_from_the_header(upload, width, height):
+    # The body after the header is garbage; it is never decoded.
+    response = upload("bomb.png", _png_header(width, height) + os.urandom(1024))
+
+    assert response.status_code == 400
+    assert response.data["avatar"] == ["Image dimensions are too large."]
+
+
+@pytest.mark.parametrize(
+    "content", [b"not an image at all", _image("BMP")], ids=["garbage", "bmp"]
+)
+def test_unsupported_files_are_rejected(upload, content):
+    response = upload("file.bin", content)
+
+    assert response.status_code == 400
+    assert response.data["avatar"][0].startswith("Upload a valid image.")
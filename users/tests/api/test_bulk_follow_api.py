@@ -0,0 +1,145 @@
+import pytest
+from django.urls import reverse
+
+from core.testing import query_budget
+from users.models import FollowList, FollowRequest, Profile
+from users.services import follows
+from users.services.follows import follow_user, unfollow_user
+from users.views import BulkFollowView
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def follower(user_factory):
+    return user_factory(username="onboarding")
+
+
+@pytest.fixture
+def client(auth_client, follower):
+    return auth_client(follower, "bulk-follow")
+
+
+def test_bulk_follow_splits_public_and_private(
+    client, follower, user_factory, follow_counts
+):
+    public = [user_factory() for _ in range(3)]
+    private = user_factory()
+    Profile.objects.filter(user=private).update(is_private=True)
+    FollowList.objects.create(follower=follower, following=public[0])
+
+    with query_budget(BulkFollowView.query_budget):
+        response = client.post(
+            reverse("bulk-follow"),
+            {
+                "usernames": [u.username for u in public] + ["ghost", "onboarding"],
+                "user_ids": [private.pk],
+            },
+            format="json",
+        )
+
+    assert response.status_code == 200
+    assert [r["status"] for r in response.data["results"]] == [
+        "already_following",
+        "followed",
+        "followed",
+        "not_found",
+        "self",
+        "requested",
+    ]
+    assert FollowList.objects.filter(follower=follower).count() == 3
+    assert FollowRequest.objects.filter(from_user=follower, to_user=private).exists()
+    assert follow_counts(follower) == (0, 3)
+    assert [follow_counts(u) for u in public] == [(1, 0)] * 3
+    assert follow_counts(private) == (0, 0)
+
+
+def test_edge_created_after_the_read_is_not_counted_twice(
+    client, follower, user_factory, monkeypatch, follow_counts
+):
+    target = user_factory()
+    follow_user(follower.pk, target.pk)
+    # The pre-read misses the edge, as if that follow committed right after it.
+    monkeypatch.setattr(follows, "_existing_follows", lambda *args: set())
+
+    response = client.post(
+        reverse("bulk-follow"), {"usernames": [target.username]}, format="json"
+    )
+
+    assert response.data["results"][0]["status"] == "already_following"
+    assert follow_counts(follower) == (0, 1)
+    assert follow_counts(target) == (1, 0)
+
+
+def test_repeat_request_reports_existing_requests(client, user_factory):
+    private = user_factory()
+    Profile.objects.filter(user=private).update(is_private=True)
+    payload = {"usernames": [private.username]}
+
+    client.post(reverse("bulk-follow"), payload, format="json")
+    response = client.post(reverse("bulk-follow"), payload, format="json")
+
+    assert response.data["results"] == [
+        {"target": private.username, "status": "already_requested"}
+    ]
+
+
+def test_bulk_unfollow_updates_counters(client, follower, user_factory, follow_counts):
+    followed = [user_factory() for _ in range(2)]
+    pending, stranger = user_factory(), user_factory()
+    for user in followed:
+        FollowList.objects.create(follower=follower, following=user)
+    FollowRequest.objects.create(from_user=follower, to_user=pending)
+
+    response = client.delete(
+        reverse("bulk-follow"),
+        {"user_ids": [u.pk for u in (*followed, pending, stranger)]},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert [r["status"] for r in response.data["results"]] == [
+        "unfollowed",
+        "unfollowed",
+        "request_cancelled",
+        "not_following",
+    ]
+    assert not FollowList.objects.filter(follower=follower).exists()
+    assert not FollowRequest.objects.filter(from_user=follower).exists()
+    assert follow_counts(follower) == (0, 0)
+    assert [follow_counts(u) for u in followed] == [(0, 0)] * 2
+
+
+def test_edge_deleted_concurrently_is_not_counted_twice(
+    client, follower, user_factory, monkeypatch, follow_counts
+):
+    target, other, fan = user_factory(), user_factory(), user_factory()
+    for following in (target, other):
+        follow_user(follower.pk, following.pk)
+    follow_user(fan.pk, target.pk)
+    resolve_targets = follows.resolve_targets
+
+    def resolve_then_unfollow(*args):
+        # A single unfollow of the same edge lands while the batch runs.
+        unfollow_user(follower.pk, target.pk)
+        return resolve_targets(*args)
+
+    monkeypatch.setattr(follows, "resolve_targets", resolve_then_unfollow)
+
+    response = client.delete(
+        reverse("bulk-follow"), {"user_ids": [target.pk]}, format="json"
+    )
+
+    assert response.data["results"][0]["status"] == "not_following"
+    assert follow_counts(follower) == (0, 1)
+    assert follow_counts(target) == (1, 0)
+
+
+def test_bulk_follow_rejects_oversized_batches(client, settings):
+    settings.FOLLOW_BULK_MAX_TARGETS = 2
+
+    response = client.post(
+        reverse("bulk-follow"), {"user_ids": [1, 2, 3]}, format="json"
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,108 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.authentication import user_cache_stats
+from core.cache import clear_local_caches
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def jwt_client(api_client, grant_pages):
+    def _jwt_client(user, *url_names):
+        grant_pages(user, *url_names)
+        token = RefreshToken.for_user(user).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return api_client
+
+    return _jwt_client
+
+
+def _user_lookups(queries, user):
+    return [
+        q["sql"]
+        for q in queries
+        if 'FROM "users_user"' in q["sql"] and f"= {user.pk}" in q["sql"]
+    ]
+
+
+def test_repeat_requests_skip_user_query(jwt_client, user_factory):
+    viewer = user_factory()
+    client = jwt_client(viewer, "profile-detail")
+    url = reverse("profile-detail", args=[viewer.username])
+
+    assert client.get(url).status_code == 200
+    before = user_cache_stats()
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).status_code == 200
+
+    after = user_cache_stats()
+    assert after["local_hits"] == before["local_hits"] + 1
+    assert after["misses"] == before["misses"]
+    assert after["hit_ratio"] > 0
+    assert not [
+        sql for sql in _user_lookups(ctx.captured_queries, viewer) if "LIMIT 21" in sql
+    ]
+
+
+def test_deactivation_invalidates_cached_user(jwt_client, user_factory):
+    viewer = user_factory()
+    client = jwt_client(viewer, "profile-detail")
+    url = reverse("profile-detail", args=[viewer.username])
+    assert client.get(url).status_code == 200
+
+    viewer.is_active = False
+    viewer.save(update_fields=["is_active"])
+
+    response = client.get(url)
+    assert response.status_code == 401
+    assert response.data["code"] == "user_inactive"
+
+
+def test_deleted_user_is_not_served_from_cache(jwt_client, user_factory):
+    viewer = user_factory()
+    other = user_factory()
+    client = jwt_client(viewer, "profile-detail")
+    url = reverse("profile-detail", args=[other.username])
+    assert client.get(url).status_code == 200
+
+    viewer.delete()
+
+    response = client.get(url)
+    assert response.status_code == 401
+    assert response.data["code"] == "user_not_found"
+
+
+def test_password_change_reloads_user(jwt_client, user_factory):
+    viewer = user_factory()
+    client = jwt_client(viewer, "profile-detail")
+    url = reverse("profile-detail", args=[viewer.username])
+    assert client.get(url).status_code == 200
+
+    viewer.set_password("N3w-Secret!")
+    viewer.save(update_fields=["password"])
+    misses = user_cache_stats()["misses"]
+
+    assert client.get(url).status_code == 200
+    assert user_cache_stats()["misses"] == misses + 1
+
+
+def test_shared_cache_holds_no_password_hash(jwt_client, user_factory):
+    viewer = user_factory()
+    client = jwt_client(viewer, "profile-detail")
+    url = reverse("profile-detail", args=[viewer.username])
+    assert client.get(url).status_code == 200
+
+    entry = cache.get(f"auth:user:{viewer.pk}")
+    assert viewer.password not in repr(entry)
+
+    clear_local_caches()
+    response = client.get(url)
+    assert response.status_code == 200
+    user = response.wsgi_request.user
+    assert user.get_deferred_fields() == {"password"}
+    assert user.check_password("Password@123")
@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import FollowList, FollowRequest, Profile
+
+pytestmark = pytest.mark.django_db
+
+
+def test_repeat_follow_is_idempotent(auth_client, user_factory, follow_counts):
+    fan, star = user_factory(), user_factory()
+    client = auth_client(fan, "follow-action")
+    url = reverse("follow-action", args=[star.username])
+
+    first = client.post(url)
+    second = client.post(url)
+
+    assert (first.status_code, second.status_code) == (201, 200)
+    assert second.data["detail"] == "Already following."
+    assert FollowList.objects.filter(follower=fan, following=star).count() == 1
+    assert follow_counts(star) == (1, 0)
+
+
+def test_private_target_gets_single_request(auth_client, user_factory):
+    fan, private = user_factory(), user_factory()
+    Profile.objects.filter(user=private).update(is_private=True)
+    client = auth_client(fan, "follow-action")
+    url = reverse("follow-action", args=[private.username])
+
+    assert client.post(url).data["detail"] == "Follow request sent."
+    assert client.post(url).data["detail"] == "Follow request already sent."
+    assert FollowRequest.objects.filter(from_user=fan, to_user=private).count() == 1
+
+
+def test_accept_creates_edge_once(auth_client, user_factory, follow_counts):
+    fan, private = user_factory(), user_factory()
+    follow_request = FollowRequest.objects.create(from_user=fan, to_user=private)
+    client = auth_client(private, "follow-request-response")
+    url = reverse("follow-request-response", args=[follow_request.pk])
+
+    assert client.post(url).status_code == 201
+    assert client.post(url).status_code == 404
+    assert FollowList.objects.filter(follower=fan, following=private).exists()
+    assert follow_counts(private) == (1, 0)
+    assert follow_counts(fan) == (0, 1)
+
+
+def test_accept_someone_elses_request_is_forbidden(auth_client, user_factory):
+    fan, private, intruder = user_factory(), user_factory(), user_factory()
+    follow_request = FollowRequest.objects.create(from_user=fan, to_user=private)
+    client = auth_client(intruder, "follow-request-response")
+
+    response = client.post(reverse("follow-request-response", args=[follow_request.pk]))
+
+    assert response.status_code == 403
+    assert FollowRequest.objects.filter(pk=follow_request.pk).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_duplicate_follows_do_not_error(
+    grant_pages, user_factory, follow_counts
+):
+    if connection.vendor != "postgresql":
+        pytest.skip("concurrent writers need PostgreSQL")
+    fan, star = user_factory(), user_factory()
+    grant_pages(fan, "follow-action")
+    url = reverse("follow-action", args=[star.username])
+
+    def tap(_):
+        client = APIClient()
+        client.force_authenticate(fan)
+        try:
+            return client.post(url).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(tap, range(24)))
+
+    assert sorted(set(statuses)) == [200, 201]
+    assert statuses.count(201) == 1
+    assert FollowList.objects.filter(follower=fan, following=star).count() == 1
+    assert follow_counts(star) == (1, 0)
+    assert follow_counts(fan) == (0, 1)
@@ -0,0 +1,78 @@
+import pytest
+from django.urls import reverse
+
+from users.models import FollowList
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def star_with_followers(user_factory):
+    star = user_factory(username="star")
+    fans = [user_factory() for _ in range(7)]
+    for fan in fans:
+        FollowList.objects.create(follower=fan, following=star)
+    return star, fans
+
+
+def test_cursor_pages_walk_all_followers_newest_first(
+    auth_client, user_factory, star_with_followers
+):
+    _, fans = star_with_followers
+    client = auth_client(user_factory(), "followers")
+
+    seen = []
+    url = reverse("followers", args=["star"]) + "?page_size=3"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert "count" not in response.data
+        seen.extend(row["username"] for row in response.data["results"])
+        url = response.data["next"]
+
+    assert seen == [fan.username for fan in reversed(fans)]
+
+
+def test_previous_cursor_returns_to_prior_page(
+    auth_client, user_factory, star_with_followers
+):
+    client = auth_client(user_factory(), "followers")
+    first = client.get(reverse("followers", args=["star"]) + "?page_size=3")
+    second = client.get(first.data["next"])
+
+    back = client.get(second.data["previous"])
+
+    assert back.data["results"] == first.data["results"]
+    assert back.data["next"] is not None
+
+
+def test_total_is_only_returned_on_request(
+    auth_client, user_factory, star_with_followers
+):
+    client = auth_client(user_factory(), "followers")
+
+    response = client.get(reverse("followers", args=["star"]) + "?include_total=1")
+
+    assert response.data["total"] == 7
+
+
+def test_invalid_cursor_is_rejected(auth_client, user_factory, star_with_followers):
+    client = auth_client(user_factory(), "followers")
+
+    response = client.get(reverse("followers", args=["star"]) + "?cursor=garbage")
+
+    assert response.status_code == 404
+
+
+def test_page_number_mode_still_available(
+    auth_client, user_factory, star_with_followers
+):
+    client = auth_client(user_factory(), "following")
+    FollowList.objects.create(
+        follower=star_with_followers[0], following=star_with_followers[1][0]
+    )
+
+    response = client.get(reverse("following", args=["star"]) + "?page=1")
+
+    assert response.data["count"] == 1
+    assert len(response.data["results"]) == 1
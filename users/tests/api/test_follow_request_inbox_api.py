@@ -0,0 +1,137 @@
+import pytest
+from django.urls import reverse
+
+from core.testing import query_budget
+from users.models import BlockedUser, FollowList, FollowRequest, Profile
+from users.views import FollowRequestInboxView
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def owner(user_factory):
+    owner = user_factory(username="private")
+    Profile.objects.filter(user=owner).update(is_private=True)
+    return owner
+
+
+@pytest.fixture
+def requesters(user_factory, owner):
+    users = [user_factory() for _ in range(5)]
+    for user in users:
+        FollowRequest.objects.create(from_user=user, to_user=owner)
+    return users
+
+
+@pytest.fixture
+def client(auth_client, owner):
+    return auth_client(owner, "follow-requests")
+
+
+def test_inbox_pages_newest_first_within_budget(client, requesters, user_factory):
+    FollowRequest.objects.create(from_user=requesters[0], to_user=user_factory())
+
+    seen, url = [], reverse("follow-requests") + "?page_size=2"
+    while url:
+        with query_budget(FollowRequestInboxView.query_budget) as recorder:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert recorder.duplicates == {}
+        seen.extend(row["username"] for row in response.data["results"])
+        url = response.data["next"]
+
+    assert seen == [user.username for user in reversed(requesters)]
+
+
+def test_inbox_skips_requests_from_blocked_users(client, owner, requesters):
+    BlockedUser.objects.create(blocker=owner, blocked=requesters[1])
+
+    response = client.get(reverse("follow-requests"))
+
+    assert [row["username"] for row in response.data["results"]] == [
+        user.username for user in reversed(requesters) if user != requesters[1]
+    ]
+
+
+def test_bulk_accept_by_ids_moves_rows_and_updates_counts(client, owner, requesters):
+    ids = list(
+        FollowRequest.objects.filter(from_user__in=requesters[:2]).values_list(
+            "id", flat=True
+        )
+    )
+
+    response = client.post(
+        reverse("follow-requests"),
+        {"action": "accept", "ids": [*ids, 999_999]},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert response.data["count"] == 2
+    assert response.data["not_found"] == [999_999]
+    assert set(
+        FollowList.objects.filter(following=owner).values_list("follower", flat=True)
+    ) == {requesters[0].pk, requesters[1].pk}
+    assert FollowRequest.objects.filter(to_user=owner).count() == 3
+    assert Profile.objects.get(user=owner).followers_count == 2
+    assert Profile.objects.get(user=requesters[0]).following_count == 1
+
+
+def test_bulk_accept_all_skips_existing_edges(client, owner, requesters):
+    FollowList.objects.create(follower=requesters[0], following=owner)
+
+    response = client.post(
+        reverse("follow-requests"), {"action": "accept", "all": True}, format="json"
+    )
+
+    assert response.data["count"] == 5
+    assert "not_found" not in response.data
+    assert not FollowRequest.objects.filter(to_user=owner).exists()
+    assert FollowList.objects.filter(following=owner).count() == 5
+    assert Profile.objects.get(user=owner).followers_count == 5
+
+
+def test_bulk_reject_leaves_other_inboxes_alone(
+    client, owner, requesters, user_factory
+):
+    other = FollowRequest.objects.create(
+        from_user=requesters[0], to_user=user_factory()
+    )
+
+    response = client.post(
+        reverse("follow-requests"), {"action": "reject", "all": True}, format="json"
+    )
+
+    assert response.data["count"] == 5
+    assert list(FollowRequest.objects.values_list("id", flat=True)) == [other.pk]
+    assert not FollowList.objects.exists()
+
+
+def test_cannot_respond_to_someone_elses_requests(
+    auth_client, requesters, user_factory
+):
+    client = auth_client(user_factory(), "follow-requests")
+    ids = list(FollowRequest.objects.values_list("id", flat=True))
+
+    response = client.post(
+        reverse("follow-requests"), {"action": "accept", "ids": ids}, format="json"
+    )
+
+    assert response.data["count"] == 0
+    assert response.data["not_found"] == ids
+    assert not FollowList.objects.exists()
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"action": "accept"},
+        {"action": "accept", "ids": [1], "all": True},
+        {"action": "accept", "ids": []},
+        {"action": "ignore", "all": True},
+    ],
+)
+def test_invalid_bulk_payloads_are_rejected(client, payload):
+    response = client.post(reverse("follow-requests"), payload, format="json")
+
+    assert response.status_code == 400
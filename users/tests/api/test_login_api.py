@@ -74,3 +74,23 @@ def test_login_inactive_user(api_client, inactive_user):
     )
 
     assert response.status_code == 403
+
+
+def test_login_with_email_is_case_insensitive(api_client, active_user):
+    response = api_client.post(
+        reverse("login"),
+        {"identifier": "Test@Example.com", "password": "TestPass123"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+
+
+def test_login_with_formatted_mobile(api_client, active_user):
+    response = api_client.post(
+        reverse("login"),
+        {"identifier": "98765 43210", "password": "TestPass123"},
+        format="json",
+    )
+
+    assert response.status_code == 200
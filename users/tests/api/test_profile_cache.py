@@ -0,0 +1,111 @@
+import pytest
+from django.urls import reverse
+
+from users.models import BlockedUser, FollowList, Profile
+from users.services import profile_cache
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def star(user_factory):
+    return user_factory(username="star")
+
+
+@pytest.fixture
+def viewer_client(auth_client, user_factory):
+    viewer = user_factory(username="viewer")
+    return viewer, auth_client(viewer, "profile-detail")
+
+
+def _url():
+    return reverse("profile-detail", args=["star"])
+
+
+def test_matching_etag_returns_304_without_queries(
+    star, viewer_client, django_assert_max_num_queries
+):
+    _, client = viewer_client
+    first = client.get(_url())
+    etag = first["ETag"]
+
+    # Only the audit log's request row is written.
+    with django_assert_max_num_queries(1) as captured:
+        response = client.get(_url(), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert all("easyaudit" in query["sql"] for query in captured.captured_queries)
+    assert response["ETag"] == etag
+    assert first["Cache-Control"] == "private, no-cache"
+
+
+def test_profile_edit_changes_etag(star, viewer_client):
+    _, client = viewer_client
+    etag = client.get(_url())["ETag"]
+
+    profile = Profile.objects.get(user=star)
+    profile.bio = "new bio"
+    profile.save()
+    response = client.get(_url(), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response.data["bio"] == "new bio"
+    assert response["ETag"] != etag
+
+
+def test_follow_writes_refresh_counts(star, viewer_client, user_factory):
+    _, client = viewer_client
+    client.get(_url())
+
+    FollowList.objects.create(follower=user_factory(), following=star)
+
+    assert client.get(_url()).data["followers_count"] == 1
+
+
+def test_viewer_fields_are_merged_per_request(star, viewer_client, auth_client):
+    viewer, client = viewer_client
+    owner_client = auth_client(star, "profile-detail")
+
+    as_viewer = client.get(_url())
+    as_owner = owner_client.get(_url())
+    FollowList.objects.create(follower=viewer, following=star)
+    after_follow = client.get(_url(), HTTP_IF_NONE_MATCH=as_viewer["ETag"])
+
+    assert as_viewer.data["is_owner"] is False
+    assert as_owner.data["is_owner"] is True
+    assert as_owner["ETag"] != as_viewer["ETag"]
+    assert after_follow.status_code == 200
+    assert after_follow.data["is_following"] is True
+
+
+def test_block_invalidates_etag(star, viewer_client):
+    viewer, client = viewer_client
+    etag = client.get(_url())["ETag"]
+
+    BlockedUser.objects.create(blocker=star, blocked=viewer)
+
+    assert client.get(_url(), HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+
+def test_stale_entry_is_served_while_refreshing(
+    star, viewer_client, settings, monkeypatch
+):
+    settings.PROFILE_CACHE_TIMEOUT = 0
+    scheduled = []
+    monkeypatch.setattr(
+        profile_cache, "_submit", lambda fn, *args: scheduled.append((fn, args))
+    )
+    _, client = viewer_client
+    client.get(_url())
+    # Bypasses the signals, like a bulk update would.
+    Profile.objects.filter(user=star).update(bio="edited in bulk")
+
+    stale = client.get(_url())
+    client.get(_url())
+    assert len(scheduled) == 1
+    fn, args = scheduled[0]
+    fn(*args)
+    fresh = client.get(_url())
+
+    assert stale.data["bio"] != "edited in bulk"
+    assert fresh.data["bio"] == "edited in bulk"
@@ -0,0 +1,74 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from core.testing import query_budget
+from users.models import FollowList
+from users.views import FollowersView, FollowingView, ProfileView
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def popular_user(user_factory):
+    star = user_factory(username="star")
+    for _ in range(5):
+        fan = user_factory()
+        FollowList.objects.create(follower=fan, following=star)
+        FollowList.objects.create(follower=star, following=fan)
+    return star
+
+
+def test_profile_detail_within_budget(auth_client, user_factory, popular_user):
+    client = auth_client(user_factory(), "profile-detail")
+
+    with query_budget(ProfileView.query_budget):
+        response = client.get(reverse("profile-detail", args=["star"]))
+
+    assert response.status_code == 200
+    assert response.data["followers_count"] == 5
+
+
+def test_followers_list_has_no_n_plus_one(auth_client, user_factory, popular_user):
+    client = auth_client(user_factory(), "followers")
+
+    with query_budget(FollowersView.query_budget) as recorder:
+        response = client.get(reverse("followers", args=["star"]))
+
+    assert response.status_code == 200
+    assert len(response.data["results"]) == 5
+    assert recorder.duplicates == {}
+
+
+def test_following_list_has_no_n_plus_one(auth_client, user_factory, popular_user):
+    client = auth_client(user_factory(), "following")
+
+    with query_budget(FollowingView.query_budget) as recorder:
+        response = client.get(reverse("following", args=["star"]))
+
+    assert response.status_code == 200
+    assert len(response.data["results"]) == 5
+    assert recorder.duplicates == {}
+
+
+def test_query_budget_reports_overrun(user_factory):
+    user = user_factory()
+
+    with pytest.raises(AssertionError, match="Query budget of 1 exceeded"):
+        with query_budget(1):
+            FollowList.objects.filter(follower=user).count()
+            FollowList.objects.filter(follower=user).count()
+
+
+@override_settings(
+    MIDDLEWARE=["core.middleware.QueryInstrumentationMiddleware"],
+    QUERY_INSTRUMENTATION=True,
+)
+def test_middleware_exposes_server_timing(auth_client, user_factory, popular_user):
+    client = auth_client(user_factory(), "profile-detail")
+
+    response = client.get(reverse("profile-detail", args=["star"]))
+
+    assert response["Server-Timing"].startswith("db;dur=")
+    assert int(response["X-DB-Query-Count"]) >= 1
+    assert response["X-DB-Duplicate-Queries"] == "0"
@@ -1,7 +1,15 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core import outbox
+from core.models import OutboxJob
+from users import jobs  # noqa: F401  (registers the welcome email handler)
+from users.models import Profile, UserSettings
+from users.signals import backfill_user_settings
+
 User = get_user_model()
 
 
@@ -48,3 +56,85 @@ class TestRegisterAPI:
 
         assert response.status_code == 400
         assert "confirm_password" in response.data
+
+
+# ======================== Lean Write Path Tests ========================
+
+
+@pytest.mark.django_db
+def test_register_writes_user_profile_and_settings_without_lookups(
+    api_client, valid_register_payload
+):
+    with CaptureQueriesContext(connection) as captured:
+        response = api_client.post(
+            reverse("register"), valid_register_payload, format="json"
+        )
+
+    assert response.status_code == 201
+    statements = [query["sql"] for query in captured.captured_queries]
+    # Only the audit log reads (the new user's groups and permissions).
+    assert not [sql for sql in statements if 'FROM "users_' in sql]
+    for table in ("users_user", "users_profile", "users_usersettings"):
+        assert sum(f'INTO "{table}"' in sql for sql in statements) == 1
+    user = User.objects.get(username="testuser")
+    assert Profile.objects.filter(user=user).exists()
+    assert UserSettings.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "existing, field",
+    [
+        ({"username": "testuser"}, "username"),
+        ({"email": "TestUser@Example.com"}, "email"),
+        ({"mobile": "987-654-3210"}, "mobile"),
+    ],
+)
+def test_register_maps_unique_violations_to_field_errors(
+    api_client, valid_register_payload, create_user, existing, field
+):
+    create_user(**existing)
+
+    response = api_client.post(
+        reverse("register"), valid_register_payload, format="json"
+    )
+
+    assert response.status_code == 400
+    assert list(response.data) == [field]
+    assert User.objects.count() == 1
+    assert Profile.objects.count() == UserSettings.objects.count() == 1
+    assert OutboxJob.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_users_without_settings_are_backfilled_on_migrate(user_factory):
+    old, current = user_factory(), user_factory()
+    UserSettings.objects.filter(user=old).delete()
+
+    backfill_user_settings()
+    backfill_user_settings()
+
+    assert set(UserSettings.objects.values_list("user_id", flat=True)) == {
+        old.pk,
+        current.pk,
+    }
+
+
+# ======================== Welcome Email Tests ========================
+
+
+@pytest.mark.django_db
+def test_welcome_email_is_sent_after_the_request(
+    api_client, valid_register_payload, mailoutbox, settings, caplog
+):
+    settings.SITE_URL = "https://example.com/"
+    response = api_client.post(
+        reverse("register"), valid_register_payload, format="json"
+    )
+
+    assert response.status_code == 201
+    assert mailoutbox == []
+    assert [outbox.run(job) for job in outbox.claim(10)] == [True]
+    assert mailoutbox[0].to == ["testuser@example.com"]
+    assert "https://example.com/api/delete-account/?token=" in mailoutbox[0].body
+    assert "token" not in caplog.text
@@ -0,0 +1,106 @@
+import io
+import json
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+
+from core.models import OutboxJob
+from users.models import Profile, User, UserSettings
+
+pytestmark = pytest.mark.django_db
+
+
+def _record(n, **extra):
+    return {
+        "username": f"legacy{n}",
+        "email": f"Legacy{n}@Example.com",
+        "mobile": f"555-000-{n:04d}",
+        "full_name": f"Legacy User {n}",
+        **extra,
+    }
+
+
+def _write_ndjson(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return path
+
+
+def _import(path, **options):
+    out, err = io.StringIO(), io.StringIO()
+    call_command("import_users", str(path), stdout=out, stderr=err, **options)
+    return out.getvalue(), err.getvalue()
+
+
+def test_csv_import_creates_users_with_their_dependents(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "username,email,mobile,full_name,password,password_hash\n"
+        "alice,Alice@Example.com,555-111-0001,Alice A,Secret123!,\n"
+        f"bob,bob@example.com,5551110002,Bob B,,{make_password('Hashed123!')}\n"
+        "carol,carol@example.com,5551110003,Carol C,,\n"
+        "dave,,5551110004,Dave D,Secret123!,\n"
+        "erin,erin@example.com,5551110005,Erin E,,not-a-hash\n"
+    )
+
+    out, err = _import(path, workers=0, batch_size=2)
+
+    assert "Imported 3 user(s); 0 already taken, 2 rejected." in out
+    assert "Record 4 rejected: missing email" in err
+    assert "Record 5 rejected: password_hash is not a known hash format" in err
+    users = {user.username: user for user in User.objects.all()}
+    assert set(users) == {"alice", "bob", "carol"}
+    assert users["alice"].check_password("Secret123!")
+    assert users["bob"].check_password("Hashed123!")
+    assert not users["carol"].has_usable_password()
+    assert users["alice"].email_normalized == "alice@example.com"
+    assert users["alice"].mobile_normalized == "5551110001"
+    assert Profile.objects.count() == UserSettings.objects.count() == 3
+    # No per-row post_save: imported users get no welcome email.
+    assert not OutboxJob.objects.exists()
+
+
+def test_passwords_are_hashed_on_a_process_pool(tmp_path):
+    path = _write_ndjson(
+        tmp_path / "users.ndjson",
+        [_record(n, password=f"Secret{n}!") for n in range(5)],
+    )
+
+    _import(path, workers=2, batch_size=2)
+
+    for n in range(5):
+        assert User.objects.get(username=f"legacy{n}").check_password(f"Secret{n}!")
+
+
+def test_interrupted_import_resumes_from_its_checkpoint(tmp_path):
+    path = _write_ndjson(tmp_path / "users.ndjson", [_record(n) for n in range(6)])
+    (tmp_path / "users.ndjson.checkpoint").write_text("4")
+
+    out, _ = _import(path, workers=0, batch_size=2)
+
+    assert "Resuming after record 4." in out
+    assert set(User.objects.values_list("username", flat=True)) == {
+        "legacy4",
+        "legacy5",
+    }
+    assert (tmp_path / "users.ndjson.checkpoint").read_text() == "6"
+
+    out, _ = _import(path, workers=0, batch_size=4, restart=True)
+
+    assert "Imported 4 user(s); 2 already taken, 0 rejected." in out
+    assert User.objects.count() == Profile.objects.count() == 6
+
+
+def test_rows_clashing_with_existing_accounts_are_skipped(tmp_path, user_factory):
+    user_factory(email="legacy1@example.com")
+    existing = user_factory(username="legacy2")
+    Profile.objects.filter(user=existing).delete()
+    path = _write_ndjson(tmp_path / "users.jsonl", [_record(n) for n in range(3)])
+
+    out, _ = _import(path, workers=0)
+
+    assert "Imported 1 user(s); 2 already taken, 0 rejected." in out
+    assert not User.objects.filter(username="legacy1").exists()
+    # Dependents are only created for the rows this import inserted.
+    assert not Profile.objects.filter(user=existing).exists()
+    assert Profile.objects.filter(user__username="legacy0").exists()
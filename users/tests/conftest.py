@@ -2,12 +2,30 @@ from decimal import Decimal
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
+from core.cache import clear_local_caches
+from rbac.models import PagePermission, Role, UserPermission
+from users.models import Profile
+
 User = get_user_model()
 
 # Fixtures
 
+# ======================== Cache Fixture ========================
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Throttle history and cached grants/users must not leak between tests.
+    cache.clear()
+    clear_local_caches()
+    yield
+    cache.clear()
+    clear_local_caches()
+
+
 # ======================== API Client Fixture ========================
 
 
@@ -68,3 +86,60 @@ def inactive_user():
         password="TestPass123",
         is_active=False,
     )
+
+
+# ======================== Social Graph Fixtures ========================
+
+
+@pytest.fixture
+def user_factory():
+    counter = iter(range(1, 100000))
+
+    def _user_factory(**kwargs):
+        n = next(counter)
+        return User.objects.create_user(
+            username=kwargs.pop("username", f"member{n}"),
+            email=kwargs.pop("email", f"member{n}@example.com"),
+            mobile=kwargs.pop("mobile", f"90000{n:05d}"),
+            password=kwargs.pop("password", "Password@123"),
+            full_name=kwargs.pop("full_name", f"Member {n}"),
+            **kwargs,
+        )
+
+    return _user_factory
+
+
+@pytest.fixture
+def follow_counts():
+    """Return ``(followers_count, following_count)`` as stored for a user."""
+
+    def _follow_counts(user):
+        profile = Profile.objects.get(user=user)
+        return profile.followers_count, profile.following_count
+
+    return _follow_counts
+
+
+@pytest.fixture
+def grant_pages():
+    def _grant_pages(user, *url_names, level="full"):
+        role, _ = Role.objects.get_or_create(name="member")
+        user_perm, _ = UserPermission.objects.get_or_create(user=user, role=role)
+        for url_name in url_names:
+            page, _ = PagePermission.objects.get_or_create(
+                url_name=url_name, permission_level=level
+            )
+            user_perm.page_permissions.add(page)
+
+    return _grant_pages
+
+
+@pytest.fixture
+def auth_client(grant_pages):
+    def _auth_client(user, *url_names):
+        grant_pages(user, *url_names)
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    return _auth_client
@@ -0,0 +1,161 @@
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from core.models import MediaBlob
+from users.models import FollowList, Profile
+from users.services import avatars
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def inline_workers(monkeypatch):
+    monkeypatch.setattr(avatars, "_submit", lambda fn, *args: fn(*args))
+
+
+def _jpeg(width=400, height=200, orientation=None):
+    image = Image.new("RGB", (width, height), "red")
+    exif = Image.Exif()
+    exif[0x010F] = "Camera Maker"
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", exif=exif)
+    return SimpleUploadedFile("me.jpg", buffer.getvalue(), "image/jpeg")
+
+
+def _upload(client, user, upload, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.patch(
+            reverse("profile-detail", args=[user.username]),
+            {"avatar": upload},
+            format="multipart",
+        )
+    assert response.status_code == 200
+    return Profile.objects.get(user=user)
+
+
+def test_upload_renders_every_size_and_format_without_exif(
+    auth_client, user_factory, inline_workers, django_capture_on_commit_callbacks
+):
+    user = user_factory()
+    client = auth_client(user, "profile-detail")
+
+    # Orientation 6: the camera was rotated, so the stored pixels are sideways.
+    profile = _upload(
+        client, user, _jpeg(400, 200, orientation=6), django_capture_on_commit_callbacks
+    )
+
+    manifest = profile.avatar_manifest
+    assert manifest["source"] == profile.avatar.name
+    assert sorted(manifest["sizes"], key=int) == ["48", "150", "320"]
+    for size, formats in manifest["sizes"].items():
+        assert set(formats) == {"webp", "jpeg"}
+        for name in formats.values():
+            with default_storage.open(name) as stored, Image.open(stored) as image:
+                assert image.size == (int(size), int(size))
+                assert not image.getexif()
+
+
+def test_orientation_is_applied_before_cropping():
+    image = Image.new("RGB", (400, 200), "white")
+    # Left half black: after a 90 degree turn the black half is on top.
+    image.paste((0, 0, 0), (0, 0, 200, 200))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", exif=exif)
+
+    size, _, data = next(avatars.render(buffer.getvalue()))
+    rendered = Image.open(io.BytesIO(data)).convert("L")
+
+    assert rendered.getpixel((size // 2, 5)) < 60
+    assert rendered.getpixel((size // 2, size - 5)) > 200
+
+
+def test_follower_rows_get_the_requested_size(
+    auth_client, user_factory, inline_workers, django_capture_on_commit_callbacks
+):
+    star, fan = user_factory(username="star"), user_factory()
+    FollowList.objects.create(follower=fan, following=star)
+    manifest = _upload(
+        auth_client(fan, "profile-detail"),
+        fan,
+        _jpeg(),
+        django_capture_on_commit_callbacks,
+    ).avatar_manifest
+    client = auth_client(star, "followers")
+    url = reverse("followers", args=["star"])
+
+    small = client.get(url + "?avatar_size=40").data["results"][0]["avatar"]
+    default = client.get(url, HTTP_ACCEPT="image/webp,*/*").data["results"][0]
+    oversized = client.get(url + "?avatar_size=1000&avatar_format=webp")
+
+    assert small == default_storage.url(manifest["sizes"]["48"]["jpeg"])
+    assert default["avatar"] == default_storage.url(manifest["sizes"]["150"]["webp"])
+    assert oversized.data["results"][0]["avatar"] == default_storage.url(
+        manifest["sizes"]["320"]["webp"]
+    )
+
+
+def test_pending_derivatives_fall_back_to_the_original(
+    auth_client, user_factory, monkeypatch, django_capture_on_commit_callbacks
+):
+    scheduled = []
+    monkeypatch.setattr(avatars, "_submit", lambda fn, *args: scheduled.append(args))
+    user = user_factory()
+
+    profile = _upload(
+        auth_client(user, "profile-detail"),
+        user,
+        _jpeg(),
+        django_capture_on_commit_callbacks,
+    )
+
+    assert scheduled == [(profile.pk, profile.avatar.name)]
+    assert avatars.avatar_url(profile) == profile.avatar.url
+
+
+def test_superseded_upload_discards_its_derivatives(
+    auth_client,
+    user_factory,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    scheduled = []
+    monkeypatch.setattr(avatars, "_submit", lambda fn, *args: scheduled.append(args))
+    user = user_factory()
+    client = auth_client(user, "profile-detail")
+    _upload(client, user, _jpeg(), django_capture_on_commit_callbacks)
+    second = _upload(client, user, _jpeg(300, 300), django_capture_on_commit_callbacks)
+
+    stale = avatars.generate_derivatives(*scheduled[0])
+    assert not MediaBlob.objects.filter(name__endswith=".webp").exists()
+    current = avatars.generate_derivatives(*scheduled[1])
+
+    assert stale is None
+    assert current["source"] == second.avatar.name
+
+
+@pytest.mark.django_db(transaction=True)
+def test_command_backfills_missing_manifests(user_factory):
+    user = user_factory()
+    profile = Profile.objects.get(user=user)
+    profile.avatar.save("old.jpg", _jpeg())
+
+    call_command("generate_avatar_derivatives", workers=1, stdout=io.StringIO())
+
+    profile.refresh_from_db()
+    assert profile.avatar_manifest["source"] == profile.avatar.name
@@ -0,0 +1,79 @@
+import pytest
+from django.core.management import call_command
+
+from users.models import FollowList, Profile
+from users.services.graph import FOLLOWERS, FOLLOWING
+from users.services.mutuals import follow_ids
+from users.services.profile_cache import get_version
+
+pytestmark = pytest.mark.django_db
+
+
+def test_follow_and_unfollow_update_counters(user_factory, follow_counts):
+    alice, bob = user_factory(), user_factory()
+
+    follow = FollowList.objects.create(follower=alice, following=bob)
+    assert follow_counts(alice) == (0, 1)
+    assert follow_counts(bob) == (1, 0)
+
+    follow.delete()
+    assert follow_counts(alice) == (0, 0)
+    assert follow_counts(bob) == (0, 0)
+
+
+def test_account_delete_releases_counters(user_factory, follow_counts):
+    alice, bob, carol = user_factory(), user_factory(), user_factory()
+    FollowList.objects.create(follower=alice, following=bob)
+    FollowList.objects.create(follower=bob, following=alice)
+    FollowList.objects.create(follower=carol, following=alice)
+
+    alice.delete()
+
+    assert follow_counts(bob) == (0, 0)
+    assert follow_counts(carol) == (0, 0)
+
+
+def test_account_delete_invalidates_counterpart_caches(
+    user_factory, django_capture_on_commit_callbacks
+):
+    alice, bob, carol = user_factory(), user_factory(), user_factory()
+    FollowList.objects.create(follower=alice, following=bob)
+    FollowList.objects.create(follower=carol, following=alice)
+    Profile.objects.update(suggestions_dirty=False)
+    assert list(follow_ids(bob.pk, FOLLOWERS)) == [alice.pk]
+    assert list(follow_ids(carol.pk, FOLLOWING)) == [alice.pk]
+    versions = get_version(bob.pk), get_version(carol.pk)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        alice.delete()
+
+    assert list(follow_ids(bob.pk, FOLLOWERS)) == []
+    assert list(follow_ids(carol.pk, FOLLOWING)) == []
+    assert get_version(bob.pk) != versions[0]
+    assert get_version(carol.pk) != versions[1]
+    assert all(Profile.objects.values_list("suggestions_dirty", flat=True))
+
+
+def test_counters_never_go_negative(user_factory, follow_counts):
+    alice, bob = user_factory(), user_factory()
+    follow = FollowList.objects.create(follower=alice, following=bob)
+    Profile.objects.filter(user=bob).update(followers_count=0)
+
+    follow.delete()
+
+    assert follow_counts(bob) == (0, 0)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reconcile_command_repairs_drift(user_factory, follow_counts):
+    alice, bob, carol = user_factory(), user_factory(), user_factory()
+    FollowList.objects.create(follower=alice, following=bob)
+    FollowList.objects.create(follower=carol, following=bob)
+    Profile.objects.filter(user=bob).update(followers_count=7)
+    Profile.objects.filter(user=alice).update(following_count=0)
+
+    call_command("reconcile_follow_counts", chunk_size=1, workers=2)
+
+    assert follow_counts(alice) == (0, 1)
+    assert follow_counts(bob) == (2, 0)
+    assert follow_counts(carol) == (0, 1)
@@ -0,0 +1,78 @@
+import sys
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.models import FollowList
+from users.services import graph
+from users.services.follows import bulk_follow, follow_user
+from users.services.graph import FOLLOWERS, FOLLOWING, AdjacencyCache
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def graph_cache(settings):
+    settings.FOLLOW_GRAPH_CACHE = True
+    return graph.get_graph()
+
+
+def test_checks_are_answered_without_sql_once_loaded(user_factory):
+    alice, bob, carol = user_factory(), user_factory(), user_factory()
+    FollowList.objects.create(follower=alice, following=bob)
+
+    assert graph.is_following(alice.pk, bob.pk)
+    with CaptureQueriesContext(connection) as ctx:
+        assert graph.is_following(alice.pk, bob.pk)
+        assert not graph.is_following(alice.pk, carol.pk)
+        assert list(graph.following_of(alice.pk)) == [bob.pk]
+
+    assert ctx.captured_queries == []
+
+
+def test_rows_follow_committed_writes(user_factory, django_capture_on_commit_callbacks):
+    alice, bob, carol = user_factory(), user_factory(), user_factory()
+    assert list(graph.following_of(alice.pk)) == []
+    assert list(graph.followers_of(carol.pk)) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        follow_user(alice.pk, carol.pk)
+        FollowList.objects.create(follower=alice, following=bob)
+        bulk_follow(bob, user_ids=[carol.pk])
+    with django_capture_on_commit_callbacks(execute=True):
+        FollowList.objects.get(follower=alice, following=carol).delete()
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert list(graph.following_of(alice.pk)) == [bob.pk]
+        assert list(graph.followers_of(carol.pk)) == [bob.pk]
+    assert ctx.captured_queries == []
+
+
+def test_uncommitted_writes_are_not_applied(user_factory):
+    alice, bob = user_factory(), user_factory()
+    held = graph.following_of(alice.pk)
+
+    FollowList.objects.create(follower=alice, following=bob)  # on_commit never runs
+
+    assert graph.following_of(alice.pk) is held
+
+
+def test_memory_budget_evicts_least_recently_used(user_factory):
+    users = [user_factory() for _ in range(3)]
+    for user in users[1:]:
+        FollowList.objects.create(follower=users[0], following=user)
+    # Room for the two-id row plus one single-id row, not for all three.
+    budget = sys.getsizeof(graph.load_row(users[0].pk, FOLLOWING)) + sys.getsizeof(
+        graph.load_row(users[1].pk, FOLLOWERS)
+    )
+    cache = AdjacencyCache(memory_budget=budget, ttl=60)
+
+    cache.row(users[0].pk, FOLLOWING)
+    cache.row(users[1].pk, FOLLOWERS)
+    cache.row(users[2].pk, FOLLOWERS)
+
+    assert cache.bytes <= cache.memory_budget
+    assert cache.evictions == 1
+    assert cache.memory_usage(users[0].pk) == 0
+    assert cache.memory_usage(users[2].pk) > 0
@@ -0,0 +1,84 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import reverse
+
+from users.models import FollowList
+from users.services.search import PythonSearchBackend, TrigramSearchBackend
+
+pytestmark = pytest.mark.django_db
+
+BACKENDS = [PythonSearchBackend, TrigramSearchBackend]
+
+
+@pytest.fixture
+def star_followers(user_factory):
+    star = user_factory(username="star")
+    for username, full_name in [
+        ("zoe", "Joanna Bell"),  # substring match on full name
+        ("annabel", "Zed Zed"),  # username prefix
+        ("bob", "Annie Lee"),  # full name prefix
+        ("carl", "Carl Smith"),  # no match
+    ]:
+        fan = user_factory(username=username, full_name=full_name)
+        FollowList.objects.create(follower=fan, following=star)
+    return FollowList.objects.filter(following=star).select_related("follower__profile")
+
+
+@pytest.mark.parametrize("backend_class", BACKENDS)
+def test_prefix_matches_rank_first(backend_class, star_followers):
+    rows = backend_class().search(star_followers, "follower", "ann", limit=10)
+
+    assert [row.follower.username for row in rows] == ["annabel", "bob", "zoe"]
+
+
+@pytest.mark.parametrize("backend_class", BACKENDS)
+def test_substring_matches_follow_prefix_matches(backend_class, star_followers):
+    rows = backend_class().search(star_followers, "follower", "bel", limit=10)
+
+    assert [row.follower.username for row in rows] == ["annabel", "zoe"]
+
+
+@pytest.mark.parametrize("backend_class", BACKENDS)
+def test_results_are_bounded_by_limit(backend_class, star_followers):
+    rows = backend_class().search(star_followers, "follower", "a", limit=2)
+
+    assert len(rows) == 2
+
+
+@override_settings(FOLLOW_SEARCH_BACKEND="users.services.search.PythonSearchBackend")
+def test_followers_view_uses_search_backend(auth_client, user_factory, star_followers):
+    client = auth_client(user_factory(), "followers")
+
+    response = client.get(reverse("followers", args=["star"]) + "?search=ANN")
+
+    assert response.status_code == 200
+    assert [row["username"] for row in response.data["results"]] == [
+        "annabel",
+        "bob",
+        "zoe",
+    ]
+    assert response.data["next"] is None
+
+
+def test_seed_and_bench_commands_run(capsys):
+    call_command("seed_follow_graph", followers=30, batch_size=7)
+    call_command("bench_follow_search", iterations=2, terms=["ka"])
+
+    output = capsys.readouterr().out
+    assert "bench_star has 30 followers." in output
+    assert "'ka'" in output
+
+
+def test_trigram_timeout_does_not_outlive_the_search(star_followers):
+    if connection.vendor != "postgresql":
+        pytest.skip("statement_timeout needs PostgreSQL")
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SHOW statement_timeout")
+        before = cursor.fetchone()
+
+        TrigramSearchBackend().search(star_followers, "follower", "ann", limit=10)
+
+        cursor.execute("SHOW statement_timeout")
+        assert cursor.fetchone() == before
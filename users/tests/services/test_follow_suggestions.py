@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import (
+    BlockedUser,
+    FollowList,
+    FollowRequest,
+    MutedUser,
+    Profile,
+    SuggestedFollow,
+)
+from users.services import suggestions
+from users.services.suggestions import score_candidates
+
+pytestmark = pytest.mark.django_db
+
+
+def test_recent_paths_score_higher():
+    now = timezone.now()
+    second_degree = {
+        1: [(10, now), (11, now - timedelta(days=365))],
+        2: [(11, now - timedelta(days=365)), (3, now)],
+        3: [(99, now)],
+    }
+
+    scored = score_candidates({1, 2, 3}, second_degree, {99}, now, 30)
+
+    assert set(scored) == {10, 11}  # 3 is already followed, 99 excluded
+    assert scored[10][0] == pytest.approx(2.0)
+    assert scored[11][1] == 2
+    assert scored[11][0] > scored[10][0]
+
+
+@pytest.fixture
+def graph(user_factory):
+    me = user_factory(username="me")
+    friends = [user_factory() for _ in range(3)]
+    popular, niche, requested, blocked, muted = (user_factory() for _ in range(5))
+    for friend in friends:
+        FollowList.objects.create(follower=me, following=friend)
+        for target in (popular, requested, blocked, muted):
+            FollowList.objects.create(follower=friend, following=target)
+    FollowList.objects.create(follower=friends[0], following=niche)
+    FollowRequest.objects.create(from_user=me, to_user=requested)
+    BlockedUser.objects.create(blocker=blocked, blocked=me)
+    MutedUser.objects.create(user=me, muted_user=muted)
+    return me, friends, popular, niche
+
+
+def _raise(*args):
+    raise RuntimeError("scoring failed")
+
+
+def _suggested(user):
+    return list(
+        SuggestedFollow.objects.filter(user=user)
+        .order_by("-score")
+        .values_list("suggested_id", "mutual_count")
+    )
+
+
+def test_command_ranks_and_excludes(graph):
+    me, friends, popular, niche = graph
+
+    call_command("compute_follow_suggestions", workers=1, chunk_size=2)
+
+    assert _suggested(me) == [(popular.pk, 3), (niche.pk, 1)]
+    assert not Profile.objects.filter(user=me, suggestions_dirty=True).exists()
+
+
+def test_incremental_run_only_touches_changed_users(graph):
+    me, friends, popular, niche = graph
+    call_command("compute_follow_suggestions", workers=1)
+    FollowList.objects.create(follower=me, following=popular)
+    out = StringIO()
+
+    call_command("compute_follow_suggestions", workers=1, incremental=True, stdout=out)
+
+    assert "for 1 user(s)" in out.getvalue()
+    assert _suggested(me) == [(niche.pk, 1)]
+
+
+def test_follow_during_scoring_leaves_the_user_dirty(graph, monkeypatch):
+    me, friends, popular, niche = graph
+    score = suggestions.score_candidates
+
+    def score_while_following(*args):
+        if not FollowList.objects.filter(follower=me, following=popular).exists():
+            FollowList.objects.create(follower=me, following=popular)
+        return score(*args)
+
+    monkeypatch.setattr(suggestions, "score_candidates", score_while_following)
+
+    suggestions.compute_range(0, 10**9)
+
+    assert Profile.objects.get(user=me).suggestions_dirty
+    assert not Profile.objects.filter(user=friends[0], suggestions_dirty=True).exists()
+
+
+def test_failed_run_keeps_users_dirty(graph, monkeypatch):
+    monkeypatch.setattr(suggestions, "score_candidates", _raise)
+
+    with pytest.raises(RuntimeError):
+        suggestions.compute_range(0, 10**9, incremental=True)
+
+    assert not Profile.objects.filter(suggestions_dirty=False).exists()
+
+
+def test_endpoint_filters_fresh_exclusions(graph, auth_client):
+    me, friends, popular, niche = graph
+    call_command("compute_follow_suggestions", workers=1)
+    BlockedUser.objects.create(blocker=me, blocked=niche)
+    client = auth_client(me, "suggested-follows")
+
+    response = client.get(reverse("suggested-follows"))
+
+    assert response.status_code == 200
+    assert [row["username"] for row in response.data["results"]] == [popular.username]
+    assert response.data["results"][0]["mutual_count"] == 3
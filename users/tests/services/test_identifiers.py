@@ -0,0 +1,57 @@
+import pytest
+
+from users.models import User
+from users.services.identifiers import (
+    EMAIL,
+    PHONE,
+    USERNAME,
+    classify_identifier,
+    resolve_login_user,
+)
+
+
+@pytest.mark.parametrize(
+    "identifier, expected",
+    [
+        ("Jane.Doe@Example.COM", (EMAIL, "jane.doe@example.com")),
+        ("+91 98765-43210", (PHONE, "919876543210")),
+        ("9876543210", (PHONE, "9876543210")),
+        ("jane_doe", (USERNAME, "jane_doe")),
+        ("12-3", (USERNAME, "12-3")),  # too few digits for a phone number
+    ],
+)
+def test_classify_identifier(identifier, expected):
+    assert classify_identifier(identifier) == expected
+
+
+@pytest.mark.django_db
+def test_user_save_fills_normalized_columns(create_user):
+    user = create_user(email="Mixed.Case@Example.com", mobile="98765 43210")
+
+    assert user.email_normalized == "mixed.case@example.com"
+    assert user.mobile_normalized == "9876543210"
+
+
+@pytest.mark.django_db
+def test_resolve_login_user_uses_one_query(create_user, django_assert_num_queries):
+    user = create_user(email="jane@example.com")
+
+    with django_assert_num_queries(1):
+        kind, found = resolve_login_user(User.objects.all(), "JANE@example.com")
+    with django_assert_num_queries(1):
+        _, missing = resolve_login_user(User.objects.all(), "nobody@example.com")
+
+    assert (kind, found) == (EMAIL, user)
+    assert missing is None
+
+
+@pytest.mark.django_db
+def test_exact_username_wins_over_phone_match(create_user):
+    phone_owner = create_user(username="someone", mobile="1234567890")
+    username_owner = create_user(
+        username="1234567890", mobile="5555555555", email="other@example.com"
+    )
+
+    _, found = resolve_login_user(User.objects.all(), "1234567890")
+
+    assert found == username_owner != phone_owner
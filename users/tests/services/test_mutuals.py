@@ -0,0 +1,79 @@
+from array import array
+
+import pytest
+from django.urls import reverse
+
+from users.models import FollowList, Profile
+from users.services.mutuals import (
+    FOLLOWERS,
+    follow_ids,
+    intersect_sorted,
+    mutual_followers,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        (range(0, 40, 2), range(0, 40, 3)),  # similar sizes: set scan
+        ([5, 999, 70_000], range(100_000)),  # lopsided: binary search
+        ([], range(10)),
+        ([1_000_001], range(10)),
+    ],
+)
+def test_intersect_sorted_matches_set_intersection(a, b):
+    result = intersect_sorted(array("q", a), array("q", b))
+
+    assert result == sorted(set(a) & set(b))
+
+
+@pytest.fixture
+def graph(user_factory):
+    viewer, star = user_factory(), user_factory()
+    friends = [user_factory() for _ in range(4)]
+    stranger = user_factory()
+    for friend in friends:
+        FollowList.objects.create(follower=viewer, following=friend)
+        FollowList.objects.create(follower=friend, following=star)
+    FollowList.objects.create(follower=stranger, following=star)
+    Profile.objects.filter(user=friends[2]).update(followers_count=50)
+    return viewer, star, friends
+
+
+def test_mutuals_count_and_most_followed_names(graph):
+    viewer, star, friends = graph
+
+    result = mutual_followers(viewer.pk, star.pk, limit=2)
+
+    assert result["count"] == 4
+    assert [u["username"] for u in result["users"]] == [
+        friends[2].username,
+        friends[0].username,
+    ]
+
+
+def test_follow_changes_invalidate_cached_ids(graph, user_factory):
+    viewer, star, friends = graph
+    assert mutual_followers(viewer.pk, star.pk)["count"] == 4
+
+    newcomer = user_factory()
+    FollowList.objects.create(follower=viewer, following=newcomer)
+    FollowList.objects.create(follower=newcomer, following=star)
+    FollowList.objects.filter(follower=friends[0], following=star).delete()
+
+    assert mutual_followers(viewer.pk, star.pk)["count"] == 4
+    assert newcomer.pk in follow_ids(star.pk, FOLLOWERS)
+
+
+def test_profile_exposes_mutuals_to_other_viewers(graph, auth_client):
+    viewer, star, _ = graph
+    client = auth_client(viewer, "profile-detail")
+
+    theirs = client.get(reverse("profile-detail", args=[star.username]))
+    mine = client.get(reverse("profile-detail", args=[viewer.username]))
+
+    assert theirs.data["mutual_followers"]["count"] == 4
+    assert len(theirs.data["mutual_followers"]["users"]) == 3
+    assert mine.data["mutual_followers"] is None
@@ -0,0 +1,111 @@
+import pytest
+from django.urls import reverse
+
+from users.models import BlockedUser, FollowList, MutedUser
+from users.services.visibility import VisibilitySet, visibility_for
+
+pytestmark = pytest.mark.django_db
+
+
+def test_large_sets_answer_membership_exactly():
+    hidden = range(0, 20_000, 7)
+
+    visibility = VisibilitySet(hidden=hidden)
+
+    assert all(visibility.hides(user_id) for user_id in hidden)
+    assert not any(visibility.hides(user_id) for user_id in range(1, 20_000, 7))
+    assert not visibility.hides(-1) and not visibility.hides(20_000)
+
+
+def test_blocks_hide_both_directions_and_mutes_do_not(user_factory):
+    viewer, blocked, blocker, muted = (user_factory() for _ in range(4))
+    BlockedUser.objects.create(blocker=viewer, blocked=blocked)
+    BlockedUser.objects.create(blocker=blocker, blocked=viewer)
+    MutedUser.objects.create(user=viewer, muted_user=muted)
+
+    visibility = visibility_for(viewer)
+
+    assert visibility.hides(blocked.pk) and visibility.hides(blocker.pk)
+    assert not visibility.hides(muted.pk)
+    assert visibility.is_muted(muted.pk)
+
+
+def test_cached_set_is_invalidated_for_both_sides_of_a_block(
+    user_factory, django_assert_num_queries
+):
+    viewer, other = user_factory(), user_factory()
+    visibility_for(viewer), visibility_for(other)
+    with django_assert_num_queries(0):
+        visibility_for(viewer)
+
+    block = BlockedUser.objects.create(blocker=viewer, blocked=other)
+
+    assert visibility_for(viewer).hides(other.pk)
+    assert visibility_for(other).hides(viewer.pk)
+
+    block.delete()
+
+    assert not visibility_for(other).hides(viewer.pk)
+
+
+@pytest.fixture
+def star_with_fans(user_factory):
+    star = user_factory(username="star")
+    fans = [user_factory() for _ in range(6)]
+    for fan in fans:
+        FollowList.objects.create(follower=fan, following=star)
+    return star, fans
+
+
+def test_follower_pages_skip_hidden_users_and_stay_full(
+    auth_client, user_factory, star_with_fans
+):
+    _, fans = star_with_fans
+    viewer = user_factory()
+    for fan in fans[2:5]:
+        BlockedUser.objects.create(blocker=fan, blocked=viewer)
+    client = auth_client(viewer, "followers")
+
+    pages, url = [], reverse("followers", args=["star"]) + "?page_size=2"
+    while url:
+        response = client.get(url)
+        pages.append([row["username"] for row in response.data["results"]])
+        url = response.data["next"]
+
+    assert pages[0] == [fans[5].username, fans[1].username]
+    assert [name for page in pages for name in page] == [
+        fans[5].username,
+        fans[1].username,
+        fans[0].username,
+    ]
+
+
+def test_blocked_profile_is_not_found(auth_client, user_factory, star_with_fans):
+    star, fans = star_with_fans
+    viewer = user_factory()
+    client = auth_client(viewer, "profile-detail")
+    FollowList.objects.create(follower=viewer, following=fans[0])
+    BlockedUser.objects.create(blocker=star, blocked=viewer)
+
+    assert client.get(reverse("profile-detail", args=["star"])).status_code == 404
+
+    BlockedUser.objects.filter(blocker=star).delete()
+    BlockedUser.objects.create(blocker=viewer, blocked=fans[0])
+    response = client.get(reverse("profile-detail", args=["star"]))
+
+    assert response.status_code == 200
+    assert response.data["mutual_followers"]["count"] == 0
+
+
+@pytest.mark.parametrize("url_name", ["followers", "following"])
+def test_hidden_owners_lists_are_not_found(
+    auth_client, user_factory, star_with_fans, url_name
+):
+    star, _ = star_with_fans
+    viewer = user_factory()
+    client = auth_client(viewer, url_name)
+    BlockedUser.objects.create(blocker=star, blocked=viewer)
+
+    assert client.get(reverse(url_name, args=["star"])).status_code == 404
+    response = client.get(reverse(url_name, args=["star"]) + "?search=member")
+    assert response.status_code == 404
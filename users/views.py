@@ -1,9 +1,8 @@
-from decimal import Decimal, InvalidOperation
+import logging
 
 from django.contrib.auth import get_user_model
 from django.core.signing import BadSignature, SignatureExpired, TimestampSigner
-from django.db.models import Count, Q
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
@@ -13,13 +12,14 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from core.pagination import DefaultPagination
+from core.pagination import DefaultPagination, KeysetPagination
 from core.throttling import (
     AnonBurstRateThrottle,
     AnonSustainedRateThrottle,
     UserBurstRateThrottle,
     UserSustainedRateThrottle,
 )
+from rbac.tokens import GrantsRefreshToken
 from users.models import (
     BlockedUser,
     CloseFriend,
@@ -31,17 +31,82 @@ from users.models import (
     UserSettings,
 )
 from users.serializers import (
+    BulkFollowSerializer,
     FollowerSerializer,
     FollowingSerializer,
+    FollowRequestBulkSerializer,
+    FollowRequestSerializer,
     LoginSerializer,
     ProfileSerializer,
     RegisterSerializer,
+    SuggestedFollowSerializer,
     UserSettingsSerializer,
 )
+from users.services.avatars import schedule_derivatives, upload_handler
+from users.services.follows import (
+    ALREADY_FOLLOWING,
+    ALREADY_REQUESTED,
+    FOLLOWED,
+    FORBIDDEN,
+    NOT_FOLLOWING,
+    NOT_FOUND,
+    REQUESTED,
+    accept_follow_request,
+    accept_follow_requests,
+    bulk_follow,
+    bulk_unfollow,
+    follow_user,
+    reject_follow_requests,
+    request_follow,
+    unfollow_user,
+)
+from users.services.graph import is_following
+from users.services.identifiers import resolve_login_user
+from users.services.mutuals import mutual_followers
+from users.services.profile_cache import (
+    build_entry,
+    cached_entry,
+    etag_matches,
+    response_etag,
+)
+from users.services.search import SearchTimeout, get_search_backend
+from users.services.suggestions import suggestions_for
+from users.services.visibility import EMPTY, visibility_for
 
+logger = logging.getLogger(__name__)
 signer = TimestampSigner()
 
 
+def search_follow_list(paginator, queryset, relation, term, serializer_class, request):
+    """Ranked, bounded search inside a follower/following list (no cursors)."""
+    limit = paginator.get_page_size(request)
+    try:
+        rows = get_search_backend().search(queryset, relation, term, limit)
+    except SearchTimeout:
+        return Response(
+            {"detail": "Search took too long, try a longer term."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    rows = visibility_for(request.user).visible(
+        rows, key=lambda row: getattr(row, f"{relation}_id")
+    )
+    serializer = serializer_class(rows, many=True, context={"request": request})
+    return Response({"next": None, "previous": None, "results": serializer.data})
+
+
+def login_payload(user):
+    """Issue a token pair for ``user`` (shared by the sync and async login views)."""
+    refresh = GrantsRefreshToken.for_user(user)
+    return {
+        "message": "Login successful",
+        "username": user.username,
+        "tokens": {
+            "access": str(refresh.access_token),
+            "refresh": str(refresh),
+        },
+    }
+
+
 # ===================== Auth Views =====================
 class RegisterView(APIView):
     permission_classes = [AllowAny]
@@ -80,49 +145,32 @@ class LoginView(APIView):
         identifier = serializer.validated_data.get("identifier")
         password = serializer.validated_data.get("password")
 
-        user = None
-        try:
-            user = User.objects.get(username=identifier)
-        except User.DoesNotExist:
-            try:
-                user = User.objects.get(email=identifier)
-            except User.DoesNotExist:
-                try:
-                    if identifier.isdigit():
-                        mobile_value = Decimal(identifier)
-                        user = User.objects.get(mobile=mobile_value)
-                except (User.DoesNotExist, ValueError, InvalidOperation):
-                    pass
+        kind, user = resolve_login_user(User.objects.all(), identifier)
 
         if not user:
-            print(f"[LOGIN] User not found for identifier: {identifier}")
+            logger.info(
+                "login_failed reason=unknown_identifier identifier_type=%s", kind
+            )
             return Response(
                 {"error": "Invalid credentials. User not found."}, status=401
             )
 
         if not user.check_password(password):
-            print(f"[LOGIN] Invalid password for user: {user.username}")
+            logger.info(
+                "login_failed reason=bad_password user_id=%s identifier_type=%s",
+                user.pk,
+                kind,
+            )
             return Response(
                 {"error": "Invalid credentials. Incorrect password."}, status=401
             )
 
         if not user.is_active:
+            logger.info("login_failed reason=inactive user_id=%s", user.pk)
             return Response({"error": "User account is disabled."}, status=403)
 
-        refresh = RefreshToken.for_user(user)
-
-        print(f"[LOGIN] Success! User: {user.username}")
-        return Response(
-            {
-                "message": "Login successful",
-                "username": user.username,
-                "tokens": {
-                    "access": str(refresh.access_token),
-                    "refresh": str(refresh),
-                },
-            },
-            status=200,
-        )
+        logger.info("login_succeeded user_id=%s identifier_type=%s", user.pk, kind)
+        return Response(login_payload(user), status=200)
 
 
 # =============== Profile Views ===============
@@ -130,6 +178,11 @@ class LoginView(APIView):
 
 class ProfileView(APIView):
     serializer_class = ProfileSerializer
+    # Max queries per request, auth and RBAC included. Enforced in tests with
+    # core.testing.query_budget and logged by QueryInstrumentationMiddleware.
+    # Visibility, relationship and mutual-connection lookups add up to five
+    # more on cold caches.
+    query_budget = 9
     throttle_classes = [
         UserBurstRateThrottle,
         UserSustainedRateThrottle,
@@ -140,33 +193,52 @@ class ProfileView(APIView):
         FormParser,
     ]
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Avatars stream to disk and are rejected on the first chunk that
+        # breaks a limit, before the serializer sees them.
+        request.upload_handlers = [upload_handler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
     def get(self, request, username):
-        profile = get_object_or_404(
-            Profile.objects.select_related("user"), user__username=username
-        )
-        self.check_object_permissions(request, profile)
-        data = self.serializer_class(profile).data
-        data["is_owner"] = profile.user == request.user
-        # Using View-level annotation to get followers and following counts
-        profile = (
-            Profile.objects.select_related("user")
-            .annotate(
-                followers_count=Count("user__follower_set"),
-                following_count=Count("user__following_set"),
+        # The public part comes from users.services.profile_cache; the ETag
+        # check needs no queries. Access is page-level (DynamicPagePermission),
+        # so object permissions are only checked when the profile is loaded.
+        entry = cached_entry(username)
+        if entry is None:
+            profile = get_object_or_404(
+                Profile.objects.select_related("user"), user__username=username
             )
-            .filter(user__username=username)
-            .first()
-        )
-        data["followers_count"] = profile.followers_count
-        data["following_count"] = profile.following_count
-        return Response(data, status=status.HTTP_200_OK)
+            self.check_object_permissions(request, profile)
+            entry = build_entry(profile)
+        etag = response_etag(entry, request.user)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        user_id = entry["user_id"]
+        is_owner = user_id == request.user.pk
+        # Nobody is hidden from themselves; owners skip the lookup.
+        visibility = EMPTY if is_owner else visibility_for(request.user)
+        if visibility.hides(user_id):
+            raise Http404
+        data = dict(entry["data"])
+        data["is_owner"] = is_owner
+        data["is_following"] = data["mutual_followers"] = None
+        if request.user.is_authenticated and not is_owner:
+            data["is_following"] = is_following(request.user.pk, user_id)
+            data["mutual_followers"] = mutual_followers(
+                request.user.pk, user_id, exclude=visibility.hidden
+            )
+        return Response(data, status=status.HTTP_200_OK, headers=headers)
 
     def patch(self, request, username):
         profile = get_object_or_404(Profile, user__username=username)
         self.check_object_permissions(request, profile)
         serializer = self.serializer_class(profile, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        profile = serializer.save()
+        if "avatar" in serializer.validated_data:
+            schedule_derivatives(profile)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -174,28 +246,38 @@ class ProfileView(APIView):
 
 
 class FollowersView(APIView):
-    pagination_class = DefaultPagination
+    pagination_class = KeysetPagination
+    query_budget = 6
     throttle_classes = [
         UserBurstRateThrottle,
         UserSustainedRateThrottle,
     ]
 
     def get(self, request, username):
-        profile = get_object_or_404(Profile, user__username=username)
+        profile = get_object_or_404(
+            Profile.objects.select_related("user"), user__username=username
+        )
+        # Same rule as ProfileView: a hidden owner's lists do not exist.
+        visibility = visibility_for(request.user)
+        if visibility.hides(profile.user_id):
+            raise Http404
         search = request.GET.get("search", "")
-        queryset = (
-            FollowList.objects.filter(following=profile.user)
-            .select_related("follower__profile")
-            .order_by("-created_at")
+        queryset = FollowList.objects.filter(following=profile.user).select_related(
+            "follower__profile"
         )
+        paginator = self.pagination_class()
         if search:
-            queryset = queryset.filter(
-                Q(follower__username__icontains=search)
-                | Q(follower__full_name__icontains=search)
+            return search_follow_list(
+                paginator, queryset, "follower", search, FollowerSerializer, request
             )
-        paginator = self.pagination_class()
-        page = paginator.paginate_queryset(queryset, request)
-        serializer = FollowerSerializer(page, many=True)
+        page = paginator.paginate_queryset(
+            queryset,
+            request,
+            view=self,
+            total_hint=profile.followers_count,
+            row_filter=lambda row: not visibility.hides(row.follower_id),
+        )
+        serializer = FollowerSerializer(page, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
     def delete(self, request, username):
@@ -204,44 +286,47 @@ class FollowersView(APIView):
         follower_id = request.data.get("user_id")
         if not follower_id:
             return Response({"detail": "user_id is required"}, status=400)
-        try:
-            follow = FollowList.objects.get(
-                follower_id=follower_id, following=profile.user
-            )
-            follow.delete()
-            return Response({"detail": "Follower removed"}, status=204)
-        except FollowList.DoesNotExist:
+        if unfollow_user(follower_id, profile.user_id) == NOT_FOLLOWING:
             return Response({"detail": "User is not a follower"}, status=404)
+        return Response({"detail": "Follower removed"}, status=204)
 
 
 # ===================== Following View =====================
 
 
 class FollowingView(APIView):
-    pagination_class = DefaultPagination
+    pagination_class = KeysetPagination
+    query_budget = 6
     throttle_classes = [
         UserBurstRateThrottle,
         UserSustainedRateThrottle,
     ]
 
     def get(self, request, username):
-        profile = get_object_or_404(Profile, user__username=username)
+        profile = get_object_or_404(
+            Profile.objects.select_related("user"), user__username=username
+        )
+        visibility = visibility_for(request.user)
+        if visibility.hides(profile.user_id):
+            raise Http404
 
         search = request.GET.get("search", "")
-        queryset = (
-            FollowList.objects.filter(follower=profile.user)
-            .select_related("following__profile")
-            .order_by("-created_at")
+        queryset = FollowList.objects.filter(follower=profile.user).select_related(
+            "following__profile"
         )
+        paginator = self.pagination_class()
         if search:
-            queryset = queryset.filter(
-                Q(following__username__icontains=search)
-                | Q(following__full_name__icontains=search)
+            return search_follow_list(
+                paginator, queryset, "following", search, FollowingSerializer, request
             )
-
-        paginator = self.pagination_class()
-        page = paginator.paginate_queryset(queryset, request)
-        serializer = FollowingSerializer(page, many=True)
+        page = paginator.paginate_queryset(
+            queryset,
+            request,
+            view=self,
+            total_hint=profile.following_count,
+            row_filter=lambda row: not visibility.hides(row.following_id),
+        )
+        serializer = FollowingSerializer(page, many=True, context={"request": request})
 
         return paginator.get_paginated_response(serializer.data)
 
@@ -252,15 +337,9 @@ class FollowingView(APIView):
         if not following_id:
             return Response({"detail": "user_id is required"}, status=400)
 
-        try:
-            follow = FollowList.objects.get(
-                follower=profile.user, following_id=following_id
-            )
-            follow.delete()
-            return Response({"detail": "Unfollowed successfully"}, status=204)
-
-        except FollowList.DoesNotExist:
+        if unfollow_user(profile.user_id, following_id) == NOT_FOLLOWING:
             return Response({"detail": "You are not following this user"}, status=404)
+        return Response({"detail": "Unfollowed successfully"}, status=204)
 
 
 # ===================== Follow Action View =====================
@@ -272,23 +351,23 @@ class FollowActionView(APIView):
     ]
 
     def post(self, request, username):
-        target_user = get_object_or_404(User, username=username)
-        if request.user == target_user:
-            return Response({"detail": "You cannot follow yourself."}, status=400)
-        if FollowList.objects.filter(
-            follower=request.user, following=target_user
-        ).exists():
-            return Response({"detail": "Already following."}, status=400)
-        if not target_user.profile.is_private:
-            FollowList.objects.create(follower=request.user, following=target_user)
-            return Response({"detail": "Followed successfully."}, status=201)
-        follow_request, created = FollowRequest.objects.get_or_create(
-            from_user=request.user, to_user=target_user
+        target_id, is_private = get_object_or_404(
+            User.objects.values_list("id", "profile__is_private"), username=username
         )
-        if not created:
-            return Response({"detail": "Follow request already sent."}, status=400)
-
-        return Response({"detail": "Follow request sent."}, status=201)
+        if request.user.pk == target_id:
+            return Response({"detail": "You cannot follow yourself."}, status=400)
+        if not is_private:
+            result = follow_user(request.user.pk, target_id)
+        else:
+            result = request_follow(request.user.pk, target_id)
+        # Repeats answer 200 with the current state, so retries are harmless.
+        detail, status_code = {
+            FOLLOWED: ("Followed successfully.", 201),
+            REQUESTED: ("Follow request sent.", 201),
+            ALREADY_FOLLOWING: ("Already following.", 200),
+            ALREADY_REQUESTED: ("Follow request already sent.", 200),
+        }[result]
+        return Response({"detail": detail}, status=status_code)
 
     def delete(self, request, username):
         target_user = get_object_or_404(User, username=username)
@@ -300,6 +379,110 @@ class FollowActionView(APIView):
             return Response({"detail": "No follow request found."}, status=404)
 
 
+# ===================== Bulk Follow View =====================
+
+
+class BulkFollowView(APIView):
+    """
+    Follow (POST) or unfollow (DELETE) many accounts in one request.
+
+    Body: ``{"usernames": [...], "user_ids": [...]}``. Responds with one status
+    per target, see ``users.services.follows``.
+    """
+
+    throttle_classes = [
+        UserBurstRateThrottle,
+    ]
+    query_budget = 12
+
+    def post(self, request):
+        return self._apply(request, bulk_follow)
+
+    def delete(self, request):
+        return self._apply(request, bulk_unfollow)
+
+    def _apply(self, request, action):
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = action(request.user, **serializer.validated_data)
+        return Response({"results": results}, status=200)
+
+
+# ===================== Suggested Follows View =====================
+
+
+class SuggestedFollowsView(APIView):
+    """Precomputed "suggested for you" list, see compute_follow_suggestions."""
+
+    query_budget = 6
+    throttle_classes = [
+        UserBurstRateThrottle,
+        UserSustainedRateThrottle,
+    ]
+
+    def get(self, request):
+        paginator = DefaultPagination()
+        page = paginator.paginate_queryset(
+            suggestions_for(request.user), request, view=self
+        )
+        serializer = SuggestedFollowSerializer(
+            page, many=True, context={"request": request}
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+
+# ===================== Follow Request Inbox View =====================
+
+
+class FollowRequestInboxView(APIView):
+    """
+    Pending follow requests received by the current user, newest first.
+
+    GET pages with ``KeysetPagination``; requester cards come from the same
+    joined query. POST accepts or rejects in bulk:
+    ``{"action": "accept" | "reject", "ids": [...]}`` or ``{"action": ..., "all": true}``.
+    """
+
+    pagination_class = KeysetPagination
+    query_budget = 6
+    throttle_classes = [
+        UserBurstRateThrottle,
+        UserSustainedRateThrottle,
+    ]
+
+    def get(self, request):
+        queryset = FollowRequest.objects.filter(to_user=request.user).select_related(
+            "from_user__profile"
+        )
+        visibility = visibility_for(request.user)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            queryset,
+            request,
+            view=self,
+            row_filter=lambda row: not visibility.hides(row.from_user_id),
+        )
+        serializer = FollowRequestSerializer(
+            page, many=True, context={"request": request}
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    def post(self, request):
+        serializer = FollowRequestBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action = serializer.validated_data["action"]
+        request_ids = serializer.validated_data.get("ids")
+        respond = (
+            accept_follow_requests if action == "accept" else reject_follow_requests
+        )
+        processed = respond(request.user, request_ids)
+        data = {"action": action, "count": len(processed), "ids": processed}
+        if request_ids is not None:
+            done = set(processed)
+            data["not_found"] = [rid for rid in request_ids if rid not in done]
+        return Response(data, status=200)
+
+
 # ===================== Follow Request Respond View =====================
 
 
@@ -309,15 +492,11 @@ class FollowRequestRespondView(APIView):
     ]
 
     def post(self, request, request_id):
-        follow_request = get_object_or_404(FollowRequest, id=request_id)
-
-        if follow_request.to_user != request.user:
+        result = accept_follow_request(request_id, request.user.pk)
+        if result == FORBIDDEN:
             return Response({"detail": "Not allowed."}, status=403)
-        FollowList.objects.create(
-            follower=follow_request.from_user, following=follow_request.to_user
-        )
-
-        follow_request.delete()
+        if result == NOT_FOUND:
+            raise Http404
         return Response({"detail": "Follow request accepted."}, status=201)
 
     def delete(self, request, request_id):
@@ -374,12 +553,13 @@ class UserSettingsView(APIView):
     throttle_classes = [UserSustainedRateThrottle]
 
     def get(self, request):
-        settings_obj, _ = UserSettings.objects.get_or_create(user=request.user)
+        # Created with the user (users.signals), backfilled on migrate.
+        settings_obj = get_object_or_404(UserSettings, user=request.user)
         serializer = UserSettingsSerializer(settings_obj)
         return Response(serializer.data)
 
     def patch(self, request):
-        settings_obj, _ = UserSettings.objects.get_or_create(user=request.user)
+        settings_obj = get_object_or_404(UserSettings, user=request.user)
         serializer = UserSettingsSerializer(
             settings_obj, data=request.data, partial=True
         )